@@ -1,96 +1,265 @@
+#!/usr/bin/env python3
+"""
+Graficos dos experimentos, gerados sem janela (backend Agg)
+Le a tabela consolidada do analyze-all-experiments.py
+(reports_csv/experiments/CONSOLIDATED_RESULTS.csv) e grava em reports_csv/plots/:
+
+    experiments/{experimento}_{workload}.png
+        TPS x latencia media, TPS x throughput, CPU e memoria media dos nos,
+        uma curva por numero de workers
+    compare/{fator}/{workload}_{configuracao fixa}.png
+        as mesmas curvas sobrepostas para experimentos que diferem apenas
+        no numero de nos, tempo de bloco, consenso ou versao
+
+O eixo x e o TPS alvo; em relatorios sem o TPS alvo usa a taxa de envio.
+
+As figuras sao renderizadas em um pool de processos. Cada figura guarda no
+manifesto (plots_manifest.json) o hash dos dados que a geraram, e so e
+refeita quando esses dados (ou este script) mudam.
+
+Uso:
+    python3 analise.py              # renderiza as figuras novas ou alteradas
+    python3 analise.py --jobs 1     # em serie
+    python3 analise.py --force      # refaz todas
+"""
+
 import os
-import pandas as pd
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
+import pandas as pd
 
-# Caminho dos CSVs (ajuste se for outro diretório)
-#REPORT_DIR = "./reports_csv/open"
-#REPORT_DIR = "./reports_csv/query"
-REPORT_DIR = "./reports_csv/transfer"
-PERF_CSV = os.path.join(REPORT_DIR, "caliper_performance_metrics.csv")
-MON_CSV = os.path.join(REPORT_DIR, "caliper_monitor_metrics.csv")
-
-# =====================
-# 1. Leitura dos dados
-# =====================
-perf_df = pd.read_csv(PERF_CSV)
-mon_df = pd.read_csv(MON_CSV)
-
-# ---- Normalização das colunas de performance ----
-for col in ["Max Latency (s)", "Min Latency (s)", "Avg Latency (s)", "Throughput (TPS)", "TPS"]:
-    if col in perf_df.columns:
-        perf_df[col] = pd.to_numeric(perf_df[col], errors="coerce")
-
-# ---- Seleciona colunas de CPU e Memória ----
-cpu_col = "CPU%(avg)"
-mem_col_gb = "Memory(avg) [GB]"
-mem_col_mb = "Memory(avg) [MB]"
-
-# Converte para número
-for col in [cpu_col, mem_col_gb, mem_col_mb, "TPS"]:
-    if col in mon_df.columns:
-        mon_df[col] = pd.to_numeric(mon_df[col], errors="coerce")
-
-# ---- Seleciona qual coluna de memória usar ----
-if mon_df[mem_col_gb].notna().sum() > 0:
-    mon_df["Memory_used_GB"] = mon_df[mem_col_gb]
-elif mem_col_mb in mon_df.columns and mon_df[mem_col_mb].notna().sum() > 0:
-    mon_df["Memory_used_GB"] = mon_df[mem_col_mb] / 1024  # converte MB → GB
-else:
-    raise ValueError("❌ Nenhuma coluna de memória válida encontrada no CSV!")
-
-# =====================
-# 2. Agrupar e calcular médias
-# =====================
-perf_grouped = (
-    perf_df.groupby("TPS")[["Avg Latency (s)", "Throughput (TPS)"]]
-    .mean()
-    .reset_index()
-)
+# Cores para output
+class Colors:
+    BLUE = '\033[0;34m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    RED = '\033[0;31m'
+    NC = '\033[0m'
+
+def log_info(msg):
+    print(f"{Colors.BLUE}[INFO]{Colors.NC} {msg}")
 
-mon_grouped = (
-    mon_df.groupby("TPS")[["Memory_used_GB", cpu_col]]
-    .mean()
-    .reset_index()
+def log_success(msg):
+    print(f"{Colors.GREEN}[OK]{Colors.NC} {msg}")
+
+def log_warning(msg):
+    print(f"{Colors.YELLOW}[WARN]{Colors.NC} {msg}")
+
+def log_error(msg):
+    print(f"{Colors.RED}[ERROR]{Colors.NC} {msg}")
+
+base_dir = Path(__file__).parent
+CONSOLIDATED_CSV = base_dir / "reports_csv" / "experiments" / "CONSOLIDATED_RESULTS.csv"
+PLOTS_DIR = base_dir / "reports_csv" / "plots"
+MANIFEST_NAME = "plots_manifest.json"
+MANIFEST_VERSION = 1
+
+# Paineis de cada figura: coluna da tabela consolidada -> titulo do eixo y
+PANELS = (
+    ("avg_latency", "Latencia media (s)"),
+    ("throughput", "Throughput (TPS)"),
+    ("avg_cpu", "CPU media dos nos (%)"),
+    ("avg_memory_gb", "Memoria media dos nos (GB)"),
 )
 
-# ---- Junta os dois ----
-summary = pd.merge(perf_grouped, mon_grouped, on="TPS", how="inner")
-
-print("\n📊 Médias por TPS:")
-print(summary)
-
-# =====================
-# 3. Geração dos gráficos
-# =====================
-
-plt.figure(figsize=(10, 6))
-plt.plot(summary["TPS"], summary["Avg Latency (s)"], marker="o")
-plt.title("TPS × Latência Média (s)")
-plt.xlabel("TPS")
-plt.ylabel("Latência Média (s)")
-plt.grid(True)
-plt.show()
-
-plt.figure(figsize=(10, 6))
-plt.plot(summary["TPS"], summary["Throughput (TPS)"], marker="o", color="green")
-plt.title("TPS × Throughput (TPS)")
-plt.xlabel("TPS")
-plt.ylabel("Throughput")
-plt.grid(True)
-plt.show()
-
-plt.figure(figsize=(10, 6))
-plt.plot(summary["TPS"], summary[cpu_col], marker="o", color="red")
-plt.title("TPS × CPU Média (%)")
-plt.xlabel("TPS")
-plt.ylabel("CPU Média (%)")
-plt.grid(True)
-plt.show()
-
-plt.figure(figsize=(10, 6))
-plt.plot(summary["TPS"], summary["Memory_used_GB"], marker="o", color="purple")
-plt.title("TPS × Memória Média (GB)")
-plt.xlabel("TPS")
-plt.ylabel("Memória Média (GB)")
-plt.grid(True)
-plt.show()
+# Fatores das comparacoes: coluna -> (nome, rotulo de um valor no nome do experimento)
+FACTORS = {
+    "nodes": ("numero de nos", lambda v: f"{v}n"),
+    "blocktime": ("tempo de bloco", lambda v: f"{v}s"),
+    "consensus": ("consenso", lambda v: f"{v}"),
+    "version": ("versao", lambda v: f"v{v}"),
+}
+
+REQUIRED_COLUMNS = ["experiment", "test_type", "driver", "tps", "workers", "send_rate"] + list(FACTORS) + [c for c, _ in PANELS]
+
+def load_points(csv_path):
+    """
+    Pontos da tabela consolidada com a coluna x (TPS alvo, ou taxa de envio
+    quando o relatorio nao tem o TPS alvo). Retorna None se a tabela nao
+    tiver o formato atual.
+    """
+    df = pd.read_csv(csv_path)
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        log_error(f"Colunas ausentes em {csv_path.name}: {', '.join(missing)}")
+        return None
+    df["x"] = df["tps"].fillna(df["send_rate"])
+    return df.dropna(subset=["x"]).sort_values(["experiment", "test_type", "driver", "workers", "x"])
+
+def workers_label(workers):
+    return "workers padrao" if pd.isna(workers) else f"{workers:.0f} workers"
+
+def workload_name(workload, driver):
+    """Workload no nome e titulo das figuras; execucoes do rpc_loadgen ficam em figuras proprias"""
+    return f"{workload}_rpc" if driver == "rpc" else workload
+
+def x_label(df):
+    return "TPS alvo" if df["tps"].notna().all() else "TPS alvo (taxa de envio quando ausente)"
+
+def series_points(df):
+    """Colunas de um grafico como listas (NaN -> None), para o hash e para o pool"""
+    points = df[["x"] + [c for c, _ in PANELS]]
+    return {col: [None if pd.isna(v) else float(v) for v in points[col]] for col in points.columns}
+
+def experiment_jobs(df, output_dir):
+    """Uma figura por experimento, workload e gerador de carga, com uma curva por numero de workers"""
+    jobs = []
+    for (exp_name, test_type, driver), group in df.groupby(["experiment", "test_type", "driver"], sort=True):
+        workload = workload_name(test_type, driver)
+        series = [{"label": workers_label(workers), "points": series_points(points)}
+                  for workers, points in group.groupby("workers", dropna=False, sort=True)]
+        jobs.append({
+            "path": str(output_dir / "experiments" / f"{exp_name}_{workload}.png"),
+            "title": f"{exp_name} - {workload}",
+            "xlabel": x_label(group),
+            "series": series,
+        })
+    return jobs
+
+def compare_jobs(df, output_dir):
+    """
+    Sobreposicoes por fator: para cada workload, fator e combinacao dos demais
+    fatores (e gerador de carga e workers), uma figura com uma curva por experimento, quando ha
+    ao menos dois valores do fator.
+    """
+    jobs = []
+    for factor, (factor_name, factor_label) in FACTORS.items():
+        fixed = [f for f in FACTORS if f != factor]
+        for key, group in df.groupby(["test_type", "driver"] + fixed + ["workers"], dropna=False, sort=True):
+            if group[factor].nunique() < 2:
+                continue
+            test_type, driver, *values, workers = key
+            workload = workload_name(test_type, driver)
+            config = "-".join(FACTORS[f][1](v) for f, v in zip(fixed, values))
+            if not pd.isna(workers):
+                config += f"-{workers:.0f}w"
+            # Mais de um experimento com o mesmo valor do fator: o rotulo leva o nome do experimento
+            repeated = group.groupby(factor)["experiment"].nunique() > 1
+            series = []
+            for (value, exp_name), points in group.groupby([factor, "experiment"], sort=True):
+                label = factor_label(value) + (f" ({exp_name})" if repeated[value] else "")
+                series.append({"label": label, "points": series_points(points)})
+            jobs.append({
+                "path": str(output_dir / "compare" / factor / f"{workload}_{config}.png"),
+                "title": f"{workload}: {factor_name} ({config})",
+                "xlabel": x_label(group),
+                "series": series,
+            })
+    return jobs
+
+def job_hash(job, code_hash):
+    """Hash dos dados e do codigo que geram a figura"""
+    payload = json.dumps({"job": job, "code": code_hash}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def render_figure(job):
+    """Renderiza e grava uma figura (executada nos processos do pool)"""
+    fig, axes = plt.subplots(2, 2, figsize=(12, 8))
+    for ax, (col, ylabel) in zip(axes.flat, PANELS):
+        for series in job["series"]:
+            points = series["points"]
+            ax.plot(points["x"], [float("nan") if v is None else v for v in points[col]],
+                    marker="o", label=series["label"])
+        ax.set_xlabel(job["xlabel"])
+        ax.set_ylabel(ylabel)
+        ax.grid(True)
+    axes.flat[0].legend(fontsize="small")
+    fig.suptitle(job["title"])
+    fig.tight_layout()
+
+    path = Path(job["path"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp.png")
+    fig.savefig(tmp_path, dpi=100)
+    plt.close(fig)
+    os.replace(tmp_path, path)
+    return job["path"]
+
+def render_all(jobs, n_jobs=1):
+    """Renderiza as figuras em serie (n_jobs=1) ou em um pool de processos"""
+    if n_jobs <= 1 or len(jobs) <= 1:
+        return [render_figure(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(jobs))) as pool:
+        return list(pool.map(render_figure, jobs))
+
+def load_manifest(output_dir):
+    """Hash de cada figura ja gerada (vazio se o manifesto nao existir ou for invalido)"""
+    try:
+        with open(output_dir / MANIFEST_NAME, "r") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest.get("figures", {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+def save_manifest(output_dir, figures):
+    """Grava o manifesto de forma atomica (arquivo temporario + rename)"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"version": MANIFEST_VERSION, "figures": figures}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera os graficos de todos os experimentos (sem janela)")
+    parser.add_argument("--input", type=Path, default=CONSOLIDATED_CSV,
+                        help="Tabela consolidada do analyze-all-experiments.py")
+    parser.add_argument("--output", type=Path, default=PLOTS_DIR, help="Diretorio das figuras")
+    parser.add_argument("--jobs", "-j", type=int, default=0,
+                        help="Numero de processos de renderizacao (padrao: 0 = todos os nucleos; 1 = em serie)")
+    parser.add_argument("--force", action="store_true", help="Refaz todas as figuras, mesmo sem mudancas")
+    args = parser.parse_args()
+    n_jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    if not args.input.exists():
+        log_error(f"Tabela consolidada nao encontrada: {args.input}")
+        log_error("Execute a analise primeiro: python3 analyze-all-experiments.py")
+        sys.exit(1)
+
+    df = load_points(args.input)
+    if df is None:
+        log_error("Gere novamente a tabela com: python3 analyze-all-experiments.py")
+        sys.exit(1)
+    if df.empty:
+        log_warning("Nenhum ponto com TPS alvo ou taxa de envio para plotar")
+        return
+
+    jobs = experiment_jobs(df, args.output) + compare_jobs(df, args.output)
+    code_hash = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+    manifest = load_manifest(args.output)
+    previous = {} if args.force else manifest
+
+    figures = {}
+    to_render = []
+    for job in jobs:
+        name = str(Path(job["path"]).relative_to(args.output))
+        figures[name] = job_hash(job, code_hash)
+        if previous.get(name) != figures[name] or not Path(job["path"]).exists():
+            to_render.append(job)
+
+    log_info(f"{len(jobs)} figuras, {len(to_render)} a renderizar"
+             + (f" com {min(n_jobs, len(to_render))} processos" if len(to_render) > 1 and n_jobs > 1 else ""))
+    for path in render_all(to_render, n_jobs):
+        log_success(f"Figura salva: {path}")
+
+    # Figuras de experimentos ou comparacoes que deixaram de existir
+    for name in set(manifest) - set(figures):
+        (args.output / name).unlink(missing_ok=True)
+        log_info(f"Figura removida: {name}")
+
+    if figures != manifest:
+        save_manifest(args.output, figures)
+    log_success(f"Figuras em {args.output} ({len(jobs) - len(to_render)} sem mudancas)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Cache dos agregados da analise por experimento
+O analyze-all-experiments.py relia e reagregava os CSVs de todos os
+experimentos a cada execucao. Aqui os agregados de cada experimento
+(performance, monitor e recursos por no) sao guardados junto dos seus CSVs,
+em analysis_cache/ (uma tabela Parquet por agregado e key.json), sob a chave:
+
+    hash dos arquivos de entrada do experimento (CSVs e arquivos Parquet do dataset)
+    + parametros da analise + hash do codigo da analise
+
+Apenas experimentos novos ou alterados sao recalculados antes da juncao. O
+hash de cada arquivo e reaproveitado enquanto tamanho e mtime nao mudarem,
+como no manifesto do extract_csv.py, entao uma execucao sem mudancas so faz
+stat dos arquivos.
+
+A chave da execucao inteira (todos os experimentos + parametros) fica em
+reports_csv/experiments/analysis_cache.json: se for a mesma da ultima
+analise e os arquivos gerados ainda existirem, o relatorio em cache e
+devolvido sem gravar nada.
+
+O cache fica fora do git (.gitignore) e exige o pyarrow; sem ele tudo e
+recalculado a cada execucao.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from pathlib import Path
+
+import pandas as pd
+
+from caliper_dataset import dataset_available
+from file_hashes import file_sha256, file_fingerprint
+
+base_dir = Path(__file__).parent
+CACHE_DIR_NAME = "analysis_cache"
+KEY_NAME = "key.json"
+INDEX_NAME = "analysis_cache.json"
+CACHE_VERSION = 2
+
+# Arquivos de entrada de um experimento (em reports_csv/experiments/<experimento>/)
+INPUT_CSVS = ("caliper_performance_metrics.csv", "caliper_monitor_metrics.csv")
+# kinds do dataset Parquet lidos pela analise
+DATASET_KINDS = ("performance", "monitor")
+# Codigo que produz os agregados: mudancas nele invalidam o cache
+CODE_FILES = ("analyze-all-experiments.py", "caliper_stats.py", "node_resources.py",
+              "caliper_dataset.py", "analysis_cache.py", "file_hashes.py")
+
+def digest(obj):
+    """Hash de um objeto JSON (chaves ordenadas)"""
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str).encode()).hexdigest()
+
+def code_fingerprint():
+    return digest({name: file_sha256(base_dir / name) for name in CODE_FILES if (base_dir / name).exists()})
+
+def dataset_files(dataset_dir):
+    """Arquivos Parquet do dataset por experimento ({experimento}/{relatorio}.parquet em cada particao)"""
+    files = {}
+    for kind in DATASET_KINDS:
+        kind_dir = Path(dataset_dir) / kind
+        if kind_dir.exists():
+            for path in kind_dir.rglob("*.parquet"):
+                files.setdefault(path.parent.name, []).append(path)
+    return files
+
+def load_index(experiments_dir):
+    """Fingerprints dos arquivos de entrada e chave da ultima analise (vazio se invalido)"""
+    try:
+        with open(Path(experiments_dir) / INDEX_NAME, "r") as f:
+            index = json.load(f)
+        if index.get("version") == CACHE_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+    return {}
+
+def save_index(experiments_dir, files, run_key, outputs):
+    """Grava o indice de forma atomica (arquivo temporario + rename)"""
+    index_path = Path(experiments_dir) / INDEX_NAME
+    tmp_path = index_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"version": CACHE_VERSION, "files": files, "run_key": run_key,
+                   "outputs": [str(p) for p in outputs]}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, index_path)
+
+class AnalysisCache:
+    """
+    Chaves dos experimentos para uma execucao da analise. options sao os
+    parametros que afetam os agregados (bootstrap, IC, semente, ...).
+    """
+
+    def __init__(self, experiments_dir, dataset_dir, options):
+        self.experiments_dir = Path(experiments_dir)
+        self.options = dict(options)
+        self.index = load_index(self.experiments_dir)
+        self.code = code_fingerprint()
+        self.dataset = dataset_files(dataset_dir)
+        self.files = {}
+        self.keys = {}
+
+    def experiment_key(self, exp_dir):
+        """Chave do experimento a partir dos seus arquivos de entrada"""
+        exp_name = exp_dir.name
+        paths = [exp_dir / name for name in INPUT_CSVS if (exp_dir / name).exists()]
+        paths += sorted(self.dataset.get(exp_name, []))
+        previous = self.index.get("files", {})
+        inputs = {}
+        for path in paths:
+            name = str(path)
+            self.files[name] = file_fingerprint(path, previous.get(name))
+            inputs[name] = self.files[name]["sha256"]
+        self.keys[exp_name] = digest({"version": CACHE_VERSION, "inputs": inputs,
+                                      "options": self.options, "code": self.code})
+        return self.keys[exp_name]
+
+    def run_key(self, run_options):
+        """Chave da execucao: chaves de todos os experimentos + parametros da analise"""
+        return digest({"experiments": self.keys, "options": run_options, "code": self.code})
+
+    def unchanged(self, run_key):
+        """A ultima analise usou as mesmas entradas e os arquivos gerados ainda existem"""
+        outputs = self.index.get("outputs", [])
+        return (self.index.get("run_key") == run_key and bool(outputs)
+                and all(Path(p).exists() for p in outputs))
+
+    def load(self, exp_dir):
+        """Agregados em cache do experimento, ou None se ausentes ou com outra chave"""
+        cache_dir = exp_dir / CACHE_DIR_NAME
+        if not dataset_available():
+            return None
+        try:
+            with open(cache_dir / KEY_NAME, "r") as f:
+                cached = json.load(f)
+            if cached.get("key") != self.keys.get(exp_dir.name):
+                return None
+            return {name: pd.read_parquet(cache_dir / f"{name}.parquet") for name in cached["frames"]}
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def store(self, exp_dir, frames):
+        """Grava os agregados (Parquet) e, por ultimo, a chave que os valida"""
+        if not dataset_available():
+            return
+        cache_dir = exp_dir / CACHE_DIR_NAME
+        tmp_dir = exp_dir / (CACHE_DIR_NAME + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir()
+        for name, df in frames.items():
+            df.to_parquet(tmp_dir / f"{name}.parquet", index=False)
+        with open(tmp_dir / KEY_NAME, "w") as f:
+            json.dump({"key": self.keys[exp_dir.name], "frames": list(frames)}, f, indent=2)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        os.replace(tmp_dir, cache_dir)
+
+    def save(self, run_key, outputs):
+        save_index(self.experiments_dir, self.files, run_key, outputs)
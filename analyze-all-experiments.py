@@ -5,10 +5,19 @@ Consolida resultados e identifica melhor configuracao
 """
 
 import os
+import fnmatch
+import argparse
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import sys
 
+import caliper_dataset
+import caliper_stats
+import node_resources
+import analysis_cache
+from caliper_dataset import parse_experiment_name
+
 # Cores para output
 class Colors:
     BLUE = '\033[0;34m'
@@ -35,99 +44,577 @@ def log_section(msg):
     print(f"{Colors.CYAN}{msg}{Colors.NC}")
     print(f"{Colors.CYAN}{'='*60}{Colors.NC}")
 
-def parse_experiment_name(exp_name):
-    """Parse experiment name: 6n-5s-qbft-v25.10.0_20251112_133845 -> dict"""
-    try:
-        # Separar timestamp se existir
-        timestamp = None
-        if '_' in exp_name:
-            parts_ts = exp_name.rsplit('_', 2)
-            if len(parts_ts) == 3 and parts_ts[1].isdigit() and parts_ts[2].isdigit():
-                exp_name_base = parts_ts[0]
-                timestamp = f"{parts_ts[1]}_{parts_ts[2]}"
-            else:
-                exp_name_base = exp_name
-        else:
-            exp_name_base = exp_name
-
-        # Parse parametros
-        parts = exp_name_base.split('-')
-        nodes = int(parts[0].replace('n', ''))
-        blocktime = int(parts[1].replace('s', ''))
-        consensus = parts[2]
-        version = parts[3].replace('v', '')
-
-        result = {
-            'experiment': exp_name,
-            'experiment_base': exp_name_base,
-            'nodes': nodes,
-            'blocktime': blocktime,
-            'consensus': consensus,
-            'version': version
-        }
-
-        if timestamp:
-            result['timestamp'] = timestamp
-
-        return result
-    except:
+PERF_COLUMNS = ['Name', 'Succ', 'Fail', 'Send Rate (TPS)', 'Max Latency (s)', 'Min Latency (s)',
+                'Avg Latency (s)', 'Throughput (TPS)', 'TPS', 'Workers', 'Driver', 'Aborted']
+MON_COLUMNS = ['Name', 'TPS', 'Workers', 'Driver'] + node_resources.source_columns()
+NUMERIC_COLUMNS = [c for c in PERF_COLUMNS + MON_COLUMNS if c not in ('Name', 'Driver', 'Aborted')]
+
+# Chave de consolidacao: uma linha por experimento, workload, gerador de carga (Caliper ou
+# rpc_loadgen), workers do Caliper e TPS alvo
+GROUP_KEYS = ['experiment', 'test_type', 'driver', 'workers', 'tps']
+CONFIG_COLUMNS = ['experiment_base', 'nodes', 'blocktime', 'consensus', 'version', 'timestamp']
+
+# Uma curva de saturacao por experimento, workload, gerador de carga e workers (eixo x: TPS alvo)
+CURVE_KEYS = ['experiment', 'test_type', 'driver', 'workers']
+
+# Status da curva em que todos os pontos foram limitados pelo gerador de carga
+DRIVER_BOUND_STATUS = 'limitado pelo gerador de carga'
+
+# Comparacao baseline x candidato: pontos pareados pela configuracao da rede, workload e workers;
+# os TPS alvo sao os estratos do teste de permutacao
+MATCH_KEYS = ['nodes', 'blocktime', 'consensus', 'driver', 'workers', 'test_type']
+# Metricas comparadas: (coluna, nome, sentido da piora: -1 piora quando cai, +1 quando sobe)
+COMPARE_METRICS = (('Throughput (TPS)', 'throughput', -1), ('Avg Latency (s)', 'avg_latency', 1))
+# Variacao alem do limite sem repeticoes suficientes para o teste atingir o nivel de significancia
+INCONCLUSIVE_STATUS = 'inconclusivo'
+
+# Resumo por no levado para a tabela consolidada
+NODE_SUMMARY_COLUMNS = ['node_count', 'total_cpu', 'total_memory_gb', 'cpu_imbalance', 'cpu_hot_node',
+                        'memory_gb_imbalance', 'memory_gb_hot_node']
+
+# Metricas com media, desvio e intervalo de confianca entre as repeticoes
+CI_METRICS = {'Throughput (TPS)': 'throughput', 'Avg Latency (s)': 'avg_latency'}
+
+def load_dataset_frames(experiments=None):
+    """
+    Le de uma vez, do dataset Parquet tipado, apenas as colunas usadas na
+    analise (e apenas dos experimentos pedidos, se informados).
+    Retorna (perf_df, mon_df) ou None se o dataset nao existir.
+    """
+    if not caliper_dataset.dataset_available():
         return None
+    filters = {'experiment': list(experiments)} if experiments is not None else None
+    perf_df = caliper_dataset.load_dataset('performance', columns=['experiment', 'Test Type'] + PERF_COLUMNS,
+                                           filters=filters)
+    mon_df = caliper_dataset.load_dataset('monitor', columns=['experiment', 'Test Type'] + MON_COLUMNS,
+                                          filters=filters)
+    if perf_df.empty and mon_df.empty:
+        return None
+    # A particao test_type e o workload; o nome do relatorio fica em Test Type
+    return perf_df.rename(columns={'Test Type': 'report'}), mon_df.rename(columns={'Test Type': 'report'})
 
-def load_experiment_csvs(exp_dir):
-    """Carrega CSVs de performance e monitor de um experimento"""
-    perf_csv = exp_dir / 'caliper_performance_metrics.csv'
-    mon_csv = exp_dir / 'caliper_monitor_metrics.csv'
-
-    data = {}
-
-    if perf_csv.exists():
-        try:
-            df = pd.read_csv(perf_csv)
-
-            # Converter colunas para numerico
-            for col in ['Max Latency (s)', 'Min Latency (s)', 'Avg Latency (s)', 'Throughput (TPS)', 'Success Rate']:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-
-            # Calcular medias
-            data['avg_latency'] = df['Avg Latency (s)'].mean() if 'Avg Latency (s)' in df.columns else None
-            data['max_latency'] = df['Max Latency (s)'].mean() if 'Max Latency (s)' in df.columns else None
-            data['min_latency'] = df['Min Latency (s)'].mean() if 'Min Latency (s)' in df.columns else None
-            data['throughput'] = df['Throughput (TPS)'].mean() if 'Throughput (TPS)' in df.columns else None
-            data['success_rate'] = df['Success Rate'].mean() if 'Success Rate' in df.columns else None
-        except Exception as e:
-            log_warning(f"Erro ao ler {perf_csv}: {e}")
-
-    if mon_csv.exists():
-        try:
-            df = pd.read_csv(mon_csv)
-
-            # Converter colunas para numerico
-            cpu_col = 'CPU%(avg)'
-            mem_col_gb = 'Memory(avg) [GB]'
-            mem_col_mb = 'Memory(avg) [MB]'
-
-            for col in [cpu_col, mem_col_gb, mem_col_mb]:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-
-            # CPU
-            if cpu_col in df.columns:
-                data['avg_cpu'] = df[cpu_col].mean()
-
-            # Memoria
-            if mem_col_gb in df.columns and df[mem_col_gb].notna().sum() > 0:
-                data['avg_memory_gb'] = df[mem_col_gb].mean()
-            elif mem_col_mb in df.columns and df[mem_col_mb].notna().sum() > 0:
-                data['avg_memory_gb'] = df[mem_col_mb].mean() / 1024
+def read_metrics_csv(csv_path, exp_name):
+    """Le um CSV de metricas de um experimento e converte as colunas numericas"""
+    if not csv_path.exists():
+        return pd.DataFrame()
+    try:
+        df = pd.read_csv(csv_path)
+    except Exception as e:
+        log_warning(f"Erro ao ler {csv_path}: {e}")
+        return pd.DataFrame()
+
+    # Converter colunas para numerico
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    df['experiment'] = exp_name
+    return df.rename(columns={'Test Type': 'report'})
+
+def load_experiment_frames(exp_dir, exp_info, dataset_frames=None):
+    """
+    Carrega os DataFrames de performance e monitor de um experimento.
+    Usa o dataset Parquet tipado quando disponivel; caso contrario le os
+    CSVs e converte as colunas.
+    """
+    if dataset_frames is not None:
+        perf_all, mon_all = dataset_frames
+        perf_df = perf_all[perf_all['experiment'] == exp_info['experiment']]
+        mon_df = mon_all[mon_all['experiment'] == exp_info['experiment']]
+        if not perf_df.empty or not mon_df.empty:
+            return perf_df, mon_df
+
+    return (read_metrics_csv(exp_dir / 'caliper_performance_metrics.csv', exp_info['experiment']),
+            read_metrics_csv(exp_dir / 'caliper_monitor_metrics.csv', exp_info['experiment']))
+
+def workload_from_report(report):
+    """open_report / open_report_60_20251113-155536 -> open"""
+    return report.astype('string').str.replace(r'_report.*$', '', regex=True)
+
+def load_driver(df):
+    """
+    Gerador de carga de cada linha (coluna Driver); em CSVs extraidos antes
+    da coluna existir, deduzido do nome do relatorio (*_rpc_report_* -> rpc)
+    """
+    report = df['report'].astype('string') if 'report' in df.columns else pd.Series('', index=df.index, dtype='string')
+    fallback = report.str.contains('_rpc_report_', na=False).map({True: 'rpc', False: 'caliper'})
+    if 'Driver' not in df.columns:
+        return fallback
+    return df['Driver'].astype('string').fillna(fallback)
+
+def performance_runs(perf_df):
+    """Linhas de performance (uma por repeticao) com as colunas de GROUP_KEYS"""
+    df = perf_df.copy()
+    # Workload: label do round (coluna Name); se ausente, derivado do nome do relatorio
+    df['test_type'] = df['Name'] if 'Name' in df.columns else workload_from_report(df['report'])
+    df['driver'] = load_driver(df)
+    df['tps'] = df['TPS'] if 'TPS' in df.columns else float('nan')
+    df['workers'] = df['Workers'] if 'Workers' in df.columns else float('nan')
+    for col in ['Succ', 'Fail', 'Send Rate (TPS)', 'Max Latency (s)', 'Min Latency (s)',
+                'Avg Latency (s)', 'Throughput (TPS)', 'Aborted']:
+        if col not in df.columns:
+            df[col] = float('nan')
+    return df
+
+def aggregate_performance(perf_df, n_boot=caliper_stats.DEFAULT_BOOTSTRAP,
+                          ci_level=caliper_stats.DEFAULT_CI_LEVEL, seed=caliper_stats.DEFAULT_SEED):
+    """
+    Consolida as linhas de performance com um unico groupby por
+    (experimento, workload, TPS alvo). A taxa de sucesso vem de Succ/Fail
+    somados no grupo, e nao da media de taxas. Throughput e latencia media
+    ganham desvio padrao e intervalo de confianca (bootstrap) entre as
+    repeticoes do grupo. Rounds abortados (coluna Aborted) contam em runs e
+    aborted, sem throughput nem latencia.
+    """
+    df = performance_runs(perf_df)
+    grouped = df.groupby(GROUP_KEYS, dropna=False).agg(
+        runs=('Throughput (TPS)', 'size'),
+        send_rate=('Send Rate (TPS)', 'mean'),
+        throughput=('Throughput (TPS)', 'mean'),
+        avg_latency=('Avg Latency (s)', 'mean'),
+        max_latency=('Max Latency (s)', 'mean'),
+        min_latency=('Min Latency (s)', 'mean'),
+        succ=('Succ', 'sum'),
+        fail=('Fail', 'sum'),
+        aborted=('Aborted', 'count'),
+    ).reset_index()
+
+    total = grouped['succ'] + grouped['fail']
+    grouped['success_rate'] = (grouped['succ'] / total * 100).where(total > 0)
+
+    stats = caliper_stats.bootstrap_summary(df, GROUP_KEYS, list(CI_METRICS), n_boot, ci_level, seed)
+    renames = {}
+    for col, name in CI_METRICS.items():
+        for suffix in ('std', 'ci_low', 'ci_high'):
+            renames[f"{col}_{suffix}"] = f"{name}_{suffix}"
+    stats = stats[GROUP_KEYS + list(renames)].rename(columns=renames)
+    return grouped.merge(stats, on=GROUP_KEYS, how='left')
+
+def label_monitor(mon_df, perf_df):
+    """
+    Liga as linhas de monitor ao workload pelo relatorio de origem e
+    preenche as colunas de GROUP_KEYS.
+    """
+    df = mon_df.copy()
+    workload_map = (perf_df[['experiment', 'report', 'Name']].drop_duplicates(['experiment', 'report'])
+                    .rename(columns={'Name': 'test_type'})) if 'Name' in perf_df.columns else None
+    if workload_map is not None:
+        df = df.merge(workload_map, on=['experiment', 'report'], how='left')
+        df['test_type'] = df['test_type'].fillna(workload_from_report(df['report']))
+    else:
+        df['test_type'] = workload_from_report(df['report'])
+    df['driver'] = load_driver(df)
+    df['tps'] = df['TPS'] if 'TPS' in df.columns else float('nan')
+    df['workers'] = df['Workers'] if 'Workers' in df.columns else float('nan')
+    return df
+
+def aggregate_monitor(mon_df):
+    """
+    Consolida CPU e memoria media dos nos por (experimento, workload, TPS alvo).
+    Relatorios diferentes usam unidades diferentes (ex.: memoria em [GB] ou [MB]).
+    """
+    if mon_df.empty:
+        return pd.DataFrame(columns=GROUP_KEYS + ['avg_cpu', 'avg_memory_gb'])
+
+    df = node_resources.normalize_units(mon_df)
+    df[GROUP_KEYS] = mon_df[GROUP_KEYS]
+    return df.groupby(GROUP_KEYS, dropna=False).agg(
+        avg_cpu=('cpu_avg', 'mean'),
+        avg_memory_gb=('memory_avg_gb', 'mean'),
+    ).reset_index()
+
+def node_analysis(mon_df, hot_ratio=node_resources.DEFAULT_HOT_RATIO):
+    """
+    Recursos por no: uma linha por no e ponto, o resumo de cada ponto
+    (totais da rede, desbalanceamento e no mais carregado) e os nos quentes
+    de cada experimento.
+    """
+    if mon_df.empty or 'Name' not in mon_df.columns:
+        nodes = pd.DataFrame(columns=GROUP_KEYS + ['node'] + node_resources.RESOURCE_COLUMNS)
+    else:
+        nodes = node_resources.node_points(mon_df, GROUP_KEYS)
+    if nodes.empty:
+        return (nodes, pd.DataFrame(columns=GROUP_KEYS + ['total_cpu', 'total_memory_gb']),
+                pd.DataFrame(columns=['experiment', 'node', 'metric', 'hot_points', 'points', 'mean_ratio']))
+    imbalance = node_resources.node_imbalance(nodes, GROUP_KEYS)
+    hot = node_resources.hot_nodes(nodes, ['experiment'], hot_ratio)
+    return nodes, imbalance, hot
+
+def experiment_aggregates(perf_df, mon_df, hot_ratio=node_resources.DEFAULT_HOT_RATIO, **ci_options):
+    """
+    Agregados de um experimento: performance e monitor por ponto, recursos
+    por no, resumo por ponto e nos quentes. E o que fica no cache da analise
+    (analysis_cache.py); combine_aggregates junta os de todos os experimentos.
+    """
+    if mon_df.empty:
+        mon_df = pd.DataFrame(columns=GROUP_KEYS)
+    else:
+        mon_df = label_monitor(mon_df, perf_df)
+    nodes, imbalance, hot = node_analysis(mon_df, hot_ratio)
+    return {
+        'performance': aggregate_performance(perf_df, **ci_options),
+        'monitor': aggregate_monitor(mon_df),
+        'nodes': nodes,
+        'imbalance': imbalance,
+        'hot': hot,
+    }
+
+def combine_aggregates(aggregates):
+    """Concatena, tabela a tabela, os agregados de varios experimentos"""
+    combined = {}
+    for name in aggregates[0]:
+        frames = [agg[name] for agg in aggregates if not agg[name].empty]
+        combined[name] = pd.concat(frames, ignore_index=True) if frames else aggregates[0][name]
+    return combined
+
+def consolidate(perf, mon, exp_infos, node_summary=None):
+    """Junta os agregados de performance, monitor, resumo por no e parametros do experimento em uma tabela"""
+    df = perf.merge(mon, on=GROUP_KEYS, how='left')
+    if node_summary is not None and not node_summary.empty:
+        df = df.merge(node_summary[GROUP_KEYS + NODE_SUMMARY_COLUMNS], on=GROUP_KEYS, how='left')
+        df = node_resources.efficiency(df)
+    configs = pd.DataFrame(exp_infos)
+    for col in CONFIG_COLUMNS:
+        if col not in configs.columns:
+            configs[col] = None
+    return configs[['experiment'] + CONFIG_COLUMNS].merge(df, on='experiment', how='inner')
+
+def saturation_analysis(df, send_tracking=caliper_stats.DEFAULT_SEND_TRACKING,
+                        idle_cpu=caliper_stats.DEFAULT_IDLE_CPU, **options):
+    """
+    Marca os pontos saturados da tabela consolidada e resume o ponto de
+    saturacao (joelho) de cada experimento, workload e numero de workers.
+    Pontos limitados pelo gerador de carga (envio abaixo do alvo, com a rede
+    acompanhando o que foi enviado e os nos ociosos) sao marcados em
+    driver_bound e ficam fora da capacidade.
+    """
+    df = df.copy()
+    tracking = options.get('tracking', caliper_stats.DEFAULT_TRACKING)
+    df['driver_bound'] = caliper_stats.is_driver_bound(df['tps'], df['send_rate'], df['throughput'], df['avg_cpu'],
+                                                       send_tracking, idle_cpu, tracking)
+    bound = df[df['driver_bound']]
+    points, summary = caliper_stats.saturation_points(df[~df['driver_bound']], CURVE_KEYS, **options)
+
+    bound_counts = bound.groupby(CURVE_KEYS, dropna=False).size().rename('driver_bound_points').reset_index()
+    summary = summary.merge(bound_counts, on=CURVE_KEYS, how='outer')
+    summary['driver_bound_points'] = summary['driver_bound_points'].fillna(0).astype(int)
+    summary['points'] = summary['points'].fillna(0).astype(int)
+    summary['status'] = summary['status'].fillna(DRIVER_BOUND_STATUS)
+
+    bound = bound.assign(tracking_ratio=bound['throughput'] / bound['tps'])
+    points = pd.concat([points, bound], ignore_index=True).sort_values(CURVE_KEYS + ['tps'])
+    configs = points[['experiment'] + CONFIG_COLUMNS].drop_duplicates('experiment')
+    summary = configs.merge(summary, on='experiment', how='inner')
+    summary = summary.sort_values(['test_type', 'knee_tps', 'peak_throughput'],
+                                  ascending=[True, False, False], na_position='last')
+    return points, summary.reset_index(drop=True)
+
+def curve_label(row):
+    """Experimento, com o numero de workers do Caliper quando conhecido e o gerador quando nao e o Caliper"""
+    details = []
+    if row.get('driver') == 'rpc':
+        details.append('rpc_loadgen')
+    if pd.notna(row.get('workers')):
+        details.append(f"{row['workers']:.0f} workers")
+    if not details:
+        return row['experiment']
+    return f"{row['experiment']} ({', '.join(details)})"
+
+def describe_saturation(row, write):
+    """Linha de capacidade de um experimento (tela ou arquivo)"""
+    if row['status'] == DRIVER_BOUND_STATUS:
+        write(f"  {curve_label(row)}: limitado pelo gerador de carga ({row['driver_bound_points']} ponto(s)); "
+              f"capacidade nao estimada")
+        return
+    if row['status'] == caliper_stats.UNKNOWN_BASE_STATUS:
+        write(f"  {curve_label(row)}: nenhum ponto com latencia valida (rounds abortados ou sem sucesso); "
+              f"saturacao indeterminada")
+        write(f"    Pico de throughput: {fmt(row['peak_throughput'], '.2f')} TPS")
+        return
+    if row['status'] == caliper_stats.UNKNOWN_TPS_STATUS:
+        write(f"  {curve_label(row)}: TPS alvo desconhecido (relatorio sem rateControl.tps); saturacao nao avaliada")
+        write(f"    Pico de throughput: {fmt(row['peak_throughput'], '.2f')} TPS")
+        return
+    if pd.isna(row['knee_tps']):
+        knee = f"saturado ja em {fmt(row['min_tps'], '.0f')} TPS alvo (menor TPS testado)"
+    else:
+        knee = (f"joelho em {fmt(row['knee_tps'], '.0f')} TPS alvo "
+                f"({fmt(row['knee_throughput'], '.2f')} TPS, latencia {fmt(row['knee_latency'], '.4f')}s)")
+        if pd.isna(row['first_saturated_tps']):
+            knee += f", nao saturou ate {fmt(row['max_tps'], '.0f')} TPS alvo"
+        else:
+            knee += f", satura em {fmt(row['first_saturated_tps'], '.0f')} TPS alvo"
+    write(f"  {curve_label(row)}: {knee}")
+    write(f"    Pico de throughput: {fmt(row['peak_throughput'], '.2f')} TPS | "
+          f"Max. sustentavel no SLO: {fmt(row['slo_tps'], '.0f')} TPS alvo")
+    if row['driver_bound_points']:
+        write(f"    {row['driver_bound_points']} ponto(s) limitado(s) pelo gerador de carga fora da estimativa")
+
+def best_per_workload(df):
+    """
+    Melhor configuracao de cada workload: para cada experimento toma o ponto
+    de TPS com maior throughput e ordena os experimentos por esse pico
+    (desempate pela menor latencia). Pontos limitados pelo gerador de carga
+    so entram quando o experimento nao tem nenhum outro ponto.
+    """
+    ranked = df.sort_values(['test_type', 'driver_bound', 'throughput', 'avg_latency'],
+                            ascending=[True, True, False, True])
+    peaks = ranked.drop_duplicates(['test_type', 'experiment', 'driver'])
+    return peaks.reset_index(drop=True)
+
+def fmt(value, spec):
+    return format(value, spec) if pd.notna(value) else "N/A"
+
+def fmt_ci(row, metric, spec, ci_level):
+    """Intervalo de confianca de uma metrica, ou vazio se houver uma unica repeticao"""
+    low, high = row.get(f"{metric}_ci_low"), row.get(f"{metric}_ci_high")
+    if pd.isna(low) or pd.isna(high):
+        return ""
+    return f" [IC {ci_level:.0%}: {low:{spec}} - {high:{spec}}, desvio {row[f'{metric}_std']:{spec}}]"
+
+def describe_best(best, write, ci_level=caliper_stats.DEFAULT_CI_LEVEL):
+    """Escreve o bloco de detalhes de uma configuracao (tela ou arquivo)"""
+    write(f"Experimento: {best['experiment']}")
+    write(f"Configuracao:")
+    write(f"  Nos: {best['nodes']}")
+    write(f"  Tempo de bloco: {best['blocktime']}s")
+    write(f"  Consenso: {str(best['consensus']).upper()}")
+    write(f"  Versao Besu: {best['version']}")
+    write(f"Metricas:")
+    write(f"  TPS alvo: {fmt(best['tps'], '.0f')}")
+    if best.get('driver') == 'rpc':
+        write(f"  Gerador de carga: rpc_loadgen")
+    if pd.notna(best.get('workers')):
+        write(f"  Workers do Caliper: {best['workers']:.0f}")
+    write(f"  Repeticoes: {best['runs']}")
+    write(f"  Throughput: {fmt(best['throughput'], '.2f')} TPS{fmt_ci(best, 'throughput', '.2f', ci_level)}")
+    write(f"  Latencia media: {fmt(best['avg_latency'], '.4f')}s{fmt_ci(best, 'avg_latency', '.4f', ci_level)}")
+    if pd.notna(best.get('success_rate')):
+        write(f"  Taxa de sucesso: {best['success_rate']:.2f}%")
+    if pd.notna(best.get('avg_cpu')):
+        write(f"  CPU medio: {best['avg_cpu']:.2f}%")
+    if pd.notna(best.get('avg_memory_gb')):
+        write(f"  Memoria media: {best['avg_memory_gb']:.2f} GB")
+    if pd.notna(best.get('memory_gb_imbalance')) or pd.notna(best.get('cpu_imbalance')):
+        write(f"  Desbalanceamento entre {fmt(best['node_count'], '.0f')} nos (max/mediana): "
+              f"CPU {fmt(best['cpu_imbalance'], '.2f')}x ({best['cpu_hot_node']}), "
+              f"memoria {fmt(best['memory_gb_imbalance'], '.2f')}x ({best['memory_gb_hot_node']})")
+    if pd.notna(best.get('tps_per_cpu')) or pd.notna(best.get('tps_per_gb')):
+        write(f"  Eficiencia: {fmt(best['tps_per_cpu'], '.2f')} TPS por % de CPU, "
+              f"{fmt(best['tps_per_gb'], '.2f')} TPS por GB (somados sobre os nos)")
+    if best.get('driver_bound'):
+        write(f"  AVISO: limitado pelo gerador de carga (envio {fmt(best['send_rate'], '.2f')} TPS para "
+              f"{fmt(best['tps'], '.0f')} TPS alvo, CPU dos nos {fmt(best['avg_cpu'], '.2f')}%); "
+              f"nao representa a capacidade da rede")
+
+def select_experiments(exp_infos, spec):
+    """
+    Experimentos de um conjunto da comparacao: padrao do nome (ex.:
+    '6n-5s-qbft-v24.7.0_*') ou filtros chave=valor separados por virgula
+    (ex.: 'version=24.7.0,nodes=6').
+    """
+    if '=' in spec:
+        filters = dict(item.split('=', 1) for item in spec.split(','))
+        return {info['experiment'] for info in exp_infos
+                if all(str(info.get(k.strip())) == v.strip() for k, v in filters.items())}
+    return {info['experiment'] for info in exp_infos if fnmatch.fnmatch(info['experiment'], spec)}
+
+def compare_sets(runs, baseline, candidate, n_perm=caliper_stats.DEFAULT_PERMUTATIONS,
+                 seed=caliper_stats.DEFAULT_SEED, alpha=caliper_stats.DEFAULT_ALPHA,
+                 max_regression=caliper_stats.DEFAULT_MAX_REGRESSION):
+    """
+    Compara as repeticoes do baseline e do candidato (conjuntos de nomes de
+    experimento) para cada configuracao e workload em comum (MATCH_KEYS),
+    com os pontos de TPS alvo como estratos. Para throughput e latencia
+    media: variacao relativa media entre os pontos, g de Hedges medio,
+    p do teste de permutacao e se a piora passou de max_regression.
+
+    Sem repeticoes suficientes para o teste atingir alpha, uma variacao
+    alem do limite fica como INCONCLUSIVE_STATUS (nao e regressao testada);
+    worsened indica se ela e uma piora.
+    """
+    runs = runs[runs['experiment'].isin(baseline | candidate)]
+    rows = []
+    for key, group in runs.groupby(MATCH_KEYS, dropna=False):
+        is_base = group['experiment'].isin(baseline)
+        for col, metric, worse in COMPARE_METRICS:
+            strata, changes, effects = [], [], []
+            for _, point in group.groupby('tps', dropna=False):
+                base = point.loc[is_base[point.index], col].dropna().to_numpy()
+                cand = point.loc[~is_base[point.index], col].dropna().to_numpy()
+                if len(base) == 0 or len(cand) == 0:
+                    continue
+                strata.append((base, cand))
+                changes.append(cand.mean() / base.mean() - 1 if base.mean() else np.nan)
+                effects.append(caliper_stats.hedges_g(base, cand))
+            if not strata:
+                continue
+            _, p_value, combinations = caliper_stats.stratified_permutation_test(strata, n_perm, seed)
+            change = np.nanmean(changes) if not np.all(np.isnan(changes)) else np.nan
+            testable = combinations > 0 and 2 / combinations <= alpha
+            worsened = worse * change > max_regression
+            improved = worse * change < -max_regression
+            if (worsened or improved) and not testable:
+                status = INCONCLUSIVE_STATUS
+            elif worsened and p_value < alpha:
+                status = 'REGRESSAO'
+            elif worsened:
+                status = 'piora nao significativa'
+            elif improved and p_value < alpha:
+                status = 'melhora'
             else:
-                data['avg_memory_gb'] = None
-        except Exception as e:
-            log_warning(f"Erro ao ler {mon_csv}: {e}")
+                status = 'sem mudanca relevante'
+            rows.append({
+                **dict(zip(MATCH_KEYS, key)),
+                'metric': metric,
+                'points': len(strata),
+                'baseline_runs': sum(len(b) for b, _ in strata),
+                'candidate_runs': sum(len(c) for _, c in strata),
+                'baseline_mean': np.mean([b.mean() for b, _ in strata]),
+                'candidate_mean': np.mean([c.mean() for _, c in strata]),
+                'change': change,
+                'hedges_g': np.nanmean(effects) if not np.all(np.isnan(effects)) else np.nan,
+                'p_value': p_value,
+                'testable': testable,
+                'worsened': worsened,
+                'status': status,
+            })
+    return pd.DataFrame(rows)
+
+def exclude_driver_bound(runs, mon_df, send_tracking=caliper_stats.DEFAULT_SEND_TRACKING,
+                         idle_cpu=caliper_stats.DEFAULT_IDLE_CPU, tracking=caliper_stats.DEFAULT_TRACKING):
+    """
+    Remove as repeticoes dos pontos limitados pelo gerador de carga, com o
+    mesmo criterio de saturation_analysis sobre a media de cada ponto.
+    Retorna (repeticoes, numero de pontos removidos).
+    """
+    if mon_df.empty:
+        return runs, 0
+    points = runs.groupby(GROUP_KEYS, dropna=False).agg(
+        send_rate=('Send Rate (TPS)', 'mean'),
+        throughput=('Throughput (TPS)', 'mean'),
+    ).reset_index()
+    points = points.merge(aggregate_monitor(label_monitor(mon_df, runs)), on=GROUP_KEYS, how='left')
+    bound = caliper_stats.is_driver_bound(points['tps'], points['send_rate'], points['throughput'],
+                                          points['avg_cpu'], send_tracking, idle_cpu, tracking)
+    bound_keys = points.loc[bound, GROUP_KEYS].assign(driver_bound=True)
+    runs = runs.merge(bound_keys, on=GROUP_KEYS, how='left')
+    return runs[runs['driver_bound'].isna()].drop(columns='driver_bound'), int(bound.sum())
+
+def run_compare(args, perf_all, mon_all, exp_infos, experiments_dir):
+    """Modo --baseline/--candidate: tabela de diferencas e codigo de saida do gate de regressao"""
+    baseline = select_experiments(exp_infos, args.baseline)
+    candidate = select_experiments(exp_infos, args.candidate)
+    if not baseline or not candidate:
+        log_error(f"Conjunto vazio: baseline {len(baseline)}, candidato {len(candidate)} experimentos")
+        sys.exit(1)
+    if baseline & candidate:
+        log_error(f"Experimentos no baseline e no candidato: {sorted(baseline & candidate)}")
+        sys.exit(1)
+    log_info(f"Baseline ({args.baseline}): {', '.join(sorted(baseline))}")
+    log_info(f"Candidato ({args.candidate}): {', '.join(sorted(candidate))}")
+
+    configs = pd.DataFrame(exp_infos)[['experiment', 'nodes', 'blocktime', 'consensus']]
+    runs, n_bound = exclude_driver_bound(performance_runs(perf_all), mon_all, args.send_tracking, args.idle_cpu,
+                                         args.tracking)
+    if n_bound:
+        log_warning(f"{n_bound} pontos limitados pelo gerador de carga fora da comparacao")
+    runs = runs.merge(configs, on='experiment', how='inner')
+    result = compare_sets(runs, baseline, candidate, args.permutations, args.seed, args.alpha, args.max_regression)
+    if result.empty:
+        log_error("Nenhum ponto em comum (mesmos nos, tempo de bloco, consenso, gerador de carga, workers e workload)")
+        sys.exit(1)
 
-    return data
+    log_section("COMPARACAO BASELINE x CANDIDATO")
+    log_info(f"Regressao: piora acima de {args.max_regression:.0%} com p < {args.alpha:g} "
+             f"(permutacao com {args.permutations} reamostragens por TPS alvo)")
+    display = result.copy()
+    display['config'] = display.apply(lambda r: f"{r['nodes']}n-{r['blocktime']}s-{r['consensus']}"
+                                      + (" rpc_loadgen" if r['driver'] == 'rpc' else "")
+                                      + (f" ({r['workers']:.0f} workers)" if pd.notna(r['workers']) else ""), axis=1)
+    display['runs'] = display['baseline_runs'].astype(str) + 'x' + display['candidate_runs'].astype(str)
+    display['change'] = display['change'].apply(lambda x: fmt(x * 100, '+.1f') + '%' if pd.notna(x) else 'N/A')
+    display['p_value'] = display.apply(lambda r: fmt(r['p_value'], '.4f') if r['testable'] else 'N/A (poucas repeticoes)',
+                                       axis=1)
+    for col, spec in (('baseline_mean', '.4f'), ('candidate_mean', '.4f'), ('hedges_g', '+.2f')):
+        display[col] = display[col].apply(lambda x, spec=spec: fmt(x, spec))
+    print("\n" + display[['test_type', 'config', 'metric', 'points', 'runs', 'baseline_mean', 'candidate_mean',
+                          'change', 'hedges_g', 'p_value', 'status']].to_string(index=False))
+
+    output_csv = experiments_dir / 'COMPARISON_RESULTS.csv'
+    result.to_csv(output_csv, index=False)
+    log_success(f"CSV da comparacao salvo: {output_csv}")
+
+    regressions = result[result['status'] == 'REGRESSAO']
+    inconclusive = result[(result['status'] == INCONCLUSIVE_STATUS) & result['worsened']]
+    for _, row in regressions.iterrows():
+        log_error(f"REGRESSAO em {row['test_type']} ({row['nodes']}n-{row['blocktime']}s-{row['consensus']}): "
+                  f"{row['metric']} {row['change']:+.1%}")
+    for _, row in inconclusive.iterrows():
+        report = log_error if args.fail_inconclusive else log_warning
+        report(f"Piora inconclusiva em {row['test_type']} ({row['nodes']}n-{row['blocktime']}s-{row['consensus']}): "
+               f"{row['metric']} {row['change']:+.1%} sem repeticoes suficientes para o teste")
+    if not regressions.empty or (args.fail_inconclusive and not inconclusive.empty):
+        return 1
+    log_success("Nenhuma regressao acima do limite"
+                + (" (pioras inconclusivas nao reprovam; --fail-inconclusive)" if not inconclusive.empty else ""))
+    return 0
+
+# Nomes das metricas de node_resources.IMBALANCE_METRICS nas mensagens
+NODE_METRIC_LABELS = {'cpu': 'CPU', 'memory_gb': 'memoria', 'disc_write_mb': 'escrita em disco'}
+
+def describe_hot_nodes(hot, write):
+    """Nos quentes de um experimento (tela ou arquivo)"""
+    for _, row in hot.iterrows():
+        write(f"  {row['node']}: {NODE_METRIC_LABELS.get(row['metric'], row['metric'])} "
+              f"{row['mean_ratio']:.2f}x a mediana dos nos em {row['hot_points']}/{row['points']} pontos")
 
 def main():
+    parser = argparse.ArgumentParser(description="Consolida os resultados de todos os experimentos")
+    parser.add_argument('--bootstrap', type=int, default=caliper_stats.DEFAULT_BOOTSTRAP,
+                        help=f"Reamostragens do bootstrap (padrao: {caliper_stats.DEFAULT_BOOTSTRAP})")
+    parser.add_argument('--ci', type=float, default=caliper_stats.DEFAULT_CI_LEVEL,
+                        help=f"Nivel do intervalo de confianca (padrao: {caliper_stats.DEFAULT_CI_LEVEL})")
+    parser.add_argument('--seed', type=int, default=caliper_stats.DEFAULT_SEED,
+                        help="Semente do bootstrap, para resultados reprodutiveis")
+    parser.add_argument('--tracking', type=float, default=caliper_stats.DEFAULT_TRACKING,
+                        help="Saturacao: fracao minima do TPS alvo atingida pelo throughput "
+                             f"(padrao: {caliper_stats.DEFAULT_TRACKING})")
+    parser.add_argument('--latency-factor', type=float, default=caliper_stats.DEFAULT_LATENCY_FACTOR,
+                        help="Saturacao: latencia maxima em relacao a do menor TPS da curva "
+                             f"(padrao: {caliper_stats.DEFAULT_LATENCY_FACTOR})")
+    parser.add_argument('--send-tracking', type=float, default=caliper_stats.DEFAULT_SEND_TRACKING,
+                        help="Gerador de carga: fracao minima do TPS alvo atingida pela taxa de envio "
+                             f"(padrao: {caliper_stats.DEFAULT_SEND_TRACKING})")
+    parser.add_argument('--idle-cpu', type=float, default=caliper_stats.DEFAULT_IDLE_CPU,
+                        help="Gerador de carga: CPU media dos nos (%%) abaixo da qual os nos estao ociosos "
+                             f"(padrao: {caliper_stats.DEFAULT_IDLE_CPU:g})")
+    parser.add_argument('--hot-ratio', type=float, default=node_resources.DEFAULT_HOT_RATIO,
+                        help="No quente: metrica em relacao a mediana dos nos no mesmo ponto "
+                             f"(padrao: {node_resources.DEFAULT_HOT_RATIO})")
+    parser.add_argument('--baseline', default=None,
+                        help="Comparacao: experimentos do baseline, por padrao do nome ('6n-5s-qbft-v24.7.0_*') "
+                             "ou filtros chave=valor ('version=24.7.0')")
+    parser.add_argument('--candidate', default=None, help="Comparacao: experimentos do candidato (mesmo formato)")
+    parser.add_argument('--max-regression', type=float, default=caliper_stats.DEFAULT_MAX_REGRESSION,
+                        help="Comparacao: piora relativa maxima tolerada em throughput ou latencia "
+                             f"(padrao: {caliper_stats.DEFAULT_MAX_REGRESSION})")
+    parser.add_argument('--alpha', type=float, default=caliper_stats.DEFAULT_ALPHA,
+                        help=f"Comparacao: nivel de significancia (padrao: {caliper_stats.DEFAULT_ALPHA})")
+    parser.add_argument('--fail-inconclusive', action='store_true',
+                        help="Comparacao: pioras alem do limite sem repeticoes suficientes para o teste "
+                             "tambem reprovam (saida 1)")
+    parser.add_argument('--permutations', type=int, default=caliper_stats.DEFAULT_PERMUTATIONS,
+                        help=f"Comparacao: permutacoes do teste (padrao: {caliper_stats.DEFAULT_PERMUTATIONS})")
+    parser.add_argument('--latency-slo', type=float, default=caliper_stats.DEFAULT_LATENCY_SLO,
+                        help=f"SLO de latencia media em segundos (padrao: {caliper_stats.DEFAULT_LATENCY_SLO})")
+    parser.add_argument('--force', action='store_true',
+                        help="Ignora o cache da analise e recalcula todos os experimentos")
+    args = parser.parse_args()
+    if args.bootstrap < 1 or not 0 < args.ci < 1:
+        parser.error("--bootstrap deve ser >= 1 e --ci deve estar entre 0 e 1")
+    if (args.baseline is None) != (args.candidate is None):
+        parser.error("--baseline e --candidate devem ser usados juntos")
+
     log_section("ANALISE CONSOLIDADA DE EXPERIMENTOS")
 
     # Diretorio base
@@ -148,41 +635,111 @@ def main():
 
     log_info(f"Encontrados {len(experiments)} experimentos")
 
-    # Coletar dados de todos experimentos
-    results = []
-
-    for exp_dir in experiments:
-        exp_name = exp_dir.name
-        log_info(f"Processando: {exp_name}")
-
+    parsed = []
+    for exp_dir in sorted(experiments):
         # Parse nome
-        exp_info = parse_experiment_name(exp_name)
+        exp_info = parse_experiment_name(exp_dir.name)
         if not exp_info:
-            log_warning(f"  Nao foi possivel parsear nome do experimento: {exp_name}")
-            continue
-
-        # Carregar CSVs
-        metrics = load_experiment_csvs(exp_dir)
-
-        if not metrics:
-            log_warning(f"  Nenhuma metrica encontrada para {exp_name}")
+            log_warning(f"  Nao foi possivel parsear nome do experimento: {exp_dir.name}")
             continue
+        parsed.append((exp_dir, exp_info))
+
+    # Modo comparacao: gate de regressao do candidato em relacao ao baseline (sem cache)
+    if args.baseline is not None:
+        dataset_frames = load_dataset_frames()
+        perf_frames, mon_frames, exp_infos = [], [], []
+        for exp_dir, exp_info in parsed:
+            perf_df, mon_df = load_experiment_frames(exp_dir, exp_info, dataset_frames)
+            if perf_df.empty:
+                log_warning(f"  Nenhuma metrica encontrada para {exp_info['experiment']}")
+                continue
+            exp_infos.append(exp_info)
+            perf_frames.append(perf_df)
+            if not mon_df.empty:
+                mon_frames.append(mon_df)
+        if not exp_infos:
+            log_error("Nenhum resultado valido encontrado")
+            sys.exit(1)
+        mon_all = pd.concat(mon_frames, ignore_index=True) if mon_frames else pd.DataFrame()
+        sys.exit(run_compare(args, pd.concat(perf_frames, ignore_index=True), mon_all, exp_infos, experiments_dir))
+
+    # Cache dos agregados por experimento, pela chave dos arquivos de entrada
+    ci_options = {'n_boot': args.bootstrap, 'ci_level': args.ci, 'seed': args.seed}
+    cache = analysis_cache.AnalysisCache(experiments_dir, caliper_dataset.DATASET_DIR,
+                                         dict(ci_options, hot_ratio=args.hot_ratio))
+    for exp_dir, _ in parsed:
+        cache.experiment_key(exp_dir)
+    run_key = cache.run_key({k: v for k, v in vars(args).items() if k != 'force'})
+
+    # Mesmas entradas e parametros da ultima analise: devolve o relatorio sem gravar nada
+    if not args.force and cache.unchanged(run_key):
+        report_path = experiments_dir / 'ANALYSIS_REPORT.txt'
+        log_success("Entradas e parametros iguais aos da ultima analise: nada recalculado nem gravado")
+        print("\n" + report_path.read_text())
+        log_info(f"Relatorio em cache: {report_path} (--force recalcula)")
+        return
+
+    cached = {}
+    for exp_dir, exp_info in parsed:
+        frames = None if args.force else cache.load(exp_dir)
+        if frames is not None:
+            cached[exp_info['experiment']] = frames
+    stale = [exp_info['experiment'] for _, exp_info in parsed if exp_info['experiment'] not in cached]
+    log_info(f"{len(cached)} experimentos reaproveitados do cache, {len(stale)} a recalcular")
+
+    # Dataset Parquet tipado (gerado pelo extract_csv.py), se existir: apenas os experimentos a recalcular
+    dataset_frames = load_dataset_frames(stale) if stale else None
+    if dataset_frames is not None:
+        log_info(f"Lendo metricas do dataset Parquet: {caliper_dataset.DATASET_DIR}")
+
+    # Agregados de cada experimento (do cache ou recalculados)
+    exp_infos = []
+    aggregates = []
+
+    for exp_dir, exp_info in parsed:
+        exp_name = exp_info['experiment']
+        frames = cached.get(exp_name)
+        if frames is None:
+            # Carregar metricas
+            perf_df, mon_df = load_experiment_frames(exp_dir, exp_info, dataset_frames)
+
+            if perf_df.empty:
+                log_warning(f"  Nenhuma metrica encontrada para {exp_name}")
+                continue
+
+            frames = experiment_aggregates(perf_df, mon_df, args.hot_ratio, **ci_options)
+            cache.store(exp_dir, frames)
+
+        exp_infos.append(exp_info)
+        aggregates.append(frames)
+
+    if not exp_infos:
+        log_error("Nenhum resultado valido encontrado")
+        sys.exit(1)
 
-        # Combinar informacoes
-        result = {**exp_info, **metrics}
-        results.append(result)
+    combined = combine_aggregates(aggregates)
 
-        log_success(f"  Metricas carregadas: throughput={metrics.get('throughput', 'N/A'):.2f} TPS")
+    # Recursos de cada no: desbalanceamento e nos quentes
+    nodes_df, imbalance_df, hot_df = combined['nodes'], combined['imbalance'], combined['hot']
 
-    if not results:
-        log_error("Nenhum resultado valido encontrado")
-        sys.exit(1)
+    # Uma linha por (experimento, workload, TPS alvo)
+    df = consolidate(combined['performance'], combined['monitor'], exp_infos, imbalance_df)
+    log_success(f"{len(exp_infos)} experimentos, {len(df)} pontos (experimento x workload x TPS)")
 
-    # Criar DataFrame
-    df = pd.DataFrame(results)
+    # Ponto de saturacao de cada curva TPS alvo x throughput x latencia
+    df, saturation_df = saturation_analysis(df, send_tracking=args.send_tracking, idle_cpu=args.idle_cpu,
+                                            tracking=args.tracking, latency_factor=args.latency_factor,
+                                            latency_slo=args.latency_slo)
+    n_bound = int(df['driver_bound'].sum())
+    if n_bound:
+        log_warning(f"{n_bound} pontos limitados pelo gerador de carga (envio < {args.send_tracking:.0%} do alvo, "
+                    f"throughput >= {args.tracking:.0%} do envio e CPU dos nos < {args.idle_cpu:g}%): "
+                    f"fora da capacidade")
 
-    # Ordenar por throughput (decrescente) e latencia (crescente)
-    df_sorted = df.sort_values(by=['throughput', 'avg_latency'], ascending=[False, True])
+    # Ordenar por workload, throughput (decrescente) e latencia (crescente)
+    df_sorted = df.sort_values(by=['test_type', 'throughput', 'avg_latency'], ascending=[True, False, True])
+    best_df = best_per_workload(df)
+    workloads = sorted(df['test_type'].dropna().unique())
 
     # ==========================================
     # EXIBIR RESULTADOS
@@ -191,8 +748,9 @@ def main():
     log_section("TABELA COMPARATIVA DE RESULTADOS")
 
     # Selecionar colunas para display
-    display_cols = ['experiment', 'nodes', 'blocktime', 'consensus', 'version',
-                   'throughput', 'avg_latency', 'success_rate', 'avg_cpu', 'avg_memory_gb']
+    display_cols = ['experiment', 'test_type', 'driver', 'workers', 'tps', 'nodes', 'blocktime', 'consensus', 'version',
+                    'send_rate', 'throughput', 'avg_latency', 'success_rate', 'avg_cpu', 'avg_memory_gb',
+                    'driver_bound']
 
     # Filtrar colunas que existem
     display_cols = [col for col in display_cols if col in df_sorted.columns]
@@ -200,16 +758,11 @@ def main():
     # Formatar valores
     df_display = df_sorted[display_cols].copy()
 
-    if 'throughput' in df_display.columns:
-        df_display['throughput'] = df_display['throughput'].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "N/A")
-    if 'avg_latency' in df_display.columns:
-        df_display['avg_latency'] = df_display['avg_latency'].apply(lambda x: f"{x:.4f}" if pd.notna(x) else "N/A")
-    if 'success_rate' in df_display.columns:
-        df_display['success_rate'] = df_display['success_rate'].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "N/A")
-    if 'avg_cpu' in df_display.columns:
-        df_display['avg_cpu'] = df_display['avg_cpu'].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "N/A")
-    if 'avg_memory_gb' in df_display.columns:
-        df_display['avg_memory_gb'] = df_display['avg_memory_gb'].apply(lambda x: f"{x:.2f}" if pd.notna(x) else "N/A")
+    formats = {'workers': '.0f', 'tps': '.0f', 'send_rate': '.2f', 'throughput': '.2f', 'avg_latency': '.4f', 'success_rate': '.2f',
+               'avg_cpu': '.2f', 'avg_memory_gb': '.2f'}
+    for col, spec in formats.items():
+        if col in df_display.columns:
+            df_display[col] = df_display[col].apply(lambda x, spec=spec: fmt(x, spec))
 
     print("\n" + df_display.to_string(index=False))
 
@@ -217,27 +770,29 @@ def main():
     # IDENTIFICAR MELHOR CONFIGURACAO
     # ==========================================
 
-    log_section("MELHOR CONFIGURACAO")
-
-    # Criterio: maior throughput
-    best = df_sorted.iloc[0]
-
-    print(f"\nExperimento: {best['experiment']}")
-    print(f"Configuracao:")
-    print(f"  Nos: {best['nodes']}")
-    print(f"  Tempo de bloco: {best['blocktime']}s")
-    print(f"  Consenso: {best['consensus'].upper()}")
-    print(f"  Versao Besu: {best['version']}")
-    print(f"\nMetricas:")
-    print(f"  Throughput: {best['throughput']:.2f} TPS")
-    print(f"  Latencia media: {best['avg_latency']:.4f}s")
-
-    if 'success_rate' in best and pd.notna(best['success_rate']):
-        print(f"  Taxa de sucesso: {best['success_rate']:.2f}%")
-    if 'avg_cpu' in best and pd.notna(best['avg_cpu']):
-        print(f"  CPU medio: {best['avg_cpu']:.2f}%")
-    if 'avg_memory_gb' in best and pd.notna(best['avg_memory_gb']):
-        print(f"  Memoria media: {best['avg_memory_gb']:.2f} GB")
+    log_section("MELHOR CONFIGURACAO POR WORKLOAD")
+
+    # Criterio: maior throughput dentro de cada workload
+    for workload in workloads:
+        best = best_df[best_df['test_type'] == workload].iloc[0]
+        print(f"\n[{workload}]")
+        describe_best(best, print, args.ci)
+
+    log_section("CAPACIDADE (PONTO DE SATURACAO)")
+    log_info(f"Criterio: throughput < {args.tracking:.0%} do alvo ou latencia > {args.latency_factor:g}x "
+             f"a do menor TPS; SLO de latencia: {args.latency_slo:g}s")
+    for workload in workloads:
+        print(f"\n[{workload}]")
+        for _, row in saturation_df[saturation_df['test_type'] == workload].iterrows():
+            describe_saturation(row, print)
+
+    log_section("RECURSOS POR NO")
+    log_info(f"No quente: metrica >= {args.hot_ratio:g}x a mediana dos nos no mesmo ponto")
+    if hot_df.empty:
+        log_info("Nenhum no quente encontrado")
+    for exp_name, hot in hot_df.groupby('experiment', sort=True):
+        print(f"\n[{exp_name}]")
+        describe_hot_nodes(hot, print)
 
     # ==========================================
     # SALVAR RESULTADOS
@@ -258,74 +813,89 @@ def main():
     df_sorted.to_csv(output_csv_latest, index=False)
     log_success(f"CSV latest salvo: {output_csv_latest}")
 
+    # Capacidade de cada experimento e workload
+    output_sat = base_dir / 'reports_csv' / 'experiments' / f'SATURATION_RESULTS_{analysis_timestamp}.csv'
+    saturation_df.to_csv(output_sat, index=False)
+    output_sat_latest = base_dir / 'reports_csv' / 'experiments' / 'SATURATION_RESULTS.csv'
+    saturation_df.to_csv(output_sat_latest, index=False)
+    log_success(f"CSV de saturacao salvo: {output_sat}")
+
+    # Recursos por no (unidades normalizadas) e resumo por ponto
+    output_nodes = base_dir / 'reports_csv' / 'experiments' / 'NODE_RESOURCES.csv'
+    nodes_df.to_csv(output_nodes, index=False)
+    output_imbalance = base_dir / 'reports_csv' / 'experiments' / 'NODE_IMBALANCE.csv'
+    imbalance_df.to_csv(output_imbalance, index=False)
+    log_success(f"CSVs por no salvos: {output_nodes.name}, {output_imbalance.name}")
+
     # Salvar relatorio texto com timestamp
     output_txt = base_dir / 'reports_csv' / 'experiments' / f'ANALYSIS_REPORT_{analysis_timestamp}.txt'
 
     with open(output_txt, 'w') as f:
-        f.write("="*60 + "\n")
-        f.write("RELATORIO DE ANALISE DE EXPERIMENTOS\n")
-        f.write("="*60 + "\n\n")
-
-        f.write(f"Total de experimentos: {len(results)}\n")
-        f.write(f"Data da analise: {pd.Timestamp.now()}\n\n")
-
-        f.write("="*60 + "\n")
-        f.write("MELHOR CONFIGURACAO (por throughput)\n")
-        f.write("="*60 + "\n\n")
-
-        f.write(f"Experimento: {best['experiment']}\n\n")
-        f.write("Configuracao:\n")
-        f.write(f"  Nos: {best['nodes']}\n")
-        f.write(f"  Tempo de bloco: {best['blocktime']}s\n")
-        f.write(f"  Consenso: {best['consensus'].upper()}\n")
-        f.write(f"  Versao Besu: {best['version']}\n\n")
-
-        f.write("Metricas:\n")
-        f.write(f"  Throughput: {best['throughput']:.2f} TPS\n")
-        f.write(f"  Latencia media: {best['avg_latency']:.4f}s\n")
-
-        if 'success_rate' in best and pd.notna(best['success_rate']):
-            f.write(f"  Taxa de sucesso: {best['success_rate']:.2f}%\n")
-        if 'avg_cpu' in best and pd.notna(best['avg_cpu']):
-            f.write(f"  CPU medio: {best['avg_cpu']:.2f}%\n")
-        if 'avg_memory_gb' in best and pd.notna(best['avg_memory_gb']):
-            f.write(f"  Memoria media: {best['avg_memory_gb']:.2f} GB\n")
-
-        f.write("\n" + "="*60 + "\n")
-        f.write("RANKING COMPLETO (ordenado por throughput)\n")
-        f.write("="*60 + "\n\n")
-
-        for idx, row in df_sorted.iterrows():
-            f.write(f"{row['experiment']}: {row['throughput']:.2f} TPS\n")
-
-        f.write("\n" + "="*60 + "\n")
-        f.write("OBSERVACOES\n")
-        f.write("="*60 + "\n\n")
-
-        # Analise por parametro
-        f.write("Impacto do numero de nos:\n")
-        for nodes in sorted(df['nodes'].unique()):
-            subset = df[df['nodes'] == nodes]
-            avg_tps = subset['throughput'].mean()
-            f.write(f"  {nodes} nos: {avg_tps:.2f} TPS medio\n")
-
-        f.write("\nImpacto do tempo de bloco:\n")
-        for bt in sorted(df['blocktime'].unique()):
-            subset = df[df['blocktime'] == bt]
-            avg_tps = subset['throughput'].mean()
-            f.write(f"  {bt}s: {avg_tps:.2f} TPS medio\n")
-
-        f.write("\nImpacto do consenso:\n")
-        for cons in df['consensus'].unique():
-            subset = df[df['consensus'] == cons]
-            avg_tps = subset['throughput'].mean()
-            f.write(f"  {cons.upper()}: {avg_tps:.2f} TPS medio\n")
-
-        f.write("\nImpacto da versao:\n")
-        for ver in sorted(df['version'].unique()):
-            subset = df[df['version'] == ver]
-            avg_tps = subset['throughput'].mean()
-            f.write(f"  {ver}: {avg_tps:.2f} TPS medio\n")
+        write = lambda line="": f.write(line + "\n")
+
+        write("="*60)
+        write("RELATORIO DE ANALISE DE EXPERIMENTOS")
+        write("="*60 + "\n")
+
+        write(f"Total de experimentos: {len(exp_infos)}")
+        write(f"Total de pontos (experimento x workload x TPS): {len(df)}")
+        write(f"Intervalos de confianca: {args.ci:.0%}, bootstrap com {args.bootstrap} reamostragens (semente {args.seed})")
+        write(f"Data da analise: {pd.Timestamp.now()}\n")
+
+        write(f"NOS QUENTES (metrica >= {args.hot_ratio:g}x a mediana dos nos no mesmo ponto)\n")
+        if hot_df.empty:
+            write("  Nenhum no quente encontrado")
+        for exp_name, hot in hot_df.groupby('experiment', sort=True):
+            write(f"{exp_name}:")
+            describe_hot_nodes(hot, write)
+        write()
+
+        for workload in workloads:
+            subset = df[df['test_type'] == workload]
+            peaks = best_df[best_df['test_type'] == workload]
+            best = peaks.iloc[0]
+
+            write("="*60)
+            write(f"WORKLOAD: {workload}")
+            write("="*60 + "\n")
+
+            write("MELHOR CONFIGURACAO (por throughput)\n")
+            describe_best(best, write, args.ci)
+
+            write("\nRANKING (pico de throughput de cada experimento)\n")
+            for _, row in peaks.iterrows():
+                write(f"  {curve_label(row)}: {fmt(row['throughput'], '.2f')} TPS "
+                      f"@ {fmt(row['tps'], '.0f')} TPS alvo, latencia {fmt(row['avg_latency'], '.4f')}s, "
+                      f"n={row['runs']}{fmt_ci(row, 'throughput', '.2f', args.ci)}"
+                      + (" [limitado pelo gerador de carga]" if row['driver_bound'] else ""))
+
+            write("\nCAPACIDADE (ponto de saturacao)\n")
+            write(f"Criterio: throughput < {args.tracking:.0%} do alvo ou latencia > {args.latency_factor:g}x "
+                  f"a do menor TPS; SLO de latencia: {args.latency_slo:g}s")
+            for _, row in saturation_df[saturation_df['test_type'] == workload].iterrows():
+                describe_saturation(row, write)
+
+            write("\nOBSERVACOES\n")
+
+            # Analise por parametro (pico de throughput de cada experimento)
+            for col, title, label in (('nodes', 'Impacto do numero de nos', lambda v: f"{v} nos"),
+                                      ('blocktime', 'Impacto do tempo de bloco', lambda v: f"{v}s"),
+                                      ('consensus', 'Impacto do consenso', lambda v: str(v).upper()),
+                                      ('version', 'Impacto da versao', lambda v: f"{v}")):
+                write(f"{title}:")
+                for value, avg_tps in peaks.groupby(col)['throughput'].mean().sort_index().items():
+                    write(f"  {label(value)}: {avg_tps:.2f} TPS medio")
+                write()
+
+            # Escala com validadores: a eficiencia cai se os nos extras so adicionam overhead
+            if 'tps_per_cpu' in peaks.columns:
+                write("Eficiencia por numero de nos (somada sobre os nos):")
+                efficiency = peaks.groupby('nodes')[['tps_per_cpu', 'tps_per_gb', 'memory_gb_imbalance']].mean()
+                for nodes, row in efficiency.sort_index().iterrows():
+                    write(f"  {nodes} nos: {fmt(row['tps_per_cpu'], '.2f')} TPS por % de CPU, "
+                          f"{fmt(row['tps_per_gb'], '.2f')} TPS por GB, "
+                          f"desbalanceamento de memoria {fmt(row['memory_gb_imbalance'], '.2f')}x")
+                write()
 
     log_success(f"Relatorio texto salvo: {output_txt}")
 
@@ -336,6 +906,9 @@ def main():
             f_out.write(f_in.read())
     log_success(f"Relatorio latest salvo: {output_txt_latest}")
 
+    # Chave desta analise: a proxima execucao com as mesmas entradas nao grava nada
+    cache.save(run_key, [output_csv_latest, output_txt_latest, output_sat_latest, output_nodes, output_imbalance])
+
     log_section("ANALISE CONCLUIDA")
 
     log_info("Arquivos gerados:")
@@ -343,6 +916,8 @@ def main():
     log_info(f"  2. {output_txt}")
     log_info(f"  3. {output_csv_latest} (latest)")
     log_info(f"  4. {output_txt_latest} (latest)")
+    log_info(f"  5. {output_sat} ({output_sat_latest.name} latest)")
+    log_info(f"  6. {output_nodes}, {output_imbalance}")
     log_info("")
     log_success("Analise finalizada com sucesso!")
 
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos parsers de relatorio do extract_csv.py
+Compara o parser original (BeautifulSoup, arvore completa) com o parser
+streaming do lxml (apenas as tabelas necessarias): tempo de parse por
+relatorio e pico de memoria.
+
+Cada parser roda em um processo novo, para que o pico de RSS de um nao
+contamine o do outro.
+
+Uso:
+    python3 bench_extract_csv.py                  # todos os relatorios em reports_htmls/experiments
+    python3 bench_extract_csv.py --repeat 20      # mais repeticoes por relatorio
+    python3 bench_extract_csv.py caminho/*.html   # relatorios especificos
+"""
+
+import sys
+import time
+import argparse
+import resource
+import statistics
+import tracemalloc
+import multiprocessing
+from pathlib import Path
+
+import extract_csv
+
+PARSERS = {
+    "bs4": extract_csv.bs4_extract_tables,
+    "fast": extract_csv.fast_extract_tables,
+}
+
+def run_parser(name, report_files, repeat):
+    """Executa um parser sobre todos os relatorios; roda em um processo filho"""
+    parse = PARSERS[name]
+    rss_before_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    times_ms = []
+    py_peaks_kb = []
+    for html_file in report_files:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parse(html_file)
+            samples.append((time.perf_counter() - start) * 1000)
+        times_ms.append(statistics.median(samples))
+
+        # Pico de memoria alocada pelo Python durante um parse isolado
+        tracemalloc.start()
+        parse(html_file)
+        py_peaks_kb.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+
+    rss_after_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "median_ms": statistics.median(times_ms),
+        "mean_ms": statistics.mean(times_ms),
+        "max_ms": max(times_ms),
+        "py_peak_kb": max(py_peaks_kb),
+        "rss_growth_kb": rss_after_kb - rss_before_kb,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos parsers de relatorio do extract_csv.py")
+    parser.add_argument("reports", nargs="*", help="Relatorios HTML (padrao: todos em reports_htmls/experiments)")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticoes por relatorio (padrao: 5)")
+    args = parser.parse_args()
+
+    report_files = [Path(p) for p in args.reports] or sorted(extract_csv.REPORTS_DIR.glob("*/*.html"))
+    if not report_files:
+        extract_csv.log_error("Nenhum relatorio encontrado")
+        sys.exit(1)
+
+    total_kb = sum(f.stat().st_size for f in report_files) / 1024
+    extract_csv.log_info(f"{len(report_files)} relatorios ({total_kb:.0f} KB), {args.repeat} repeticoes cada")
+
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for name in PARSERS:
+        with ctx.Pool(1) as pool:
+            results[name] = pool.apply(run_parser, (name, report_files, args.repeat))
+
+    print(f"\n{'parser':<8} {'mediana (ms)':>13} {'media (ms)':>11} {'max (ms)':>9} {'pico Python (KB)':>17} {'cresc. RSS (KB)':>16}")
+    for name, r in results.items():
+        print(f"{name:<8} {r['median_ms']:>13.2f} {r['mean_ms']:>11.2f} {r['max_ms']:>9.2f} "
+              f"{r['py_peak_kb']:>17.0f} {r['rss_growth_kb']:>16}")
+
+    base, fast = results["bs4"], results["fast"]
+    print()
+    extract_csv.log_success(f"Speedup (mediana por relatorio): {base['median_ms'] / fast['median_ms']:.1f}x")
+    if fast["py_peak_kb"] > 0:
+        extract_csv.log_success(f"Reducao do pico de memoria Python: {base['py_peak_kb'] / fast['py_peak_kb']:.1f}x")
+
+if __name__ == "__main__":
+    main()
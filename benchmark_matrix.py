@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Configuracoes de benchmark geradas por execucao
+Em vez de reescrever os config-*.yaml do repositorio a cada teste, cada
+execucao recebe um diretorio proprio em runs/ com:
+  - config.yaml: o template do benchmark com os parametros da execucao
+    (tps, txNumber, workers, containers monitorados), somente leitura
+  - params.json: os parametros, o template de origem e o hash da config
+O template nunca e alterado, entao varias varreduras podem rodar lado a lado.
+
+A matriz de parametros e o produto cartesiano das listas informadas:
+    expand_matrix({"tps": [60, 80], "workers": [1, 2]}) -> 4 execucoes
+
+Uso:
+    python3 benchmark_matrix.py benchmarks/scenario-monitoring/Simple/config-open.yaml --tps 60 80 --workers 1 2
+"""
+
+import os
+import re
+import json
+import hashlib
+import argparse
+import itertools
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import yaml
+except ImportError:  # PyYAML e necessario apenas para gerar as configs
+    yaml = None
+
+base_dir = Path(__file__).parent
+RUNS_DIR = base_dir / "runs"
+
+# Parametros suportados na ordem em que aparecem no nome da execucao
+PARAMS = ("tps", "tx_number", "workers", "nodes")
+
+# Prefixo padrao dos containers dos nos
+CONTAINER_PREFIX = "/node-besu"
+
+def containers_for_nodes(nodes, prefix=CONTAINER_PREFIX):
+    """Containers monitorados de uma rede com N nos: /node-besu1 .. /node-besuN"""
+    return [f"{prefix}{i}" for i in range(1, nodes + 1)]
+
+def containers_pattern(nodes=None, prefix=CONTAINER_PREFIX):
+    """
+    Regex dos containers de uma rede, com ou sem a barra inicial do nome
+    (/exp3-node-besu + 4 nos -> exp3-node-besu1..4). Ancorada, para
+    nao amostrar os containers de outras redes (ex.: slots do experiment_scheduler.py)
+    """
+    numbers = "|".join(str(i) for i in range(1, nodes + 1)) if nodes else r"\d+"
+    return rf"^/?{re.escape(prefix.lstrip('/'))}(?:{numbers})$"
+
+def expand_matrix(matrix):
+    """{'tps': [60, 80], 'workers': [1]} -> [{'tps': 60, 'workers': 1}, {'tps': 80, 'workers': 1}]"""
+    keys = [k for k in PARAMS if matrix.get(k) is not None]
+    values = [v if isinstance(v, (list, tuple)) else [v] for v in (matrix[k] for k in keys)]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+class _NoAliasDumper(yaml.SafeDumper if yaml else object):
+    """Grava a config expandida, sem ancoras/aliases"""
+    def ignore_aliases(self, data):
+        return True
+
+def load_template(template_path):
+    if yaml is None:
+        raise RuntimeError("PyYAML nao instalado: instale com 'pip install pyyaml'")
+    with open(template_path, 'r') as f:
+        return yaml.safe_load(f)
+
+def apply_params(config, params):
+    """Aplica os parametros da execucao a config carregada do template (in place)"""
+    test = config["test"]
+    for round_cfg in test["rounds"]:
+        if params.get("tps") is not None:
+            round_cfg.setdefault("rateControl", {}).setdefault("opts", {})["tps"] = params["tps"]
+        if params.get("tx_number") is not None:
+            # No template, numberOfAccounts e txNumber sao a mesma ancora; mantem os dois iguais
+            arguments = round_cfg.get("workload", {}).get("arguments", {})
+            if arguments.get("numberOfAccounts") == round_cfg.get("txNumber"):
+                arguments["numberOfAccounts"] = params["tx_number"]
+            round_cfg["txNumber"] = params["tx_number"]
+    if params.get("workers") is not None:
+        test.setdefault("workers", {})["number"] = params["workers"]
+    if params.get("nodes") is not None:
+        for monitor in config.get("monitors", {}).get("resource", []):
+            if monitor.get("module") == "docker":
+                monitor.setdefault("options", {})["containers"] = containers_for_nodes(
+                    params["nodes"], params.get("container_prefix", CONTAINER_PREFIX))
+    return config
+
+def run_name(function_name, params):
+    """open + {'tps': 60, 'workers': 2} -> open_60tps_2w"""
+    suffixes = {"tps": "tps", "tx_number": "tx", "workers": "w", "nodes": "n"}
+    parts = [function_name] + [f"{params[k]}{suffixes[k]}" for k in PARAMS if params.get(k) is not None]
+    return "_".join(str(p) for p in parts)
+
+def render_run_config(template_path, function_name, params, runs_dir=RUNS_DIR):
+    """
+    Gera o diretorio de uma execucao com config.yaml (somente leitura) e
+    params.json. Retorna o caminho do diretorio.
+    """
+    config = apply_params(load_template(template_path), params)
+    content = yaml.dump(config, Dumper=_NoAliasDumper, sort_keys=False, default_flow_style=False)
+    digest = hashlib.sha256(content.encode()).hexdigest()
+
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    run_dir = Path(runs_dir) / function_name / f"{run_name(function_name, params)}_{timestamp}"
+    run_dir.mkdir(parents=True, exist_ok=False)
+
+    config_path = run_dir / "config.yaml"
+    tmp_path = run_dir / "config.yaml.tmp"
+    tmp_path.write_text(content)
+    os.chmod(tmp_path, 0o444)
+    os.replace(tmp_path, config_path)
+
+    metadata = {
+        "function": function_name,
+        "template": str(template_path),
+        "params": params,
+        "config_sha256": digest,
+        "created": datetime.now().isoformat(timespec="seconds"),
+    }
+    (run_dir / "params.json").write_text(json.dumps(metadata, indent=4))
+    return run_dir
+
+def record_with_report(run_dir, report_path):
+    """
+    Copia config e parametros da execucao para junto do relatorio:
+    open_report_60_<ts>.html -> open_report_60_<ts>.config.yaml / .params.json
+    """
+    run_dir = Path(run_dir)
+    report_path = Path(report_path)
+    metadata = json.loads((run_dir / "params.json").read_text())
+    metadata["report"] = str(report_path)
+    (run_dir / "params.json").write_text(json.dumps(metadata, indent=4))
+
+    stem = report_path.with_suffix("")
+    copies = []
+    for name, suffix in (("config.yaml", ".config.yaml"), ("params.json", ".params.json")):
+        target = stem.with_name(stem.name + suffix)
+        target.write_text((run_dir / name).read_text())
+        copies.append(target)
+    return copies
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera as configs de benchmark de uma matriz de parametros")
+    parser.add_argument("template", help="config-*.yaml usado como template")
+    parser.add_argument("--function", default=None, help="Nome da funcao (padrao: label do primeiro round)")
+    parser.add_argument("--tps", type=int, nargs="+")
+    parser.add_argument("--tx-number", type=int, nargs="+")
+    parser.add_argument("--workers", type=int, nargs="+")
+    parser.add_argument("--nodes", type=int, nargs="+", help="Monitora os containers /node-besu1..N")
+    args = parser.parse_args()
+
+    function_name = args.function or load_template(args.template)["test"]["rounds"][0]["label"]
+    matrix = {"tps": args.tps, "tx_number": args.tx_number, "workers": args.workers, "nodes": args.nodes}
+    for params in expand_matrix(matrix):
+        print(render_run_config(args.template, function_name, params))
+
+if __name__ == "__main__":
+    main()
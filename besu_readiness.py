@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Verificacoes de prontidao da rede Besu entre execucoes do Caliper
+Substitui as esperas fixas (sleep) do run_testes_simple.py por sondagens:
+  - RPC respondendo (eth_blockNumber) em uma conexao HTTP keep-alive
+  - blocos avancando (eth_blockNumber crescente)
+  - txpool vazio (txpool_besuStatistics, ou o bloco "pending" como fallback)
+  - porta WebSocket livre: aceitando conexoes e sem conexoes do Caliper
+    anterior ainda abertas (lidas de /proc/net/tcp)
+Cada espera retorna assim que a condicao e satisfeita, ou False no prazo.
+
+Uso:
+    python3 besu_readiness.py                  # espera a rede ficar quieta
+    python3 besu_readiness.py --timeout 120 --progress
+"""
+
+import json
+import time
+import socket
+import argparse
+import http.client
+from pathlib import Path
+from urllib.parse import urlparse
+
+base_dir = Path(__file__).parent
+
+RPC_URL = "http://127.0.0.1:8545"
+NETWORK_CONFIG = base_dir / "networks" / "besu" / "networkconfig.json"
+
+DEFAULT_TIMEOUT = 60       # prazo padrao de cada espera (s)
+POLL_INTERVAL = 0.5        # intervalo entre sondagens (s)
+REQUEST_TIMEOUT = 5        # timeout de cada chamada JSON-RPC (s)
+
+# Estados TCP de /proc/net/tcp que indicam conexao ainda nao encerrada
+# (ESTABLISHED, FIN_WAIT1, FIN_WAIT2, CLOSE_WAIT, LAST_ACK, CLOSING)
+OPEN_TCP_STATES = {"01", "04", "05", "08", "09", "0B"}
+
+class RpcError(Exception):
+    """Erro retornado pelo no ou falha de comunicacao JSON-RPC"""
+
+class RpcClient:
+    """Cliente JSON-RPC sobre uma unica conexao HTTP keep-alive (reaberta se cair)"""
+
+    def __init__(self, url=RPC_URL, timeout=REQUEST_TIMEOUT):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 8545
+        self.path = parsed.path or "/"
+        self.timeout = timeout
+        self.conn = None
+        self.next_id = 1
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def _post(self, payload, label):
+        # Uma nova tentativa com conexao nova se a conexao keep-alive foi fechada pelo no
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request("POST", self.path, body=json.dumps(payload),
+                                  headers={"Content-Type": "application/json", "Connection": "keep-alive"})
+                response = self.conn.getresponse()
+                body = response.read()
+                break
+            except (OSError, http.client.HTTPException) as e:
+                self.close()
+                if attempt == 1:
+                    raise RpcError(f"{label}: {e}") from e
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise RpcError(f"{label}: resposta invalida (HTTP {response.status})") from e
+
+    def call(self, method, params=None):
+        data = self._post({"jsonrpc": "2.0", "method": method, "params": params or [], "id": self.next_id}, method)
+        self.next_id += 1
+        if "error" in data:
+            raise RpcError(f"{method}: {data['error'].get('message', data['error'])}")
+        return data.get("result")
+
+    def batch(self, calls):
+        """
+        Varias chamadas [(metodo, params)] em uma unica requisicao JSON-RPC
+        (lote); retorna os resultados na ordem das chamadas.
+        """
+        if not calls:
+            return []
+        first_id = self.next_id
+        self.next_id += len(calls)
+        payload = [{"jsonrpc": "2.0", "method": method, "params": params or [], "id": first_id + i}
+                   for i, (method, params) in enumerate(calls)]
+        label = f"lote de {len(calls)} ({calls[0][0]})"
+        data = self._post(payload, label)
+        if not isinstance(data, list):
+            # Lote rejeitado inteiro (ex.: limite de tamanho do no)
+            error = data.get("error", data) if isinstance(data, dict) else data
+            raise RpcError(f"{label}: {error.get('message', error) if isinstance(error, dict) else error}")
+        results = {}
+        for item in data:
+            if "error" in item:
+                method = calls[item["id"] - first_id][0] if isinstance(item.get("id"), int) else label
+                raise RpcError(f"{method}: {item['error'].get('message', item['error'])}")
+            results[item["id"]] = item.get("result")
+        return [results.get(first_id + i) for i in range(len(calls))]
+
+    def block_number(self):
+        return int(self.call("eth_blockNumber"), 16)
+
+    def pending_transactions(self):
+        """
+        Transacoes ainda no txpool. Usa txpool_besuStatistics (API TXPOOL
+        habilitada) e, se indisponivel, o numero de transacoes do bloco pending.
+        """
+        try:
+            stats = self.call("txpool_besuStatistics")
+            return int(stats.get("localCount", 0)) + int(stats.get("remoteCount", 0))
+        except RpcError:
+            block = self.call("eth_getBlockByNumber", ["pending", False])
+            return len(block.get("transactions", [])) if block else 0
+
+def ws_url_from_config(config_path=NETWORK_CONFIG):
+    """URL WebSocket usada pelo Caliper (networkconfig.json)"""
+    with open(config_path, 'r') as f:
+        return json.load(f)["ethereum"]["url"]
+
+def open_connections_to_port(port):
+    """
+    Conexoes TCP locais ainda abertas para a porta (lado cliente ou servidor).
+    Retorna None se /proc/net/tcp nao estiver disponivel (ex.: macOS).
+    """
+    port_hex = f"{port:04X}"
+    count = 0
+    found = False
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table, 'r') as f:
+                lines = f.readlines()[1:]
+        except OSError:
+            continue
+        found = True
+        for line in lines:
+            fields = line.split()
+            local_port = fields[1].rsplit(":", 1)[1]
+            remote_port = fields[2].rsplit(":", 1)[1]
+            # Conexoes em LISTEN tem estado 0A e nao entram na contagem
+            if fields[3] in OPEN_TCP_STATES and port_hex in (local_port, remote_port):
+                count += 1
+    return count if found else None
+
+def port_accepting(host, port, timeout=1.0):
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+class Readiness:
+    """Sondagens de prontidao de um no Besu (RPC HTTP + porta WebSocket do Caliper)"""
+
+    def __init__(self, rpc_url=RPC_URL, ws_url=None, poll_interval=POLL_INTERVAL):
+        self.rpc = RpcClient(rpc_url)
+        ws = urlparse(ws_url) if ws_url else None
+        self.ws_host = ws.hostname if ws else None
+        self.ws_port = ws.port if ws else None
+        self.poll_interval = poll_interval
+
+    def close(self):
+        self.rpc.close()
+
+    def _poll(self, check, timeout):
+        """Executa check() ate retornar True ou o prazo acabar"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if check():
+                    return True
+            except RpcError:
+                pass
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+
+    def wait_for_rpc(self, timeout=DEFAULT_TIMEOUT):
+        """Espera o no responder eth_blockNumber"""
+        return self._poll(lambda: self.rpc.block_number() is not None, timeout)
+
+    def wait_for_blocks(self, count=1, timeout=DEFAULT_TIMEOUT):
+        """Espera a producao de `count` blocos novos"""
+        state = {}
+
+        def check():
+            current = self.rpc.block_number()
+            start = state.setdefault("start", current)
+            return current - start >= count
+        return self._poll(check, timeout)
+
+    def wait_for_txpool(self, timeout=DEFAULT_TIMEOUT):
+        """Espera o txpool esvaziar"""
+        return self._poll(lambda: self.rpc.pending_transactions() == 0, timeout)
+
+    def wait_for_ws_port(self, timeout=DEFAULT_TIMEOUT):
+        """Espera a porta WebSocket aceitar conexoes e ficar sem conexoes abertas"""
+        if self.ws_port is None:
+            return True
+
+        def check():
+            # Conta antes de sondar, para nao contar a propria conexao de teste
+            open_conns = open_connections_to_port(self.ws_port)
+            if open_conns:
+                return False
+            return port_accepting(self.ws_host, self.ws_port)
+        return self._poll(check, timeout)
+
+    def wait_until_quiescent(self, timeout=DEFAULT_TIMEOUT, progress=False):
+        """
+        Espera a rede ficar pronta para a proxima execucao: RPC respondendo,
+        txpool vazio, porta WebSocket livre e, com progress=True, ao menos um
+        bloco novo. Todas as etapas compartilham o mesmo prazo.
+        Retorna (pronto, etapa que estourou o prazo ou None).
+        """
+        deadline = time.monotonic() + timeout
+        remaining = lambda: max(0.0, deadline - time.monotonic())
+
+        steps = [("rpc", self.wait_for_rpc)]
+        if progress:
+            steps.append(("blocos", self.wait_for_blocks))
+        steps += [("txpool", self.wait_for_txpool), ("websocket", self.wait_for_ws_port)]
+
+        for name, wait in steps:
+            if not wait(timeout=remaining()):
+                return False, name
+        return True, None
+
+def main():
+    parser = argparse.ArgumentParser(description="Espera a rede Besu ficar pronta para o proximo benchmark")
+    parser.add_argument("--rpc-url", default=RPC_URL, help=f"Endpoint JSON-RPC HTTP (padrao: {RPC_URL})")
+    parser.add_argument("--ws-url", default=None, help="Endpoint WebSocket (padrao: o do networkconfig.json)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help=f"Prazo em segundos (padrao: {DEFAULT_TIMEOUT})")
+    parser.add_argument("--progress", action="store_true", help="Exige ao menos um bloco novo")
+    args = parser.parse_args()
+
+    ws_url = args.ws_url or ws_url_from_config()
+    readiness = Readiness(args.rpc_url, ws_url)
+    start = time.monotonic()
+    ready, step = readiness.wait_until_quiescent(args.timeout, progress=args.progress)
+    readiness.close()
+    if ready:
+        print(f"Rede pronta em {time.monotonic() - start:.1f}s")
+    else:
+        print(f"ERRO: prazo de {args.timeout:g}s esgotado aguardando: {step}")
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Metricas por bloco da faixa de blocos de cada round
+O resumo do Caliper da um unico throughput por round, mas no QBFT/IBFT o
+comportamento real e por bloco: blocos vazios, blocos cheios, trocas de
+round do consenso. Depois de cada round, a faixa de blocos do round (os
+blocos com timestamp entre o inicio e o fim do round, sem o startup do
+Caliper nem a espera pela rede ociosa) e lida
+com eth_getBlockByNumber e eth_getTransactionReceipt em lotes JSON-RPC sobre
+uma unica conexao keep-alive (RpcClient), e cada bloco vira uma linha:
+transacoes (e falhas pelos recibos), uso de gas, intervalo desde o bloco
+anterior, TPS do bloco e round do consenso (extraData do QBFT/IBFT 2.0).
+
+O resumo do round mostra qual e o teto: gas limit (blocos cheios),
+consenso (trocas de round, blocos atrasados) ou tempo de bloco (blocos do
+mesmo tamanho maximo abaixo do gas limit).
+
+Estrutura: {relatorio}.blocks.csv junto de cada relatorio (gravado pelo
+run_testes_simple.py); por experimento, block_metrics.csv e block_summary.csv
+em reports_csv/experiments/{experiment_name}/
+
+Uso:
+    python3 block_analytics.py collect --from 120 --to 180 --blocktime 2
+    python3 block_analytics.py                    # todos os experimentos
+"""
+
+import sys
+import math
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+from besu_readiness import RpcClient, RpcError, RPC_URL
+from caliper_dataset import parse_experiment_name
+
+# Cores para output
+class Colors:
+    BLUE = '\033[0;34m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    RED = '\033[0;31m'
+    NC = '\033[0m'
+
+def log_info(msg):
+    print(f"{Colors.BLUE}[INFO]{Colors.NC} {msg}")
+
+def log_success(msg):
+    print(f"{Colors.GREEN}[OK]{Colors.NC} {msg}")
+
+def log_warning(msg):
+    print(f"{Colors.YELLOW}[WARN]{Colors.NC} {msg}")
+
+def log_error(msg):
+    print(f"{Colors.RED}[ERROR]{Colors.NC} {msg}")
+
+base_dir = Path(__file__).parent
+REPORTS_DIR = base_dir / "reports_htmls" / "experiments"
+OUTPUT_DIR = base_dir / "reports_csv" / "experiments"
+METRICS_CSV_NAME = "block_metrics.csv"
+SUMMARY_CSV_NAME = "block_summary.csv"
+BLOCKS_SUFFIX = ".blocks.csv"
+
+DEFAULT_BATCH_SIZE = 50        # chamadas por lote JSON-RPC
+FULL_BLOCK_UTILIZATION = 0.95  # bloco cheio: gasUsed >= 95% do gasLimit
+LATE_BLOCK_FACTOR = 1.5        # bloco atrasado: intervalo > 1.5x o tempo de bloco
+CEILING_SHARE = 0.5            # fracao dos blocos com carga que caracteriza o teto
+
+BLOCK_COLUMNS = ["number", "timestamp", "interval_s", "tx_count", "failed_txs", "gas_used", "gas_limit",
+                 "gas_utilization", "block_tps", "consensus_round", "size"]
+
+def rlp_decode(data):
+    """Decodifica um item RLP (bytes ou lista aninhada); retorna (item, resto)"""
+    prefix = data[0]
+    if prefix < 0x80:
+        return data[:1], data[1:]
+    if prefix < 0xb8:
+        return data[1:1 + prefix - 0x80], data[1 + prefix - 0x80:]
+    if prefix < 0xc0:
+        size = prefix - 0xb7
+        length = int.from_bytes(data[1:1 + size], "big")
+        return data[1 + size:1 + size + length], data[1 + size + length:]
+    if prefix < 0xf8:
+        length, offset = prefix - 0xc0, 1
+    else:
+        size = prefix - 0xf7
+        length, offset = int.from_bytes(data[1:1 + size], "big"), 1 + size
+    payload, items = data[offset:offset + length], []
+    while payload:
+        item, payload = rlp_decode(payload)
+        items.append(item)
+    return items, data[offset + length:]
+
+def consensus_round(extra_data):
+    """
+    Round do consenso em que o bloco foi produzido, do extraData do QBFT e do
+    IBFT 2.0 (RLP [vanity, validadores, voto, round, selos]); round > 0
+    indica troca de round. None se o extraData nao tiver esse formato.
+    """
+    try:
+        items, _ = rlp_decode(bytes.fromhex(extra_data[2:]))
+    except (ValueError, IndexError, TypeError):
+        return None
+    if not isinstance(items, list) or len(items) < 5 or not isinstance(items[3], bytes):
+        return None
+    return int.from_bytes(items[3], "big")
+
+def fetch_blocks(client, first, last, batch_size=DEFAULT_BATCH_SIZE, receipts=True):
+    """
+    Blocos first..last (inclusive) e, se pedido, os recibos das suas
+    transacoes, em lotes de batch_size chamadas. Retorna (blocos, recibos por hash).
+    """
+    blocks = []
+    for start in range(first, last + 1, batch_size):
+        numbers = range(start, min(start + batch_size, last + 1))
+        blocks.extend(b for b in client.batch([("eth_getBlockByNumber", [hex(n), False]) for n in numbers]) if b)
+
+    by_hash = {}
+    if receipts:
+        hashes = [h for block in blocks for h in block.get("transactions", [])]
+        for start in range(0, len(hashes), batch_size):
+            chunk = hashes[start:start + batch_size]
+            results = client.batch([("eth_getTransactionReceipt", [h]) for h in chunk])
+            by_hash.update((h, r) for h, r in zip(chunk, results) if r)
+    return blocks, by_hash
+
+def block_frame(blocks, receipts=None, previous_timestamp=None):
+    """Uma linha por bloco (BLOCK_COLUMNS)"""
+    rows = []
+    for block in blocks:
+        txs = block.get("transactions", [])
+        failed = None
+        if receipts is not None:
+            failed = sum(1 for h in txs if h in receipts and receipts[h].get("status") == "0x0")
+        rows.append({
+            "number": int(block["number"], 16),
+            "timestamp": int(block["timestamp"], 16),
+            "tx_count": len(txs),
+            "failed_txs": failed,
+            "gas_used": int(block["gasUsed"], 16),
+            "gas_limit": int(block["gasLimit"], 16),
+            "consensus_round": consensus_round(block.get("extraData", "0x")),
+            "size": int(block.get("size", "0x0"), 16),
+        })
+    df = pd.DataFrame(rows, columns=[c for c in BLOCK_COLUMNS if c not in ("interval_s", "gas_utilization",
+                                                                              "block_tps")])
+    previous = df["timestamp"].shift(1)
+    if previous_timestamp is not None and len(df):
+        previous.iloc[0] = previous_timestamp
+    df["interval_s"] = df["timestamp"] - previous
+    df["gas_utilization"] = df["gas_used"] / df["gas_limit"].where(df["gas_limit"] > 0)
+    df["block_tps"] = df["tx_count"] / df["interval_s"].where(df["interval_s"] > 0)
+    return df[BLOCK_COLUMNS]
+
+def collect(client, first, last, batch_size=DEFAULT_BATCH_SIZE, receipts=True):
+    """
+    Metricas dos blocos first..last; o bloco anterior da o intervalo do
+    primeiro, exceto o genesis (timestamp arbitrario do arquivo de genesis)
+    """
+    if last < first:
+        return pd.DataFrame(columns=BLOCK_COLUMNS)
+    start = first - 1 if first > 1 else first
+    blocks, by_hash = fetch_blocks(client, start, last, batch_size, receipts)
+    previous_timestamp = None
+    if start < first and blocks and int(blocks[0]["number"], 16) == start:
+        previous_timestamp = int(blocks[0]["timestamp"], 16)
+        blocks = blocks[1:]
+    return block_frame(blocks, by_hash if receipts else None, previous_timestamp)
+
+def summarize_blocks(df, blocktime=None):
+    """
+    Resumo de uma faixa de blocos: blocos vazios e cheios, transacoes por
+    bloco, jitter do intervalo (desvio padrao e blocos atrasados em relacao
+    ao tempo de bloco, ou a mediana dos intervalos) e trocas de round.
+    """
+    n = len(df)
+    loaded = df[df["tx_count"] > 0]
+    intervals = df["interval_s"].dropna()
+    reference = blocktime or (intervals.median() if len(intervals) else None)
+    full = int((df["gas_utilization"] >= FULL_BLOCK_UTILIZATION).sum())
+    late = int((intervals > LATE_BLOCK_FACTOR * reference).sum()) if reference else 0
+    round_changes = int((df["consensus_round"].fillna(0) > 0).sum())
+
+    summary = {
+        "blocks": n,
+        "empty_blocks": n - len(loaded),
+        "full_blocks": full,
+        "txs": int(df["tx_count"].sum()),
+        "failed_txs": df["failed_txs"].sum(min_count=1),
+        "tx_per_block_mean": loaded["tx_count"].mean(),
+        "tx_per_block_max": loaded["tx_count"].max(),
+        "blocks_at_max": int((loaded["tx_count"] == loaded["tx_count"].max()).sum()) if len(loaded) else 0,
+        "block_tps_mean": loaded["block_tps"].mean(),
+        "block_tps_max": loaded["block_tps"].max(),
+        "gas_utilization_mean": loaded["gas_utilization"].mean(),
+        "gas_utilization_max": df["gas_utilization"].max(),
+        "interval_mean_s": intervals.mean(),
+        "interval_std_s": intervals.std(),
+        "interval_max_s": intervals.max(),
+        "late_blocks": late,
+        "round_changes": round_changes,
+    }
+    summary["ceiling"] = block_ceiling(summary)
+    return summary
+
+def block_ceiling(summary):
+    """Teto indicado pelos blocos da faixa (heuristica sobre o resumo)"""
+    blocks, loaded = summary["blocks"], summary["blocks"] - summary["empty_blocks"]
+    if loaded == 0:
+        return "sem carga nos blocos"
+    if summary["full_blocks"] >= CEILING_SHARE * loaded:
+        return "gas limit"
+    if summary["round_changes"] + summary["late_blocks"] >= 0.1 * blocks:
+        return "consenso (trocas de round / blocos atrasados)"
+    # Com carga de taxa fixa o numero de transacoes varia de bloco a bloco; muitos blocos
+    # exatamente no maximo indicam um limite por bloco abaixo do gas limit
+    if loaded >= 3 and summary["blocks_at_max"] >= CEILING_SHARE * loaded:
+        return "tempo de bloco (limite de transacoes por bloco)"
+    return "nenhum nos blocos (blocos com folga)"
+
+def describe_summary(summary, write=print):
+    write(f"  {summary['blocks']} blocos ({summary['empty_blocks']} vazios, {summary['full_blocks']} cheios), "
+          f"{summary['txs']} transacoes, {summary['tx_per_block_mean']:.1f} por bloco com carga "
+          f"(max {summary['tx_per_block_max']:.0f})")
+    write(f"  Gas: {summary['gas_utilization_mean']:.2%} medio por bloco com carga | intervalo "
+          f"{summary['interval_mean_s']:.2f}s +- {summary['interval_std_s']:.2f}s (max {summary['interval_max_s']:.0f}s), "
+          f"{summary['late_blocks']} atrasados, {summary['round_changes']} trocas de round")
+    write(f"  Teto indicado pelos blocos: {summary['ceiling']}")
+
+def trim_to_window(df, start, end):
+    """
+    Blocos com timestamp na janela [start, end] (epoch, s) do round; o
+    intervalo do primeiro continua medido desde o bloco anterior
+    """
+    inside = (df["timestamp"] >= math.floor(start)) & (df["timestamp"] <= math.ceil(end))
+    return df[inside].reset_index(drop=True)
+
+def record_round_blocks(client, report_path, first, last, blocktime=None, batch_size=DEFAULT_BATCH_SIZE,
+                        window=None):
+    """
+    Grava {relatorio}.blocks.csv com os blocos first..last de um round,
+    limitados a janela (inicio, fim) do round se informada; retorna o resumo
+    """
+    df = collect(client, first, last, batch_size)
+    if window is not None:
+        df = trim_to_window(df, *window)
+    report_path = Path(report_path)
+    df.to_csv(report_path.with_name(report_path.stem + BLOCKS_SUFFIX), index=False)
+    return summarize_blocks(df, blocktime)
+
+def process_experiment(exp_dir):
+    """Blocos de todos os relatorios de um experimento; retorna (metrics_df, summary_df)"""
+    exp_info = parse_experiment_name(exp_dir.name) or {}
+    frames, summaries = [], []
+    for blocks_csv in sorted(exp_dir.glob(f"*{BLOCKS_SUFFIX}")):
+        df = pd.read_csv(blocks_csv)
+        report = blocks_csv.name[:-len(BLOCKS_SUFFIX)]
+        frames.append(df.assign(report=report))
+        summaries.append({"report": report, **summarize_blocks(df, exp_info.get("blocktime"))})
+    if not frames:
+        return pd.DataFrame(), pd.DataFrame()
+    return pd.concat(frames, ignore_index=True), pd.DataFrame(summaries)
+
+def main():
+    parser = argparse.ArgumentParser(description="Metricas por bloco (transacoes, gas, intervalo, trocas de round)")
+    sub = parser.add_subparsers(dest="command")
+    col = sub.add_parser("collect", help="Le uma faixa de blocos da rede e mostra o resumo")
+    col.add_argument("--from", dest="first", type=int, required=True, help="Primeiro bloco")
+    col.add_argument("--to", dest="last", type=int, default=None, help="Ultimo bloco (padrao: o mais recente)")
+    col.add_argument("--blocktime", type=float, default=None, help="Tempo de bloco configurado (s)")
+    col.add_argument("--rpc-url", default=RPC_URL, help=f"Endpoint JSON-RPC HTTP (padrao: {RPC_URL})")
+    col.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                     help=f"Chamadas por lote JSON-RPC (padrao: {DEFAULT_BATCH_SIZE})")
+    col.add_argument("--output", default=None, help="CSV com uma linha por bloco")
+    args = parser.parse_args()
+
+    if args.command == "collect":
+        client = RpcClient(args.rpc_url)
+        try:
+            last = args.last if args.last is not None else client.block_number()
+            df = collect(client, args.first, last, args.batch_size)
+        except RpcError as e:
+            log_error(f"Falha ao ler os blocos em {args.rpc_url}: {e}")
+            sys.exit(1)
+        if args.output:
+            df.to_csv(args.output, index=False)
+            log_success(f"{len(df)} blocos salvos em {args.output}")
+        log_info(f"Blocos {args.first}..{last}:")
+        describe_summary(summarize_blocks(df, args.blocktime))
+        return
+
+    if not REPORTS_DIR.exists():
+        log_error(f"Diretorio de relatorios nao encontrado: {REPORTS_DIR}")
+        sys.exit(1)
+    found = 0
+    for exp_dir in sorted(d for d in REPORTS_DIR.iterdir() if d.is_dir()):
+        metrics_df, summary_df = process_experiment(exp_dir)
+        if metrics_df.empty:
+            continue
+        output_exp_dir = OUTPUT_DIR / exp_dir.name
+        output_exp_dir.mkdir(parents=True, exist_ok=True)
+        metrics_df.to_csv(output_exp_dir / METRICS_CSV_NAME, index=False)
+        summary_df.to_csv(output_exp_dir / SUMMARY_CSV_NAME, index=False)
+        ceilings = summary_df["ceiling"].value_counts().to_dict()
+        log_success(f"{exp_dir.name}: {len(metrics_df)} blocos de {len(summary_df)} relatorios, teto {ceilings}")
+        found += 1
+    if not found:
+        log_warning(f"Nenhum arquivo {BLOCKS_SUFFIX} encontrado")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Dataset colunar (Parquet) com as metricas extraidas dos relatorios do Caliper
+Estrutura: reports_dataset/{kind}/nodes=N/blocktime=B/consensus=C/version=V/test_type=T/{experiment}/{relatorio}.parquet
+
+kind e "performance", "monitor" ou "charts"; T e o workload (open, query, ...).
+Cada arquivo corresponde a um relatorio de um experimento, de modo que a
+extracao incremental reescreve apenas os arquivos dos relatorios novos ou
+alterados; o nome do relatorio fica na coluna "Test Type".
+
+As colunas de metricas sao gravadas como float64 e as de identificacao como
+string; quem consome o dataset le apenas as colunas e particoes necessarias,
+sem pd.to_numeric.
+"""
+
+import os
+import re
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow e opcional: sem ele apenas os CSVs sao gerados
+    pa = ds = pq = None
+
+base_dir = Path(__file__).parent
+DATASET_DIR = base_dir / "reports_dataset"
+
+KINDS = ("performance", "monitor", "charts")
+
+# Colunas que identificam a linha; todas as demais sao metricas numericas
+STRING_COLUMNS = {"Name", "Driver", "Aborted", "Round", "Monitor", "Metric", "Container", "t", "experiment", "timestamp",
+                  "Test Type"}
+
+# Nome do relatorio -> workload: open_report_60_20250101-120000, query_rpc_report_100_... -> open, query
+REPORT_SUFFIX_RE = re.compile(r'(_rpc)?_report.*$')
+
+def dataset_available():
+    """Indica se o pyarrow esta instalado"""
+    return pa is not None
+
+def partition_schema():
+    return pa.schema([
+        ("nodes", pa.int32()),
+        ("blocktime", pa.int32()),
+        ("consensus", pa.string()),
+        ("version", pa.string()),
+        ("test_type", pa.string()),
+    ])
+
+def parse_experiment_name(exp_name):
+    """Parse experiment name: 6n-5s-qbft-v25.10.0_20251112_133845 -> dict"""
+    try:
+        # Separar timestamp se existir
+        timestamp = None
+        if '_' in exp_name:
+            parts_ts = exp_name.rsplit('_', 2)
+            if len(parts_ts) == 3 and parts_ts[1].isdigit() and parts_ts[2].isdigit():
+                exp_name_base = parts_ts[0]
+                timestamp = f"{parts_ts[1]}_{parts_ts[2]}"
+            else:
+                exp_name_base = exp_name
+        else:
+            exp_name_base = exp_name
+
+        # Parse parametros
+        parts = exp_name_base.split('-')
+        nodes = int(parts[0].replace('n', ''))
+        blocktime = int(parts[1].replace('s', ''))
+        consensus = parts[2]
+        version = parts[3].replace('v', '')
+
+        result = {
+            'experiment': exp_name,
+            'experiment_base': exp_name_base,
+            'nodes': nodes,
+            'blocktime': blocktime,
+            'consensus': consensus,
+            'version': version
+        }
+
+        if timestamp:
+            result['timestamp'] = timestamp
+
+        return result
+    except:
+        return None
+
+def typed_frame(rows):
+    """
+    Converte as linhas extraidas (todas strings) em um DataFrame tipado:
+    metricas em float64, colunas de identificacao em string.
+    """
+    df = pd.DataFrame(rows)
+    for col in df.columns:
+        if col in STRING_COLUMNS:
+            df[col] = df[col].astype("string")
+        else:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+    return df
+
+def report_workload(report):
+    """Workload de um relatorio (particao test_type), pelo nome do arquivo"""
+    return REPORT_SUFFIX_RE.sub("", report) or report
+
+def experiment_dir(kind, exp_info):
+    return (DATASET_DIR / kind
+            / f"nodes={exp_info['nodes']}"
+            / f"blocktime={exp_info['blocktime']}"
+            / f"consensus={exp_info['consensus']}"
+            / f"version={exp_info['version']}")
+
+def partition_path(kind, exp_info, report):
+    """Caminho do arquivo Parquet de um relatorio dentro do dataset"""
+    return (experiment_dir(kind, exp_info)
+            / f"test_type={report_workload(report)}"
+            / exp_info['experiment']
+            / f"{report}.parquet")
+
+def remove_legacy_partitions(exp_info):
+    """
+    Remove os arquivos do experimento no layout antigo, com o nome do
+    relatorio como particao (test_type={relatorio}/{experimento}.parquet)
+    """
+    for kind in KINDS:
+        for path in experiment_dir(kind, exp_info).glob(f"test_type=*/{exp_info['experiment']}.parquet"):
+            path.unlink(missing_ok=True)
+            try:
+                path.parent.rmdir()
+            except OSError:
+                pass
+
+def write_report_partition(kind, exp_info, report, rows):
+    """
+    Grava (ou remove, se nao houver linhas) o arquivo de um relatorio.
+    A escrita e atomica: arquivo temporario + rename.
+    """
+    path = partition_path(kind, exp_info, report)
+    if not rows:
+        path.unlink(missing_ok=True)
+        return None
+
+    df = typed_frame(rows)
+    df.insert(0, "experiment", pd.array([exp_info["experiment"]] * len(df), dtype="string"))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".parquet.tmp")
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+def remove_report_partitions(exp_info, report):
+    """Remove os arquivos de um relatorio que deixou de existir"""
+    for kind in KINDS:
+        partition_path(kind, exp_info, report).unlink(missing_ok=True)
+
+def report_partitions_exist(exp_info, report, kinds=KINDS):
+    return all(partition_path(kind, exp_info, report).exists() for kind in kinds)
+
+def _filter_expression(filters):
+    """{'nodes': 6, 'consensus': ['qbft', 'ibft']} -> expressao do pyarrow.dataset"""
+    expr = None
+    for col, value in (filters or {}).items():
+        if isinstance(value, (list, tuple, set)):
+            cond = ds.field(col).isin(list(value))
+        else:
+            cond = ds.field(col) == value
+        expr = cond if expr is None else expr & cond
+    return expr
+
+def load_dataset(kind, columns=None, filters=None):
+    """
+    Le um kind do dataset como DataFrame, apenas com as colunas pedidas
+    (colunas de particao incluidas) e apenas das particoes que passam
+    pelos filtros. Retorna um DataFrame vazio se o dataset nao existir.
+    """
+    if not dataset_available():
+        raise RuntimeError("pyarrow nao instalado: instale com 'pip install pyarrow'")
+
+    kind_dir = DATASET_DIR / kind
+    files = sorted(str(p) for p in kind_dir.rglob("*.parquet")) if kind_dir.exists() else []
+    if not files:
+        return pd.DataFrame(columns=columns or [])
+
+    # Relatorios diferentes tem colunas diferentes (ex.: Memory(avg) [GB] ou [MB]);
+    # o schema unificado e montado so com o rodape de cada arquivo
+    partitioning = ds.partitioning(partition_schema(), flavor="hive")
+    file_schema = pa.unify_schemas([pq.read_schema(f) for f in files])
+    schema = pa.unify_schemas([file_schema, partition_schema()])
+    dataset = ds.dataset(files, schema=schema, format="parquet",
+                         partitioning=partitioning, partition_base_dir=str(kind_dir))
+
+    if columns is not None:
+        columns = [c for c in columns if c in schema.names]
+    table = dataset.to_table(columns=columns, filter=_filter_expression(filters))
+    return table.to_pandas()
+
+def dataset_csv_export(kind, output_csv, filters=None):
+    """Exporta um kind do dataset (ou parte dele) para um unico CSV"""
+    df = load_dataset(kind, filters=filters)
+    df.to_csv(output_csv, index=False)
+    return len(df)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Exporta o dataset Parquet de metricas do Caliper para CSV")
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("output_csv")
+    args = parser.parse_args()
+
+    n = dataset_csv_export(args.kind, args.output_csv)
+    print(f"{n} linhas exportadas para {args.output_csv}")
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Parser dos logs do Caliper (open.log, query.log, transfer.log, ...)
+Processa logs na estrutura: reports_htmls/experiments/{experiment_name}/*.log
+Gera CSVs na estrutura: reports_csv/experiments/{experiment_name}/
+  - caliper_log_timeline.csv: uma linha por execucao do Caliper com o tempo
+    gasto em binding, inicializacao, lancamento de workers, cada round e ocioso
+  - caliper_log_rounds.csv: uma linha por round (preparacao, carga, contagens)
+  - caliper_log_errors.csv: classes de erro/aviso encontradas e quantas vezes
+
+O parse e feito em streaming: as linhas sao lidas uma a uma por geradores e
+cada execucao e emitida assim que termina, sem carregar o log inteiro.
+
+Uso:
+    python3 caliper_logs.py                      # todos os experimentos
+    python3 caliper_logs.py caminho/open.log     # resumo de logs especificos
+"""
+
+import re
+import sys
+import argparse
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+# Cores para output
+class Colors:
+    BLUE = '\033[0;34m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    RED = '\033[0;31m'
+    NC = '\033[0m'
+
+def log_info(msg):
+    print(f"{Colors.BLUE}[INFO]{Colors.NC} {msg}")
+
+def log_success(msg):
+    print(f"{Colors.GREEN}[OK]{Colors.NC} {msg}")
+
+def log_warning(msg):
+    print(f"{Colors.YELLOW}[WARN]{Colors.NC} {msg}")
+
+def log_error(msg):
+    print(f"{Colors.RED}[ERROR]{Colors.NC} {msg}")
+
+# Caminhos
+base_dir = Path(__file__).parent
+REPORTS_DIR = base_dir / "reports_htmls" / "experiments"
+OUTPUT_DIR = base_dir / "reports_csv" / "experiments"
+
+TIMELINE_CSV_NAME = "caliper_log_timeline.csv"
+ROUNDS_CSV_NAME = "caliper_log_rounds.csv"
+ERRORS_CSV_NAME = "caliper_log_errors.csv"
+
+# Logs que nao sao do Caliper (gerados pelos scripts de experimento)
+IGNORED_LOGS = {"experiment.log"}
+
+LogEvent = namedtuple("LogEvent", ["ts", "level", "module", "message"])
+
+ANSI_RE = re.compile(r'\x1b\[[0-9;]*m')
+# 2025.11.13-15:57:42.501 info  [caliper] [bind] 	Binding for besu@latest...
+EVENT_RE = re.compile(r'^(\d{4}\.\d{2}\.\d{2}-\d{2}:\d{2}:\d{2}\.\d{3})\s+(\w+)\s+\[caliper\]\s+\[([^\]]+)\]\s*(.*)$')
+# Saida de processos filhos (npm, node) sem timestamp que indica erro
+UNTIMED_ERROR_RE = re.compile(r'^(npm ERR!|Error:|\w*Error:|Unhandled|FATAL)', re.IGNORECASE)
+
+INIT_RE = re.compile(r'Executed "init" step in ([\d.]+) seconds')
+ROUND_START_RE = re.compile(r'Started round (\d+) \((.*)\)')
+ROUND_END_RE = re.compile(r'Finished round (\d+) \((.*)\) in ([\d.]+) seconds')
+TX_INFO_RE = re.compile(r'\[(.*) Round (\d+) Transaction Info\] - Submitted: (\d+) Succ: (\d+) Fail:\s*(\d+) Unfinished:\s*(\d+)')
+BENCH_END_RE = re.compile(r'Benchmark finished in ([\d.]+) seconds\. Total rounds: (\d+)\. Successful rounds: (\d+)\. Failed rounds: (\d+)')
+
+def parse_timestamp(value):
+    return datetime.strptime(value, "%Y.%m.%d-%H:%M:%S.%f")
+
+def iter_log_lines(path):
+    """Le o log linha a linha, sem as sequencias de cor ANSI"""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            yield ANSI_RE.sub("", line).rstrip("\n")
+
+def iter_log_events(lines):
+    """
+    Converte as linhas em LogEvent. Linhas com timestamp viram eventos do
+    Caliper; linhas sem timestamp so viram evento quando sao linhas das
+    tabelas de resultado (level "table", celulas em message) ou quando
+    parecem erro de um processo filho, como o npm do binding (level "error").
+    """
+    for line in lines:
+        match = EVENT_RE.match(line)
+        if match:
+            ts, level, module, message = match.groups()
+            yield LogEvent(parse_timestamp(ts), level.lower(), module, message.strip())
+        elif line.startswith("| "):
+            yield LogEvent(None, "table", "report-builder", [c.strip() for c in line.strip().strip("|").split("|")])
+        elif UNTIMED_ERROR_RE.match(line.strip()):
+            yield LogEvent(None, "error", "stdout", line.strip())
+
+def error_class(message):
+    """Normaliza uma mensagem de erro para agrupar ocorrencias da mesma classe"""
+    msg = re.sub(r'"[^"]*"', '"*"', message)
+    msg = re.sub(r"'[^']*'", "'*'", msg)
+    msg = re.sub(r'0x[0-9a-fA-F]+', '0x*', msg)
+    msg = re.sub(r'(/[\w.@-]+)+', '<path>', msg)
+    msg = re.sub(r'\d+(\.\d+)?', 'N', msg)
+    return msg[:200]
+
+def _seconds(start, end):
+    if start is None or end is None:
+        return None
+    return (end - start).total_seconds()
+
+def new_run():
+    return {
+        "start": None, "end": None,
+        "bind_start": None, "bind_end": None,
+        "init_s": None,
+        "launch_start": None, "launch_end": None,
+        "rounds": [],
+        "benchmark_s": None, "failed_rounds": None,
+        "errors": {},
+    }
+
+def finish_run(run):
+    """Consolida os marcos de uma execucao em tempos por fase"""
+    rounds = []
+    for rnd in run["rounds"]:
+        rounds.append({
+            "round": rnd["index"],
+            "label": rnd["label"],
+            "start": rnd["start"],
+            "end": rnd["end"],
+            "round_s": _seconds(rnd["start"], rnd["end"]) or rnd["reported_s"],
+            "prepare_s": _seconds(rnd["start"], rnd["load_start"]),
+            "load_s": _seconds(rnd["load_start"], rnd["load_end"]),
+            "submitted": rnd["submitted"],
+            "succ": rnd["succ"],
+            "fail": rnd["fail"],
+        })
+
+    total_s = _seconds(run["start"], run["end"]) or 0.0
+    binding_s = _seconds(run["bind_start"], run["bind_end"]) or 0.0
+    launch_s = _seconds(run["launch_start"], run["launch_end"]) or 0.0
+    rounds_s = sum(r["round_s"] or 0.0 for r in rounds)
+    load_s = sum(r["load_s"] or 0.0 for r in rounds)
+
+    return {
+        "start": run["start"],
+        "end": run["end"],
+        "total_s": total_s,
+        "binding_s": binding_s,
+        "init_s": run["init_s"] or 0.0,
+        "worker_launch_s": launch_s,
+        "rounds_s": rounds_s,
+        "load_s": load_s,
+        # Tempo que nao cai em nenhuma fase conhecida (espera de monitores, relatorio, saida)
+        "idle_s": max(0.0, total_s - binding_s - launch_s - rounds_s),
+        "harness_s": max(0.0, total_s - load_s),
+        "n_rounds": len(rounds),
+        "failed_rounds": run["failed_rounds"],
+        "rounds": rounds,
+        "errors": run["errors"],
+    }
+
+def iter_runs(events):
+    """
+    Agrupa os eventos em execucoes do Caliper (um "launch manager" cada) e
+    emite o resumo de cada execucao assim que ela termina.
+    """
+    run = None
+    current_round = None
+    table_header = None
+
+    for ev in events:
+        msg = ev.message
+
+        if ev.level == "table":
+            # Tabela "### Test result ###": contagens finais de Succ/Fail do round
+            if "Succ" in msg and "Fail" in msg:
+                table_header = msg
+            elif table_header and len(msg) == len(table_header) and current_round is not None:
+                row = dict(zip(table_header, msg))
+                if row.get("Name") == current_round["label"]:
+                    try:
+                        current_round["succ"], current_round["fail"] = int(row["Succ"]), int(row["Fail"])
+                        current_round["submitted"] = current_round["succ"] + current_round["fail"]
+                        current_round["final"] = True
+                    except ValueError:
+                        pass
+            else:
+                table_header = None
+            continue
+        table_header = None if ev.ts is not None else table_header
+
+        # Uma nova execucao comeca com o binding (ou com a configuracao do manager, sem binding)
+        starts_run = ev.module == "cli-launch-manager" and (
+            msg.startswith("Binding specification") or (msg.startswith("Set workspace path") and run is not None
+                                                          and run["end"] is not None and run["benchmark_s"] is not None))
+        if starts_run and run is not None and run["start"] is not None:
+            yield finish_run(run)
+            run = None
+        if run is None:
+            run = new_run()
+            current_round = None
+
+        if ev.ts is not None:
+            if run["start"] is None:
+                run["start"] = ev.ts
+            run["end"] = ev.ts
+
+        if ev.level in ("error", "warn"):
+            key = (ev.level, ev.module, error_class(msg))
+            entry = run["errors"].setdefault(key, {"count": 0, "example": msg})
+            entry["count"] += 1
+
+        if ev.module == "bind" and msg.startswith("Binding for"):
+            run["bind_start"] = ev.ts
+        elif ev.module == "cli-launch-manager" and msg.startswith("Set workspace path") and run["bind_start"] and not run["bind_end"]:
+            run["bind_end"] = ev.ts
+        elif ev.module == "caliper-engine" and INIT_RE.search(msg):
+            run["init_s"] = float(INIT_RE.search(msg).group(1))
+        elif ev.module == "worker-orchestrator" and msg.startswith("Launching worker") and run["launch_start"] is None:
+            run["launch_start"] = ev.ts
+        elif ev.module == "worker-orchestrator" and "progressing to test preparation phase" in msg and run["launch_end"] is None:
+            run["launch_end"] = ev.ts
+        elif ev.module == "round-orchestrator" and ROUND_START_RE.search(msg):
+            idx, label = ROUND_START_RE.search(msg).groups()
+            current_round = {
+                "index": int(idx), "label": label,
+                "start": ev.ts, "end": None, "reported_s": None,
+                "load_start": None, "load_end": None,
+                "submitted": None, "succ": None, "fail": None, "final": False,
+            }
+            run["rounds"].append(current_round)
+        elif current_round is not None and ev.module == "worker-message-handler" and "is starting Round#" in msg:
+            if current_round["load_start"] is None:
+                current_round["load_start"] = ev.ts
+        elif current_round is not None and ev.module == "worker-message-handler" and "finished Round#" in msg:
+            # Com varios workers, a carga termina quando o ultimo worker termina
+            current_round["load_end"] = ev.ts
+        elif current_round is not None and not current_round["final"] and TX_INFO_RE.search(msg):
+            _, _, submitted, succ, fail, _ = TX_INFO_RE.search(msg).groups()
+            current_round["submitted"], current_round["succ"], current_round["fail"] = int(submitted), int(succ), int(fail)
+        elif ev.module == "round-orchestrator" and ROUND_END_RE.search(msg):
+            idx, label, seconds = ROUND_END_RE.search(msg).groups()
+            if current_round is not None and current_round["index"] == int(idx):
+                current_round["end"] = ev.ts
+                current_round["reported_s"] = float(seconds)
+            current_round = None
+        elif ev.module == "round-orchestrator" and BENCH_END_RE.search(msg):
+            seconds, _, _, failed = BENCH_END_RE.search(msg).groups()
+            run["benchmark_s"] = float(seconds)
+            run["failed_rounds"] = int(failed)
+
+    if run is not None and run["start"] is not None:
+        yield finish_run(run)
+
+def parse_log(path):
+    """Gera o resumo de cada execucao registrada em um arquivo de log"""
+    return iter_runs(iter_log_events(iter_log_lines(path)))
+
+def round_window(path):
+    """
+    (inicio, fim) dos rounds da ultima execucao de um log, do "Started round"
+    do primeiro ao "Finished round" do ultimo, em segundos epoch (o log usa a
+    hora local); None se o log nao tiver um round completo
+    """
+    runs = list(parse_log(path))
+    rounds = runs[-1]["rounds"] if runs else []
+    if not rounds or rounds[0]["start"] is None or rounds[-1]["end"] is None:
+        return None
+    return rounds[0]["start"].timestamp(), rounds[-1]["end"].timestamp()
+
+TIMELINE_COLUMNS = ["log", "run", "start", "end", "total_s", "binding_s", "init_s", "worker_launch_s",
+                    "rounds_s", "load_s", "idle_s", "harness_s", "n_rounds", "failed_rounds",
+                    "submitted", "succ", "fail"]
+ROUND_COLUMNS = ["log", "run", "round", "label", "round_s", "prepare_s", "load_s", "submitted", "succ", "fail"]
+ERROR_COLUMNS = ["log", "run", "level", "module", "error_class", "count", "example"]
+
+def timeline_rows(log_name, runs):
+    """Achata as execucoes em linhas: uma por execucao, uma por round e uma por classe de erro"""
+    timeline, round_rows, errors = [], [], []
+    for i, run in enumerate(runs):
+        rounds = run["rounds"]
+        counts = {k: sum(r[k] for r in rounds if r[k] is not None) if any(r[k] is not None for r in rounds) else None
+                  for k in ("submitted", "succ", "fail")}
+        timeline.append({
+            "log": log_name, "run": i,
+            **{k: run[k] for k in TIMELINE_COLUMNS if k in run},
+            **counts,
+        })
+        round_rows.extend({"log": log_name, "run": i, **r} for r in rounds)
+        for (level, module, cls), entry in run["errors"].items():
+            errors.append({"log": log_name, "run": i, "level": level, "module": module,
+                           "error_class": cls, "count": entry["count"], "example": entry["example"]})
+    return timeline, round_rows, errors
+
+def summarize(timeline_df):
+    """Resumo de quanto do tempo total e overhead do harness e quanto e carga"""
+    total = timeline_df["total_s"].sum()
+    if total <= 0:
+        return
+    for col, label in (("binding_s", "Binding (npm install)"), ("worker_launch_s", "Lancamento de workers"),
+                       ("rounds_s", "Rounds"), ("load_s", "  dos quais carga efetiva"), ("idle_s", "Ocioso/relatorio")):
+        value = timeline_df[col].sum()
+        print(f"  {label:<28} {value:>9.1f}s  ({value / total * 100:5.1f}%)")
+    harness = timeline_df["harness_s"].sum()
+    print(f"  {'Overhead do harness':<28} {harness:>9.1f}s  ({harness / total * 100:5.1f}%)")
+
+def process_experiment(exp_dir):
+    """Processa os logs de um experimento; retorna (timeline_df, rounds_df, errors_df)"""
+    timeline, round_rows, errors = [], [], []
+    for log_file in sorted(exp_dir.glob("*.log")):
+        if log_file.name in IGNORED_LOGS:
+            continue
+        t, r, e = timeline_rows(log_file.name, parse_log(log_file))
+        timeline.extend(t)
+        round_rows.extend(r)
+        errors.extend(e)
+    return (pd.DataFrame(timeline, columns=TIMELINE_COLUMNS),
+            pd.DataFrame(round_rows, columns=ROUND_COLUMNS),
+            pd.DataFrame(errors, columns=ERROR_COLUMNS))
+
+def main():
+    parser = argparse.ArgumentParser(description="Extrai a linha do tempo e os erros dos logs do Caliper")
+    parser.add_argument("logs", nargs="*", help="Logs especificos (padrao: todos os experimentos)")
+    args = parser.parse_args()
+
+    if args.logs:
+        timeline, errors = [], []
+        for path in args.logs:
+            t, _, e = timeline_rows(Path(path).name, parse_log(path))
+            timeline.extend(t)
+            errors.extend(e)
+        df = pd.DataFrame(timeline, columns=TIMELINE_COLUMNS)
+        print(df.drop(columns=["start", "end"]).to_string(index=False))
+        summarize(df)
+        for e in errors:
+            print(f"  [{e['level']}] {e['module']}: {e['error_class']} (x{e['count']})")
+        return
+
+    if not REPORTS_DIR.exists():
+        log_error(f"Diretorio de relatorios nao encontrado: {REPORTS_DIR}")
+        sys.exit(1)
+
+    experiments = sorted(d for d in REPORTS_DIR.iterdir() if d.is_dir())
+    log_info(f"Encontrados {len(experiments)} experimentos")
+
+    all_timelines = []
+    for exp_dir in experiments:
+        timeline_df, rounds_df, errors_df = process_experiment(exp_dir)
+        if timeline_df.empty:
+            continue
+
+        output_exp_dir = OUTPUT_DIR / exp_dir.name
+        output_exp_dir.mkdir(parents=True, exist_ok=True)
+        timeline_df.to_csv(output_exp_dir / TIMELINE_CSV_NAME, index=False)
+        rounds_df.to_csv(output_exp_dir / ROUNDS_CSV_NAME, index=False)
+        errors_df.to_csv(output_exp_dir / ERRORS_CSV_NAME, index=False)
+
+        n_errors = int(errors_df["count"].sum()) if not errors_df.empty else 0
+        log_success(f"{exp_dir.name}: {len(timeline_df)} execucoes, {n_errors} erros/avisos")
+        all_timelines.append(timeline_df)
+
+    if not all_timelines:
+        log_warning("Nenhum log do Caliper encontrado")
+        return
+
+    print(f"\n{'='*60}")
+    log_info("Distribuicao do tempo de parede de todas as execucoes:")
+    summarize(pd.concat(all_timelines, ignore_index=True))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Acompanhamento ao vivo da saida do Caliper (manager) durante um round
+Le o stdout linha a linha enquanto o benchmark roda, grava o log e
+interpreta o progresso do default-observer:
+    [open Round 0 Transaction Info] - Submitted: 342 Succ: 0 Fail:0 Unfinished:342
+Aborta o round quando a taxa de falha ou a idade da transacao pendente mais
+antiga (estimativa da latencia) passam dos limites; o round abortado e
+tratado como saturado.
+
+A idade da pendente mais antiga e estimada pela curva de submissao: se ja
+terminaram C transacoes, a mais antiga ainda pendente e a (C+1)-esima
+submetida, e o instante em que ela foi submetida e interpolado entre os
+snapshots de "Submitted", a partir do inicio da carga (linha "Worker#N is
+starting Round#M" do primeiro worker; "Started round" vem ~2 s antes, antes
+do prepare e dos monitores).
+
+Uso (replay de um log, para testar os limites):
+    python3 caliper_monitor.py reports_htmls/experiments/<exp>/open.log --max-latency 30
+"""
+
+import os
+import re
+import sys
+import time
+import queue
+import signal
+import argparse
+import threading
+import subprocess
+
+from caliper_logs import ANSI_RE, EVENT_RE, ROUND_START_RE, ROUND_END_RE, TX_INFO_RE, parse_timestamp
+
+# Inicio e fim da carga de um worker: depois do fim de todos o observer para de atualizar o progresso
+WORKER_STARTING_RE = re.compile(r'Worker#(\d+) is starting Round#\d+')
+WORKER_FINISHED_RE = re.compile(r'Worker#(\d+) finished Round#\d+')
+
+# Limites padrao para abortar um round (0 desativa)
+DEFAULT_MAX_FAIL_RATE = 0.5    # fracao de falhas entre as transacoes concluidas
+DEFAULT_MAX_LATENCY = 120.0    # idade maxima da transacao pendente mais antiga (s)
+MIN_COMPLETED = 50             # transacoes concluidas antes de avaliar a taxa de falha
+
+CHECK_INTERVAL = 1.0           # reavaliacao sem novas linhas (s)
+
+class RoundProgress:
+    """
+    Estado do round corrente a partir das linhas do log. O relogio e o
+    timestamp das linhas do Caliper; sem linhas novas, avanca pelo relogio
+    local desde a ultima linha.
+    """
+
+    def __init__(self, max_fail_rate=DEFAULT_MAX_FAIL_RATE, max_latency=DEFAULT_MAX_LATENCY,
+                 min_completed=MIN_COMPLETED):
+        self.max_fail_rate = max_fail_rate
+        self.max_latency = max_latency
+        self.min_completed = min_completed
+        self.label = None
+        self.active = False
+        self.round_start = None
+        self.load_started = False  # round_start ja vem do inicio da carga do primeiro worker
+        self.workers_started = set()
+        self.workers_finished = set()
+        self.snapshots = []  # (t, submitted)
+        self.submitted = self.succ = self.fail = self.unfinished = 0
+        self.last_ts = None
+        self.last_wall = None
+
+    def now(self):
+        if self.last_ts is None:
+            return None
+        return self.last_ts + (time.monotonic() - self.last_wall)
+
+    def feed(self, line):
+        """Processa uma linha (sem ANSI) do log"""
+        match = EVENT_RE.match(line)
+        if not match:
+            return
+        ts = parse_timestamp(match.group(1)).timestamp()
+        self.last_ts, self.last_wall = ts, time.monotonic()
+        message = match.group(4)
+
+        start = ROUND_START_RE.search(message)
+        if start:
+            self.label = start.group(2)
+            self.active = True
+            self.round_start = ts
+            self.load_started = False
+            self.workers_started, self.workers_finished = set(), set()
+            self.snapshots = []
+            self.submitted = self.succ = self.fail = self.unfinished = 0
+            return
+
+        worker = WORKER_STARTING_RE.search(message)
+        if worker:
+            self.workers_started.add(worker.group(1))
+            # A carga comeca aqui: ancora a interpolacao no primeiro worker, nao no "Started round"
+            if not self.load_started and not self.snapshots:
+                self.round_start = ts
+                self.load_started = True
+            return
+
+        info = TX_INFO_RE.search(message)
+        if info:
+            label, _, submitted, succ, fail, unfinished = info.groups()
+            self.label = self.label or label
+            self.active = not self.load_finished()
+            if self.round_start is None:
+                self.round_start = ts
+            self.submitted, self.succ, self.fail, self.unfinished = (
+                int(submitted), int(succ), int(fail), int(unfinished))
+            self.snapshots.append((ts, self.submitted))
+            return
+
+        worker = WORKER_FINISHED_RE.search(message)
+        if worker:
+            # Com varios workers, os demais ainda enviam: so desativa quando todos terminarem
+            self.workers_finished.add(worker.group(1))
+            if self.load_finished():
+                self.active = False
+            return
+
+        if ROUND_END_RE.search(message):
+            self.active = False
+
+    def load_finished(self):
+        """Todos os workers que iniciaram o round ja terminaram de enviar"""
+        return bool(self.workers_finished) and self.workers_finished >= self.workers_started
+
+    def oldest_pending_age(self, now=None):
+        """Idade estimada (s) da transacao pendente mais antiga, ou None se nao houver pendentes"""
+        now = self.now() if now is None else now
+        if now is None or self.unfinished <= 0 or not self.snapshots:
+            return None
+        target = self.succ + self.fail + 1
+        prev_t, prev_s = self.round_start, 0
+        for t, submitted in self.snapshots:
+            if submitted >= target:
+                fraction = (target - prev_s) / (submitted - prev_s) if submitted > prev_s else 1.0
+                return now - (prev_t + fraction * (t - prev_t))
+            prev_t, prev_s = t, submitted
+        return None
+
+    def fail_rate(self):
+        completed = self.succ + self.fail
+        return self.fail / completed if completed else 0.0
+
+    def abort_reason(self):
+        """Motivo para abortar o round, ou None"""
+        if not self.active:
+            return None
+        completed = self.succ + self.fail
+        if self.max_fail_rate and completed >= self.min_completed and self.fail_rate() > self.max_fail_rate:
+            return f"taxa de falha {self.fail_rate():.0%} > {self.max_fail_rate:.0%} ({self.fail}/{completed})"
+        age = self.oldest_pending_age()
+        if self.max_latency and age is not None and age > self.max_latency:
+            return f"transacao pendente ha {age:.0f}s > {self.max_latency:g}s ({self.unfinished} pendentes)"
+        return None
+
+    def summary(self):
+        return {
+            "label": self.label,
+            "submitted": self.submitted,
+            "succ": self.succ,
+            "fail": self.fail,
+            "unfinished": self.unfinished,
+            "oldest_pending_age_s": self.oldest_pending_age(),
+        }
+
+def _reader(stream, lines):
+    for line in iter(stream.readline, ""):
+        lines.put(line)
+    lines.put(None)
+
+def stop_process_group(proc, timeout=10):
+    """Encerra o Caliper e seus processos filhos (npx -> node manager/workers)"""
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(proc.pid, signal.SIGKILL)
+        proc.wait()
+    except ProcessLookupError:
+        pass
+
+def run_streaming(cmd, log_path, progress, echo=True, cwd=None):
+    """
+    Executa o comando repassando a saida para o terminal e para log_path, e
+    encerra o processo assim que progress.abort_reason() indicar.
+    Retorna (codigo de saida, motivo do aborto ou None).
+    """
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+                            errors="replace", cwd=cwd, start_new_session=True)
+    lines = queue.Queue()
+    threading.Thread(target=_reader, args=(proc.stdout, lines), daemon=True).start()
+
+    reason = None
+    with open(log_path, "w") as log:
+        while True:
+            try:
+                line = lines.get(timeout=CHECK_INTERVAL)
+            except queue.Empty:
+                line = ""
+            if line is None:
+                break
+            if line:
+                log.write(line)
+                if echo:
+                    sys.stdout.write(line)
+                    sys.stdout.flush()
+                progress.feed(ANSI_RE.sub("", line).rstrip("\n"))
+            reason = progress.abort_reason()
+            if reason:
+                log.write(f"[runner] Round abortado: {reason}\n")
+                stop_process_group(proc)
+                break
+    return proc.wait(), reason
+
+def main():
+    parser = argparse.ArgumentParser(description="Avalia os limites de aborto sobre um log do Caliper")
+    parser.add_argument("log", help="Log do Caliper (open.log, query.log, ...)")
+    parser.add_argument("--max-fail-rate", type=float, default=DEFAULT_MAX_FAIL_RATE)
+    parser.add_argument("--max-latency", type=float, default=DEFAULT_MAX_LATENCY)
+    args = parser.parse_args()
+
+    # Replay: o relogio e so o timestamp das linhas
+    progress = RoundProgress(args.max_fail_rate, args.max_latency)
+    with open(args.log, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = ANSI_RE.sub("", line).rstrip("\n")
+            progress.feed(line)
+            progress.last_wall = time.monotonic()
+            reason = progress.abort_reason()
+            if reason:
+                print(f"Abortaria em {line[:23]}: {reason}")
+                return
+    print(f"Nenhum limite atingido: {progress.summary()}")
+
+if __name__ == "__main__":
+    main()
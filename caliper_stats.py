@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Estatisticas sobre as repeticoes e as varreduras de TPS dos experimentos
+Media, desvio padrao e intervalos de confianca por bootstrap, calculados
+para todos os grupos de uma vez com NumPy (sem loop por grupo), e deteccao
+do ponto de saturacao das curvas TPS alvo x throughput x latencia.
+Pontos em que o gerador de carga (Caliper) e o gargalo sao identificados e
+ficam fora da estimativa de capacidade. Para comparar duas versoes (baseline
+x candidato), teste de permutacao estratificado e tamanho de efeito.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BOOTSTRAP = 2000
+DEFAULT_CI_LEVEL = 0.95
+DEFAULT_SEED = 42
+
+# Saturacao: throughput abaixo de 90% do alvo ou latencia 3x maior que a do menor TPS
+DEFAULT_TRACKING = 0.9
+DEFAULT_LATENCY_FACTOR = 3.0
+# SLO de latencia media (s) para o maior TPS sustentavel
+DEFAULT_LATENCY_SLO = 10.0
+
+# Gargalo no gerador de carga: taxa de envio abaixo de 95% do alvo, throughput acompanhando o que foi
+# enviado e CPU media dos nos abaixo de 0.5% (CPU%(avg) do monitor docker; nos relatorios da rede de
+# teste os nos ficam entre 0.03% ociosos e ~1.7% sob carga de escrita)
+DEFAULT_SEND_TRACKING = 0.95
+DEFAULT_IDLE_CPU = 0.5
+
+# Comparacao baseline x candidato: permutacoes, nivel de significancia e piora maxima tolerada
+DEFAULT_PERMUTATIONS = 10000
+DEFAULT_ALPHA = 0.05
+DEFAULT_MAX_REGRESSION = 0.05
+
+# Limite de elementos da matriz de reamostragem por bloco de grupos (~64 MB em float64)
+MAX_BLOCK_ELEMENTS = 8_000_000
+
+def padded_groups(df, group_keys, col):
+    """
+    Organiza os valores de uma coluna em uma matriz (grupos x repeticoes),
+    preenchida com NaN. Retorna (chaves dos grupos, matriz, n por grupo).
+    """
+    values = df[list(group_keys) + [col]].dropna(subset=[col])
+    grouped = values.groupby(list(group_keys), dropna=False, sort=True)
+    keys = grouped.size().index
+    counts = grouped.size().to_numpy()
+    position = grouped.cumcount().to_numpy()
+    group_idx = grouped.ngroup().to_numpy()
+
+    matrix = np.full((len(keys), counts.max() if len(counts) else 0), np.nan)
+    matrix[group_idx, position] = values[col].to_numpy(dtype=float)
+    return keys, matrix, counts
+
+def bootstrap_means(matrix, counts, n_boot=DEFAULT_BOOTSTRAP, seed=DEFAULT_SEED):
+    """
+    Medias de n_boot reamostragens (com reposicao) de cada linha da matriz.
+    Cada grupo e reamostrado apenas entre seus counts[g] primeiros valores.
+    Retorna uma matriz (grupos x n_boot).
+    """
+    rng = np.random.default_rng(seed)
+    n_groups, width = matrix.shape
+    means = np.full((n_groups, n_boot), np.nan)
+    if n_groups == 0 or width == 0:
+        return means
+
+    # Processa em blocos de grupos para limitar a memoria da matriz de indices
+    block = max(1, MAX_BLOCK_ELEMENTS // (n_boot * width))
+    for start in range(0, n_groups, block):
+        stop = min(n_groups, start + block)
+        n = counts[start:stop]
+        # Indices aleatorios em [0, n_g) para cada grupo; colunas >= n_g sao ignoradas
+        idx = (rng.random((stop - start, n_boot, width)) * n[:, None, None]).astype(np.int64)
+        samples = matrix[start:stop][np.arange(stop - start)[:, None, None], idx]
+        valid = np.arange(width) < n[:, None, None]
+        means[start:stop] = np.where(valid, samples, 0.0).sum(axis=2) / n[:, None]
+    return means
+
+def bootstrap_summary(df, group_keys, cols, n_boot=DEFAULT_BOOTSTRAP, level=DEFAULT_CI_LEVEL, seed=DEFAULT_SEED):
+    """
+    Para cada grupo e cada coluna: media, desvio padrao (amostral), numero de
+    repeticoes e intervalo de confianca percentil do bootstrap.
+    Grupos com uma unica repeticao ficam sem desvio e sem intervalo.
+
+    Colunas geradas: {col}_mean, {col}_std, {col}_n, {col}_ci_low, {col}_ci_high
+    """
+    alpha = (1 - level) / 2
+    result = None
+    for col in cols:
+        keys, matrix, counts = padded_groups(df, group_keys, col)
+        means = bootstrap_means(matrix, counts, n_boot, seed)
+        low, high = np.percentile(means, [alpha * 100, (1 - alpha) * 100], axis=1)
+
+        single = counts < 2
+        mean = np.nansum(matrix, axis=1) / np.maximum(counts, 1)
+        sq_dev = np.nansum((matrix - mean[:, None]) ** 2, axis=1)
+        std = np.sqrt(sq_dev / np.maximum(counts - 1, 1))
+        stats = pd.DataFrame({
+            f"{col}_mean": mean,
+            f"{col}_std": np.where(single, np.nan, std),
+            f"{col}_n": counts,
+            f"{col}_ci_low": np.where(single, np.nan, low),
+            f"{col}_ci_high": np.where(single, np.nan, high),
+        }, index=keys)
+        result = stats if result is None else result.join(stats, how="outer")
+
+    if result is None:
+        return pd.DataFrame(columns=list(group_keys))
+    return result.reset_index()
+
+def is_saturated(tps, throughput, avg_latency, base_latency,
+                 tracking=DEFAULT_TRACKING, latency_factor=DEFAULT_LATENCY_FACTOR):
+    """
+    Criterio de saturacao de um ponto (escalares ou Series): o throughput nao
+    acompanha o TPS alvo ou a latencia passou de latency_factor vezes a base
+    """
+    return (throughput / tps < tracking) | (avg_latency > base_latency * latency_factor)
+
+def is_driver_bound(tps, send_rate, throughput, avg_cpu, send_tracking=DEFAULT_SEND_TRACKING,
+                    idle_cpu=DEFAULT_IDLE_CPU, tracking=DEFAULT_TRACKING):
+    """
+    Ponto limitado pelo gerador de carga (escalares ou Series): a taxa de
+    envio nao chega ao TPS alvo enquanto a rede da conta de tudo o que foi
+    enviado (throughput / envio >= tracking) e os nos estao ociosos. Se o
+    throughput fica abaixo do enviado, o gargalo e a rede, nao o gerador.
+    Sem CPU medida o ponto nao e marcado.
+    """
+    return ((send_rate / tps < send_tracking) & (throughput / send_rate >= tracking)
+            & (avg_cpu < idle_cpu))
+
+# Curva sem TPS alvo (relatorios sem rateControl.tps): a saturacao nao pode ser avaliada
+UNKNOWN_TPS_STATUS = 'TPS alvo desconhecido'
+# Curva sem nenhum ponto com latencia valida (todos abortados ou sem sucesso): sem latencia base
+UNKNOWN_BASE_STATUS = 'indeterminado'
+
+def saturation_points(df, group_keys, tracking=DEFAULT_TRACKING, latency_factor=DEFAULT_LATENCY_FACTOR,
+                      latency_slo=DEFAULT_LATENCY_SLO):
+    """
+    Ponto de saturacao de cada curva TPS alvo x throughput x latencia.
+
+    Um ponto esta saturado quando o throughput deixa de acompanhar o alvo
+    (throughput / tps < tracking) ou quando a latencia media passa de
+    latency_factor vezes a latencia base (a do menor TPS da curva com latencia
+    valida e sem round abortado); a partir do primeiro ponto saturado, os
+    seguintes tambem sao considerados saturados. Pontos sem TPS alvo nao sao
+    avaliados, e curvas so com esses pontos recebem o status
+    UNKNOWN_TPS_STATUS; curvas sem latencia base recebem UNKNOWN_BASE_STATUS.
+    Com a coluna aborted (rounds abortados no ponto), um ponto com round
+    abortado tambem esta saturado.
+
+    Recebe uma linha por (group_keys, tps) com as colunas tps, throughput e
+    avg_latency. Retorna (pontos, resumo):
+      pontos: o df de entrada ordenado, com tracking_ratio e saturated
+      resumo: uma linha por curva com o joelho (maior TPS nao saturado),
+              a latencia no joelho, o primeiro TPS saturado e o maior TPS
+              sustentavel dentro do SLO de latencia
+    """
+    keys = list(group_keys)
+    points = df.sort_values(keys + ['tps']).reset_index(drop=True)
+    points['tracking_ratio'] = points['throughput'] / points['tps']
+
+    # Curvas numeradas: chaves com NaN (ex.: workers desconhecido) nao alinham em um indice
+    curve = points.groupby(keys, dropna=False, sort=False).ngroup()
+    known = points['tps'].notna()
+    aborted = points['aborted'].fillna(0) > 0 if 'aborted' in points.columns else pd.Series(False, index=points.index)
+    # Latencia base: menor TPS com latencia valida (o primeiro ponto pode ter sido abortado ou so ter falhas)
+    valid_latency = known & points['avg_latency'].notna() & ~aborted
+    base_latency = points['avg_latency'].where(valid_latency).groupby(curve).transform('first')
+    saturated = is_saturated(points['tps'], points['throughput'], points['avg_latency'], base_latency,
+                             tracking, latency_factor)
+    saturated = (saturated | aborted) & known
+    points['saturated'] = saturated.astype(int).groupby(curve).cummax().astype(bool)
+
+    summary = points.groupby(curve).agg(
+        points=('tps', 'size'),
+        min_tps=('tps', 'min'),
+        max_tps=('tps', 'max'),
+        peak_throughput=('throughput', 'max'),
+    )
+
+    def last_point(mask):
+        # Ultimo ponto (maior TPS) de cada curva que satisfaz a mascara
+        last = mask & ~curve.where(mask).duplicated(keep='last')
+        return points[last].set_index(curve[last])
+
+    stable = last_point(~points['saturated'] & known)
+    summary['knee_tps'] = stable['tps']
+    summary['knee_throughput'] = stable['throughput']
+    summary['knee_latency'] = stable['avg_latency']
+    summary['first_saturated_tps'] = points[points['saturated']].groupby(curve[points['saturated']])['tps'].first()
+
+    slo = last_point(~points['saturated'] & known & (points['avg_latency'] <= latency_slo))
+    summary['slo_tps'] = slo['tps']
+    summary['slo_throughput'] = slo['throughput']
+    summary['slo_latency'] = slo['avg_latency']
+
+    summary['status'] = 'saturado'
+    summary.loc[summary['first_saturated_tps'].isna(), 'status'] = 'nao saturou'
+    summary.loc[summary['knee_tps'].isna(), 'status'] = 'saturado abaixo do menor TPS'
+    summary.loc[base_latency.groupby(curve).first().isna(), 'status'] = UNKNOWN_BASE_STATUS
+    summary.loc[summary['min_tps'].isna(), 'status'] = UNKNOWN_TPS_STATUS
+    curve_keys = points[keys].groupby(curve).first()
+    return points, pd.concat([curve_keys, summary], axis=1).reset_index(drop=True)
+
+def stratified_permutation_test(strata, n_perm=DEFAULT_PERMUTATIONS, seed=DEFAULT_SEED):
+    """
+    Teste de permutacao bilateral da diferenca candidato - baseline, com as
+    repeticoes permutadas apenas dentro de cada estrato (ex.: ponto de TPS
+    alvo). strata e uma lista de pares (baseline, candidato) de arrays.
+
+    Estatistica: media entre os estratos de (media do candidato - media do
+    baseline) / media conjunta do estrato; as permutacoes de todos os
+    estratos sao feitas de uma vez com NumPy. Retorna (estatistica, p,
+    combinacoes), em que combinacoes e o numero de rotulagens distintas: com
+    poucas, o menor p possivel (2 / combinacoes) pode nao atingir o nivel
+    de significancia.
+    """
+    rng = np.random.default_rng(seed)
+    observed, permuted = 0.0, np.zeros(n_perm)
+    combinations, used = 1, 0
+    for base, cand in strata:
+        base, cand = np.asarray(base, dtype=float), np.asarray(cand, dtype=float)
+        pooled = np.concatenate([base, cand])
+        scale = pooled.mean()
+        if len(base) == 0 or len(cand) == 0 or not scale:
+            continue
+        observed += (cand.mean() - base.mean()) / scale
+        shuffled = pooled[rng.random((n_perm, len(pooled))).argsort(axis=1)]
+        permuted += (shuffled[:, :len(cand)].mean(axis=1) - shuffled[:, len(cand):].mean(axis=1)) / scale
+        combinations *= math.comb(len(pooled), len(cand))
+        used += 1
+    if not used:
+        return np.nan, np.nan, 0
+    observed, permuted = observed / used, permuted / used
+    extreme = np.count_nonzero(np.abs(permuted) >= abs(observed) - 1e-12)
+    return observed, (extreme + 1) / (n_perm + 1), combinations
+
+def hedges_g(base, cand):
+    """Tamanho de efeito (g de Hedges) candidato - baseline; NaN com menos de 2 repeticoes em um dos lados"""
+    base, cand = np.asarray(base, dtype=float), np.asarray(cand, dtype=float)
+    n_b, n_c = len(base), len(cand)
+    if n_b < 2 or n_c < 2:
+        return np.nan
+    pooled_var = ((n_b - 1) * base.var(ddof=1) + (n_c - 1) * cand.var(ddof=1)) / (n_b + n_c - 2)
+    if pooled_var <= 0:
+        return np.nan
+    return (cand.mean() - base.mean()) / math.sqrt(pooled_var) * (1 - 3 / (4 * (n_b + n_c) - 9))
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Cache de deploy dos contratos do benchmark
+Evita o `npx hardhat ignition deploy --reset` a cada bateria: o endereco de
+um deploy e guardado sob a chave (chainId, hash do bloco genesis, hash do
+bytecode do contrato) e reaproveitado enquanto o codigo no endereco
+(eth_getCode) for o mesmo gravado no deploy.
+
+Um novo deploy so acontece quando:
+  - a rede e outra (chainId ou genesis diferente)
+  - o contrato mudou (artefato compilado ou fontes .sol diferentes)
+  - a rede foi reiniciada com o mesmo genesis e o endereco nao tem mais o
+    codigo (eth_getCode vazio ou diferente)
+
+Estrutura: deploy_cache.json na raiz do repositorio. Baterias em paralelo
+gravam sob um lock (deploy_cache.json.lock), relendo o arquivo antes de cada
+mudanca.
+
+Uso:
+    python3 deploy_cache.py                      # lista as entradas
+    python3 deploy_cache.py --check               # verifica as entradas da rede atual
+"""
+
+import os
+import json
+import fcntl
+import hashlib
+import argparse
+from datetime import datetime
+from contextlib import contextmanager
+from pathlib import Path
+
+from besu_readiness import RpcClient, RpcError, RPC_URL
+
+base_dir = Path(__file__).parent
+CACHE_PATH = base_dir / "deploy_cache.json"
+HARDHAT_DIR = base_dir.parent / "Hardhat-contracts"
+CACHE_VERSION = 1
+
+def sha256_hex(data):
+    return hashlib.sha256(data if isinstance(data, bytes) else data.encode()).hexdigest()
+
+def chain_identity(client):
+    """(chainId, hash do bloco genesis) da rede"""
+    chain_id = int(client.call("eth_chainId"), 16)
+    genesis = client.call("eth_getBlockByNumber", ["0x0", False])
+    if not genesis:
+        raise RpcError("eth_getBlockByNumber: bloco genesis nao encontrado")
+    return chain_id, genesis["hash"]
+
+def contract_fingerprint(contract_name, hardhat_dir=HARDHAT_DIR):
+    """
+    Hash do contrato: bytecode do artefato compilado pelo Hardhat mais as
+    fontes .sol (fontes alteradas ainda nao recompiladas tambem invalidam o
+    cache). Retorna None se nem o artefato nem as fontes forem encontrados.
+    """
+    hardhat_dir = Path(hardhat_dir)
+    h = hashlib.sha256()
+    found = False
+    for artifact in sorted((hardhat_dir / "artifacts" / "contracts").glob(f"**/{contract_name}.json")):
+        h.update(json.loads(artifact.read_text()).get("bytecode", "").encode())
+        found = True
+    for source in sorted((hardhat_dir / "contracts").glob("**/*.sol")):
+        h.update(source.read_bytes())
+        found = True
+    return h.hexdigest() if found else None
+
+def cache_key(chain_id, genesis_hash, contract_hash):
+    return f"{chain_id}:{genesis_hash}:{contract_hash}"
+
+@contextmanager
+def file_lock(lock_path):
+    """Lock exclusivo entre processos (flock) sobre lock_path, criado se nao existir"""
+    Path(lock_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+class DeployCache:
+    """Enderecos de contratos implantados, por rede e versao do contrato"""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = Path(path)
+        self.entries = self.read()
+
+    def read(self):
+        """Entradas gravadas no arquivo (vazio se nao existir ou for invalido)"""
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                return data.get("entries", {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def locked(self):
+        """Lock exclusivo do cache entre processos (baterias em paralelo do experiment_scheduler)"""
+        return file_lock(self.path.with_suffix(".json.lock"))
+
+    def save(self):
+        """Grava o cache de forma atomica (chamar com o lock)"""
+        tmp_path = self.path.with_suffix(f".json.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": CACHE_VERSION, "entries": self.entries}, f, indent=4, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def update(self, contract_name, key, entry=None, stale=None):
+        """
+        Grava (entry) ou remove (stale: a entrada invalidada) uma entrada.
+        O arquivo e relido sob o lock e a mudanca aplicada sobre ele, para
+        nao perder entradas gravadas por outras baterias desde a leitura.
+        Uma entrada so e removida se ainda for a invalidada (outra bateria
+        pode ja ter refeito o deploy).
+        """
+        with self.locked():
+            self.entries = self.read()
+            entries = self.entries.setdefault(contract_name, {})
+            if entry is not None:
+                entries[key] = entry
+            elif entries.get(key) == stale:
+                entries.pop(key, None)
+            self.save()
+
+    def lookup(self, client, contract_name, contract_hash, identity=None):
+        """
+        Endereco em cache para o contrato nesta rede, verificado com
+        eth_getCode; None se nao houver ou se o codigo nao estiver mais la.
+        """
+        if contract_hash is None:
+            return None
+        chain_id, genesis_hash = identity or chain_identity(client)
+        key = cache_key(chain_id, genesis_hash, contract_hash)
+        entry = self.entries.get(contract_name, {}).get(key)
+        if entry is None:
+            return None
+        code = client.call("eth_getCode", [entry["address"], "latest"])
+        if not code or code == "0x" or sha256_hex(code.lower()) != entry["code_sha256"]:
+            # Rede reiniciada com o mesmo genesis: o endereco nao tem mais o contrato
+            self.update(contract_name, key, stale=entry)
+            return None
+        return entry["address"]
+
+    def store(self, client, contract_name, contract_hash, address, identity=None):
+        """Registra um deploy; o hash do codigo vem da propria rede (eth_getCode)"""
+        if contract_hash is None:
+            return None
+        chain_id, genesis_hash = identity or chain_identity(client)
+        code = client.call("eth_getCode", [address, "latest"])
+        if not code or code == "0x":
+            return None
+        entry = {
+            "address": address,
+            "chain_id": chain_id,
+            "genesis_hash": genesis_hash,
+            "contract_sha256": contract_hash,
+            "code_sha256": sha256_hex(code.lower()),
+            "deployed": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.update(contract_name, cache_key(chain_id, genesis_hash, contract_hash), entry=entry)
+        return entry
+
+def main():
+    parser = argparse.ArgumentParser(description="Lista e verifica o cache de deploy dos contratos")
+    parser.add_argument("--check", action="store_true", help="Verifica com eth_getCode as entradas da rede atual")
+    parser.add_argument("--rpc-url", default=RPC_URL, help=f"Endpoint JSON-RPC HTTP (padrao: {RPC_URL})")
+    parser.add_argument("--cache", default=str(CACHE_PATH))
+    args = parser.parse_args()
+
+    cache = DeployCache(args.cache)
+    if not cache.entries:
+        print(f"Cache vazio ({args.cache})")
+        return
+
+    identity = None
+    client = RpcClient(args.rpc_url)
+    if args.check:
+        try:
+            identity = chain_identity(client)
+        except RpcError as e:
+            print(f"ERRO: rede inacessivel em {args.rpc_url}: {e}")
+            return
+
+    for contract_name, entries in cache.entries.items():
+        for key, entry in list(entries.items()):
+            status = ""
+            if identity and (entry["chain_id"], entry["genesis_hash"]) == identity:
+                valid = cache.lookup(client, contract_name, entry["contract_sha256"], identity)
+                status = " [valido]" if valid else " [removido: codigo ausente]"
+            print(f"{contract_name}: {entry['address']} chainId {entry['chain_id']} "
+                  f"genesis {entry['genesis_hash'][:12]}... deploy {entry['deployed']}{status}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+"""
+Amostragem de recursos dos containers Besu em alta frequencia
+O monitor docker do Caliper amostra a cada 5s e guarda apenas media e
+maximo por container, o que nao mostra os picos de producao de bloco com
+tempo de bloco de 2s. Este script le as estatisticas direto da API do Docker
+Engine pelo socket Unix, de todos os containers /node-besuN ao mesmo tempo
+(uma conexao keep-alive por container, requisicoes concorrentes com
+asyncio), em intervalos abaixo de 1s.
+
+Cada amostra e um registro de tamanho fixo (contadores acumulados de CPU,
+memoria, rede e disco) gravado em um ring buffer mapeado em memoria (mmap):
+um arquivo por execucao, de tamanho constante, em que as amostras mais
+antigas sao sobrescritas quando a capacidade acaba. Taxas (CPU %, MB/s) sao
+calculadas na analise a partir dos contadores.
+
+A analise junta as amostras com os limites de cada round lidos do log do
+Caliper (caliper_logs.py) e gera uma linha por round e container.
+
+Uso:
+    python3 docker_sampler.py record --output run.samples.ring --interval 0.25
+    python3 docker_sampler.py analyze run.samples.ring --log open.log
+    python3 docker_sampler.py                    # todos os experimentos
+"""
+
+import re
+import sys
+import json
+import mmap
+import time
+import signal
+import struct
+import asyncio
+import argparse
+import subprocess
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from caliper_logs import parse_log
+from node_resources import NODE_PATTERN
+
+# Cores para output
+class Colors:
+    BLUE = '\033[0;34m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    RED = '\033[0;31m'
+    NC = '\033[0m'
+
+def log_info(msg):
+    print(f"{Colors.BLUE}[INFO]{Colors.NC} {msg}", flush=True)
+
+def log_success(msg):
+    print(f"{Colors.GREEN}[OK]{Colors.NC} {msg}", flush=True)
+
+def log_warning(msg):
+    print(f"{Colors.YELLOW}[WARN]{Colors.NC} {msg}", flush=True)
+
+def log_error(msg):
+    print(f"{Colors.RED}[ERROR]{Colors.NC} {msg}", flush=True)
+
+base_dir = Path(__file__).parent
+REPORTS_DIR = base_dir / "reports_htmls" / "experiments"
+OUTPUT_DIR = base_dir / "reports_csv" / "experiments"
+ROUNDS_CSV_NAME = "docker_samples_rounds.csv"
+
+DOCKER_SOCKET = "/var/run/docker.sock"
+DEFAULT_INTERVAL = 0.25
+DEFAULT_CAPACITY = 1 << 16      # registros (~4.5 MB): 10 nos a 4 Hz cobrem ~27 min
+RING_SUFFIX = ".samples.ring"
+
+# Cabecalho do ring buffer: magic, tamanho do registro, containers, capacidade,
+# registros ja gravados (contador monotono; posicao = count % capacity), intervalo
+RING_MAGIC = b"CALRING1"
+HEADER = struct.Struct("<8sIIQQd")
+COUNT_OFFSET = 24
+NAME_SIZE = 64
+MAX_CONTAINERS = 32
+HEADER_SIZE = 4096
+
+# Registro: instante (epoch), indice do container, CPUs online e contadores acumulados
+RECORD = struct.Struct("<dHH4xQQQQQQQ")
+COUNTERS = ("cpu_total_ns", "system_cpu_ns", "memory_bytes", "net_rx_bytes", "net_tx_bytes",
+            "blk_read_bytes", "blk_write_bytes")
+RECORD_DTYPE = np.dtype([("t", "<f8"), ("container", "<u2"), ("online_cpus", "<u2"), ("pad", "V4")]
+                        + [(name, "<u8") for name in COUNTERS])
+
+ROUND_COLUMNS = ["log", "run", "round", "label", "node", "samples", "duration_s", "cpu_avg", "cpu_p95", "cpu_max",
+                 "memory_avg_gb", "memory_max_gb", "disc_write_mb", "disc_write_mb_s_max",
+                 "net_rx_mb", "net_tx_mb"]
+
+class DockerError(Exception):
+    pass
+
+# Ring buffer ------------------------------------------------------------
+
+class RingBuffer:
+    """Arquivo de tamanho fixo com registros RECORD, mapeado em memoria"""
+
+    def __init__(self, path, mm, names, capacity, interval, count):
+        self.path = Path(path)
+        self.mm = mm
+        self.names = names
+        self.capacity = capacity
+        self.interval = interval
+        self.count = count
+
+    @classmethod
+    def create(cls, path, names, capacity=DEFAULT_CAPACITY, interval=DEFAULT_INTERVAL):
+        if len(names) > MAX_CONTAINERS:
+            raise ValueError(f"no maximo {MAX_CONTAINERS} containers por ring buffer")
+        size = HEADER_SIZE + capacity * RECORD.size
+        with open(path, "wb") as f:
+            f.truncate(size)
+        with open(path, "r+b") as f:
+            mm = mmap.mmap(f.fileno(), size)
+        HEADER.pack_into(mm, 0, RING_MAGIC, RECORD.size, len(names), capacity, 0, interval)
+        for i, name in enumerate(names):
+            encoded = name.encode()[:NAME_SIZE]
+            mm[HEADER.size + i * NAME_SIZE:HEADER.size + i * NAME_SIZE + len(encoded)] = encoded
+        return cls(path, mm, list(names), capacity, interval, 0)
+
+    @classmethod
+    def open(cls, path):
+        """Abre um ring buffer para leitura (pode estar sendo gravado)"""
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, record_size, n_names, capacity, count, interval = HEADER.unpack_from(mm, 0)
+        if magic != RING_MAGIC or record_size != RECORD.size:
+            mm.close()
+            raise ValueError(f"{path}: nao e um ring buffer de amostras ({magic!r})")
+        names = [mm[HEADER.size + i * NAME_SIZE:HEADER.size + (i + 1) * NAME_SIZE].rstrip(b"\0").decode()
+                 for i in range(n_names)]
+        return cls(path, mm, names, capacity, interval, count)
+
+    def append(self, t, container, online_cpus, counters):
+        offset = HEADER_SIZE + (self.count % self.capacity) * RECORD.size
+        RECORD.pack_into(self.mm, offset, t, container, online_cpus, *counters)
+        # O contador so avanca depois do registro completo
+        self.count += 1
+        struct.pack_into("<Q", self.mm, COUNT_OFFSET, self.count)
+
+    def records(self):
+        """Registros em ordem de gravacao (array estruturado RECORD_DTYPE)"""
+        count = struct.unpack_from("<Q", self.mm, COUNT_OFFSET)[0]
+        n = min(count, self.capacity)
+        data = np.frombuffer(self.mm, dtype=RECORD_DTYPE, count=self.capacity, offset=HEADER_SIZE)
+        if count > self.capacity:
+            start = count % self.capacity
+            return np.concatenate([data[start:], data[:start]])
+        return data[:n].copy()
+
+    def close(self):
+        self.mm.close()
+
+# Docker Engine API ------------------------------------------------------
+
+class DockerConnection:
+    """Conexao HTTP/1.1 keep-alive com o Docker Engine pelo socket Unix"""
+
+    def __init__(self, socket_path=DOCKER_SOCKET):
+        self.socket_path = socket_path
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_unix_connection(self.socket_path)
+        try:
+            self.writer.write(f"GET {path} HTTP/1.1\r\nHost: docker\r\n\r\n".encode())
+            await self.writer.drain()
+            status_line = await self.reader.readline()
+            if not status_line:
+                raise ConnectionError("conexao fechada pelo Docker")
+            status = int(status_line.split()[1])
+            headers = {}
+            while True:
+                line = await self.reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await self._read_body(headers)
+        except (ConnectionError, asyncio.IncompleteReadError, IndexError, ValueError):
+            self.close()
+            raise
+        if status != 200:
+            raise DockerError(f"GET {path}: HTTP {status} {body[:200].decode(errors='replace')}")
+        return json.loads(body)
+
+    async def _read_body(self, headers):
+        if "content-length" in headers:
+            return await self.reader.readexactly(int(headers["content-length"]))
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    return b"".join(chunks)
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readexactly(2)
+        raise DockerError("resposta sem Content-Length nem chunked")
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+def node_sort_key(name):
+    match = re.search(r'(\d+)$', name)
+    return (int(match.group(1)) if match else 0, name)
+
+async def list_nodes(conn, pattern=NODE_PATTERN):
+    """[(nome, id)] dos containers em execucao cujo nome casa com pattern"""
+    containers = await conn.get("/containers/json")
+    nodes = []
+    for container in containers:
+        names = [n.lstrip("/") for n in container.get("Names", [])]
+        name = next((n for n in names if re.search(pattern, n)), None)
+        if name:
+            nodes.append((name, container["Id"]))
+    return sorted(nodes, key=lambda node: node_sort_key(node[0]))
+
+def stats_counters(stats):
+    """Contadores acumulados de uma resposta de /containers/{id}/stats: (CPUs online, COUNTERS)"""
+    cpu = stats.get("cpu_stats", {})
+    usage = cpu.get("cpu_usage", {})
+    online = cpu.get("online_cpus") or len(usage.get("percpu_usage") or []) or 1
+
+    memory = stats.get("memory_stats", {})
+    mem_stats = memory.get("stats", {})
+    # Mesmo calculo do docker stats: uso menos o cache inativo (cgroup v2 ou v1)
+    inactive = mem_stats.get("inactive_file", mem_stats.get("total_inactive_file", 0))
+    mem_used = max(0, memory.get("usage", 0) - inactive)
+
+    networks = (stats.get("networks") or {}).values()
+    rx = sum(n.get("rx_bytes", 0) for n in networks)
+    tx = sum(n.get("tx_bytes", 0) for n in networks)
+
+    blk_read = blk_write = 0
+    for entry in (stats.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []:
+        op = entry.get("op", "").lower()
+        if op == "read":
+            blk_read += entry.get("value", 0)
+        elif op == "write":
+            blk_write += entry.get("value", 0)
+
+    return online, (usage.get("total_usage", 0), cpu.get("system_cpu_usage", 0), mem_used, rx, tx,
+                    blk_read, blk_write)
+
+async def record(output, socket_path=DOCKER_SOCKET, interval=DEFAULT_INTERVAL, duration=0,
+                 capacity=DEFAULT_CAPACITY, pattern=NODE_PATTERN, stop=None):
+    """
+    Amostra todos os containers a cada interval segundos ate stop ser
+    acionado (ou por duration segundos). Ticks perdidos (amostragem mais
+    lenta que o intervalo) sao pulados, sem acumular atraso.
+    Retorna (amostras gravadas, erros, ticks pulados).
+    """
+    stop = stop or asyncio.Event()
+    conn = DockerConnection(socket_path)
+    try:
+        nodes = await list_nodes(conn, pattern)
+    finally:
+        conn.close()
+    if not nodes:
+        raise DockerError(f"nenhum container em execucao casa com {pattern!r}")
+    ring = RingBuffer.create(output, [name for name, _ in nodes], capacity, interval)
+    conns = [DockerConnection(socket_path) for _ in nodes]
+    paths = [f"/containers/{container_id}/stats?stream=false&one-shot=true" for _, container_id in nodes]
+
+    errors = skipped = 0
+    start = time.monotonic()
+    tick = 0
+    try:
+        while not stop.is_set() and not (duration and time.monotonic() - start >= duration):
+            t = time.time()
+            results = await asyncio.gather(*(conn.get(path) for conn, path in zip(conns, paths)),
+                                           return_exceptions=True)
+            for i, result in enumerate(results):
+                if isinstance(result, Exception):
+                    errors += 1
+                    continue
+                online, counters = stats_counters(result)
+                ring.append(t, i, online, counters)
+
+            tick += 1
+            late = int((time.monotonic() - start) / interval) + 1 - tick
+            if late > 0:
+                skipped += late
+                tick += late
+            try:
+                await asyncio.wait_for(stop.wait(), max(0.0, start + tick * interval - time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        for conn in conns:
+            conn.close()
+        samples = ring.count
+        ring.close()
+    return samples, errors, skipped
+
+def start_recorder(output, interval=DEFAULT_INTERVAL, socket_path=DOCKER_SOCKET, capacity=DEFAULT_CAPACITY,
+                   pattern=NODE_PATTERN):
+    """Inicia a amostragem em um processo separado (para durante um round do Caliper)"""
+    cmd = [sys.executable, str(base_dir / "docker_sampler.py"), "record", "--output", str(output),
+           "--interval", str(interval), "--socket", socket_path, "--capacity", str(capacity),
+           "--pattern", pattern]
+    return subprocess.Popen(cmd)
+
+def stop_recorder(proc, timeout=10):
+    """Encerra o processo de amostragem (SIGTERM) e espera o ring buffer ser fechado"""
+    if proc.poll() is None:
+        proc.terminate()
+        try:
+            proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+    return proc.returncode
+
+# Analise ----------------------------------------------------------------
+
+def load_samples(path):
+    """Amostras de um ring buffer como DataFrame (t, node, contadores)"""
+    ring = RingBuffer.open(path)
+    try:
+        data = ring.records()
+        names = ring.names
+    finally:
+        ring.close()
+    df = pd.DataFrame({name: data[name] for name in ("t", "container", "online_cpus") + COUNTERS})
+    df["node"] = pd.Series(np.array(names, dtype=object)[df["container"].to_numpy()] if names else [],
+                           index=df.index, dtype="string")
+    return df.drop(columns="container")
+
+def sample_rates(samples):
+    """
+    Taxas entre amostras consecutivas de cada container: CPU % (mesma formula
+    do docker stats), memoria em GB, disco e rede em MB no intervalo e em MB/s.
+    A primeira amostra de cada container nao tem taxa.
+    """
+    df = samples.sort_values(["node", "t"]).reset_index(drop=True)
+    grouped = df.groupby("node")
+    delta = grouped[["t"] + list(COUNTERS)].diff()
+    # Contadores reiniciados (container recriado) viram NaN
+    counters = delta[list(COUNTERS)].astype(float)
+    counters = counters.where(counters >= 0)
+
+    mb = 1024 ** 2
+    rates = df[["node", "t"]].copy()
+    rates["dt"] = delta["t"]
+    rates["cpu"] = (counters["cpu_total_ns"] / counters["system_cpu_ns"].where(counters["system_cpu_ns"] > 0)
+                    * df["online_cpus"] * 100)
+    rates["memory_gb"] = df["memory_bytes"] / 1024 ** 3
+    rates["disc_write_mb"] = counters["blk_write_bytes"] / mb
+    rates["disc_read_mb"] = counters["blk_read_bytes"] / mb
+    rates["net_rx_mb"] = counters["net_rx_bytes"] / mb
+    rates["net_tx_mb"] = counters["net_tx_bytes"] / mb
+    rates["disc_write_mb_s"] = rates["disc_write_mb"] / rates["dt"].where(rates["dt"] > 0)
+    return rates
+
+def round_windows(log_path):
+    """Limites (epoch) de cada round registrado em um log do Caliper"""
+    windows = []
+    for run_index, run in enumerate(parse_log(log_path)):
+        for rnd in run["rounds"]:
+            if rnd["start"] is None or rnd["end"] is None:
+                continue
+            windows.append({"run": run_index, "round": rnd["round"], "label": rnd["label"],
+                            "start": rnd["start"].timestamp(), "end": rnd["end"].timestamp()})
+    return pd.DataFrame(windows, columns=["run", "round", "label", "start", "end"])
+
+def join_rounds(rates, windows):
+    """
+    Atribui cada amostra ao round em que caiu (pelos limites do log) e
+    resume cada round por container.
+    """
+    if rates.empty or windows.empty:
+        return pd.DataFrame(columns=[c for c in ROUND_COLUMNS if c != "log"])
+    windows = windows.sort_values("start").reset_index(drop=True)
+    starts = windows["start"].to_numpy()
+    idx = np.searchsorted(starts, rates["t"].to_numpy(), side="right") - 1
+    inside = (idx >= 0) & (rates["t"].to_numpy() <= windows["end"].to_numpy()[np.clip(idx, 0, None)])
+    df = rates[inside].assign(window=idx[inside])
+
+    summary = df.groupby(["window", "node"]).agg(
+        samples=("t", "size"),
+        cpu_avg=("cpu", "mean"),
+        cpu_p95=("cpu", lambda s: s.quantile(0.95)),
+        cpu_max=("cpu", "max"),
+        memory_avg_gb=("memory_gb", "mean"),
+        memory_max_gb=("memory_gb", "max"),
+        disc_write_mb=("disc_write_mb", "sum"),
+        disc_write_mb_s_max=("disc_write_mb_s", "max"),
+        net_rx_mb=("net_rx_mb", "sum"),
+        net_tx_mb=("net_tx_mb", "sum"),
+    ).reset_index()
+    summary = summary.merge(windows[["run", "round", "label", "start", "end"]], left_on="window",
+                            right_index=True)
+    summary["duration_s"] = summary["end"] - summary["start"]
+    summary["node_index"] = summary["node"].map(lambda n: node_sort_key(n)[0])
+    summary = summary.sort_values(["window", "node_index"])
+    return summary[[c for c in ROUND_COLUMNS if c != "log"]].reset_index(drop=True)
+
+def log_for_ring(ring_path):
+    """Log do Caliper da mesma execucao: X.samples.ring -> X.log ou {funcao}.log"""
+    ring_path = Path(ring_path)
+    stem = ring_path.name[:-len(RING_SUFFIX)]
+    for candidate in (f"{stem}.log", f"{stem.split('_report')[0]}.log"):
+        if (ring_path.parent / candidate).exists():
+            return ring_path.parent / candidate
+    return None
+
+def analyze_ring(ring_path, log_path=None):
+    """Resumo por round e container de um ring buffer; None se nao houver log"""
+    log_path = log_path or log_for_ring(ring_path)
+    if log_path is None:
+        return None
+    df = join_rounds(sample_rates(load_samples(ring_path)), round_windows(log_path))
+    df.insert(0, "log", Path(log_path).name)
+    return df
+
+def process_experiment(exp_dir):
+    """Resumo de todos os ring buffers de um experimento"""
+    frames = []
+    for ring_path in sorted(exp_dir.glob(f"*{RING_SUFFIX}")):
+        df = analyze_ring(ring_path)
+        if df is None:
+            log_warning(f"  {ring_path.name}: log do Caliper nao encontrado")
+            continue
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=ROUND_COLUMNS)
+
+def print_rounds(df):
+    for (label, rnd), group in df.groupby(["label", "round"], sort=False):
+        print(f"\n[{label} round {rnd}] {group['duration_s'].iloc[0]:.1f}s")
+        for _, row in group.iterrows():
+            print(f"  {row['node']:<14} {row['samples']:>5} amostras  CPU media {row['cpu_avg']:6.2f}%  "
+                  f"p95 {row['cpu_p95']:6.2f}%  max {row['cpu_max']:6.2f}%  "
+                  f"mem max {row['memory_max_gb']:.2f} GB  disco {row['disc_write_mb']:.2f} MB "
+                  f"(pico {row['disc_write_mb_s_max']:.2f} MB/s)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Amostragem de recursos dos containers Besu pelo socket do Docker")
+    sub = parser.add_subparsers(dest="command")
+
+    rec = sub.add_parser("record", help="Grava amostras em um ring buffer ate SIGTERM/Ctrl+C")
+    rec.add_argument("--output", required=True, help=f"Arquivo do ring buffer (ex.: run{RING_SUFFIX})")
+    rec.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                     help=f"Intervalo entre amostras em segundos (padrao: {DEFAULT_INTERVAL})")
+    rec.add_argument("--duration", type=float, default=0, help="Encerra apos N segundos (0: ate SIGTERM)")
+    rec.add_argument("--socket", default=DOCKER_SOCKET, help=f"Socket do Docker Engine (padrao: {DOCKER_SOCKET})")
+    rec.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY, help="Registros no ring buffer")
+    rec.add_argument("--pattern", default=NODE_PATTERN, help="Regex dos nomes de container amostrados")
+
+    ana = sub.add_parser("analyze", help="Resume um ring buffer por round do Caliper")
+    ana.add_argument("ring")
+    ana.add_argument("--log", default=None, help="Log do Caliper da execucao (padrao: ao lado do ring buffer)")
+    ana.add_argument("--output", default=None, help="CSV de saida")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        async def run():
+            stop = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                loop.add_signal_handler(sig, stop.set)
+            return await record(args.output, args.socket, args.interval, args.duration, args.capacity,
+                                args.pattern, stop)
+        try:
+            samples, errors, skipped = asyncio.run(run())
+        except (OSError, DockerError) as e:
+            log_error(f"Amostragem falhou ({args.socket}): {e}")
+            sys.exit(1)
+        log_success(f"{samples} amostras em {args.output} ({errors} erros, {skipped} intervalos pulados)")
+        return
+
+    if args.command == "analyze":
+        df = analyze_ring(args.ring, args.log)
+        if df is None:
+            log_error(f"Log do Caliper nao encontrado para {args.ring}; use --log")
+            sys.exit(1)
+        print_rounds(df)
+        if args.output:
+            df.to_csv(args.output, index=False)
+            log_success(f"Resumo salvo em {args.output}")
+        return
+
+    if not REPORTS_DIR.exists():
+        log_error(f"Diretorio de relatorios nao encontrado: {REPORTS_DIR}")
+        sys.exit(1)
+    found = 0
+    for exp_dir in sorted(d for d in REPORTS_DIR.iterdir() if d.is_dir()):
+        df = process_experiment(exp_dir)
+        if df.empty:
+            continue
+        output_exp_dir = OUTPUT_DIR / exp_dir.name
+        output_exp_dir.mkdir(parents=True, exist_ok=True)
+        df.to_csv(output_exp_dir / ROUNDS_CSV_NAME, index=False)
+        log_success(f"{exp_dir.name}: {len(df)} linhas (round x container)")
+        found += 1
+    if not found:
+        log_warning(f"Nenhum ring buffer ({RING_SUFFIX}) com log do Caliper encontrado")
+
+if __name__ == "__main__":
+    main()
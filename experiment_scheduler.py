@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Escalonador de experimentos em redes Besu locais isoladas
+Executa varios experimentos (ex.: 4n-5s-qbft-v25.10.0, 6n-2s-qbft-v25.10.0)
+ao mesmo tempo, cada um contra a sua propria rede:
+  - cada experimento recebe um slot com faixa de portas propria
+    (RPC HTTP, WebSocket, P2P) e prefixo de containers proprio
+  - a concorrencia e limitada pelos nucleos e pela memoria livres do host,
+    reservando uma estimativa de recursos por no e por Caliper
+  - a rede e criada/removida por comandos configuraveis (--network-up e
+    --network-down), com placeholders do slot
+  - o run_testes_simple.py roda com o networkconfig, o endpoint e o
+    diretorio de relatorios do slot; ao final os relatorios vao para
+    reports_htmls/experiments/{experimento}_{data}_{hora}/
+  - o caliper bind roda uma vez antes de qualquer slot (as baterias
+    compartilham o workspace do Caliper), e os deploys do Hardhat das
+    baterias rodam um de cada vez (lock no run_testes_simple.py)
+
+Placeholders dos comandos: {name} {slot} {nodes} {blocktime} {consensus}
+{version} {rpc_port} {ws_port} {p2p_port} {prefix} {workdir}
+
+Uso:
+    python3 experiment_scheduler.py 4n-5s-qbft-v25.10.0 6n-5s-qbft-v25.10.0 \\
+        --network-up "./start-network.sh {nodes} {blocktime} {consensus} {version} {rpc_port} {ws_port} {prefix}" \\
+        --network-down "./stop-network.sh {prefix}"
+    python3 experiment_scheduler.py --nodes 4 6 8 --blocktime 5 --consensus qbft --version 25.10.0 ...
+"""
+
+import os
+import sys
+import json
+import time
+import shlex
+import shutil
+import signal
+import socket
+import argparse
+import itertools
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from besu_readiness import Readiness
+from caliper_dataset import parse_experiment_name
+from sweep_journal import SweepJournal
+
+base_dir = Path(__file__).parent
+EXPERIMENTS_DIR = base_dir / "reports_htmls" / "experiments"
+WORK_DIR = base_dir / "runs" / "scheduler"
+# Diarios das baterias por experimento: fora do workdir do slot, removido ao final, para o --resume
+JOURNALS_DIR = WORK_DIR / "journals"
+NETWORKCONFIG_TEMPLATE = base_dir / "networks" / "besu" / "networkconfig.json"
+
+# Portas do slot N: base + N * PORT_STRIDE
+RPC_PORT_BASE = 8545
+WS_PORT_BASE = 8645
+P2P_PORT_BASE = 30303
+PORT_STRIDE = 1000
+
+# Estimativa de recursos reservados por experimento
+NODE_CPU = 0.5        # nucleos por no Besu
+NODE_MEMORY_GB = 1.0  # memoria por no Besu
+CALIPER_CPU = 1.0     # nucleos do manager + workers do Caliper
+CALIPER_MEMORY_GB = 1.0
+
+NETWORK_TIMEOUT = 300  # prazo para a rede responder e produzir blocos (s)
+
+CALIPER_SUT = "besu:latest"
+
+# Cores para output
+class Colors:
+    BLUE = '\033[0;34m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    RED = '\033[0;31m'
+    NC = '\033[0m'
+
+_print_lock = threading.Lock()
+
+def _log(color, tag, msg):
+    with _print_lock:
+        print(f"{color}[{tag}]{Colors.NC} {msg}", flush=True)
+
+def log_info(msg):
+    _log(Colors.BLUE, "INFO", msg)
+
+def log_success(msg):
+    _log(Colors.GREEN, "OK", msg)
+
+def log_warning(msg):
+    _log(Colors.YELLOW, "WARN", msg)
+
+def log_error(msg):
+    _log(Colors.RED, "ERROR", msg)
+
+def free_cores():
+    """Nucleos livres: total menos a carga media do ultimo minuto"""
+    total = os.cpu_count() or 1
+    try:
+        load = os.getloadavg()[0]
+    except OSError:
+        load = 0.0
+    return max(0.0, total - load)
+
+def free_memory_gb():
+    """Memoria disponivel (MemAvailable de /proc/meminfo, ou paginas livres)"""
+    try:
+        with open("/proc/meminfo", 'r') as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024 / 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 1024 ** 3
+    except (ValueError, OSError):
+        return float("inf")
+
+def port_free(port):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            sock.bind(("127.0.0.1", port))
+            return True
+        except OSError:
+            return False
+
+def slot_ports(slot):
+    return {
+        "rpc_port": RPC_PORT_BASE + slot * PORT_STRIDE,
+        "ws_port": WS_PORT_BASE + slot * PORT_STRIDE,
+        "p2p_port": P2P_PORT_BASE + slot * PORT_STRIDE,
+    }
+
+class SlotPool:
+    """Slots de rede (faixas de portas + prefixo de containers) em uso"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_use = set()
+
+    def acquire(self):
+        with self.lock:
+            for slot in itertools.count():
+                if slot in self.in_use:
+                    continue
+                # Pula slots com portas ocupadas por outros processos
+                if all(port_free(p) for p in slot_ports(slot).values()):
+                    self.in_use.add(slot)
+                    return slot
+
+    def release(self, slot):
+        with self.lock:
+            self.in_use.discard(slot)
+
+def experiment_requirements(exp, node_cpu=NODE_CPU, node_memory_gb=NODE_MEMORY_GB):
+    """(nucleos, GB) reservados para um experimento"""
+    return (exp["nodes"] * node_cpu + CALIPER_CPU,
+            exp["nodes"] * node_memory_gb + CALIPER_MEMORY_GB)
+
+def expand_experiments(names, nodes, blocktimes, consensus, versions):
+    """Nomes explicitos + produto cartesiano dos parametros -> lista de experimentos"""
+    names = list(names)
+    if nodes or blocktimes or consensus or versions:
+        for n, b, c, v in itertools.product(nodes or [6], blocktimes or [5], consensus or ["qbft"],
+                                            versions or ["25.10.0"]):
+            names.append(f"{n}n-{b}s-{c}-v{v}")
+
+    experiments = []
+    for name in dict.fromkeys(names):
+        info = parse_experiment_name(name)
+        if not info:
+            log_warning(f"Nome de experimento invalido, ignorado: {name}")
+            continue
+        experiments.append(info)
+    return experiments
+
+def write_networkconfig(template, path, ws_port):
+    """networkconfig.json do slot: o do repositorio apontando para a porta WebSocket do slot"""
+    with open(template, 'r') as f:
+        config = json.load(f)
+    config["ethereum"]["url"] = f"ws://127.0.0.1:{ws_port}"
+    with open(path, 'w') as f:
+        json.dump(config, f, indent=4)
+
+class ExperimentRun:
+    """Execucao de um experimento em um slot: sobe a rede, roda a bateria, coleta e derruba"""
+
+    def __init__(self, exp, slot, args):
+        self.exp = exp
+        self.slot = slot
+        self.args = args
+        self.name = exp["experiment_base"]
+        self.workdir = WORK_DIR / f"{self.name}_slot{slot}"
+        self.journal_dir = JOURNALS_DIR / self.name
+        self.placeholders = {
+            "name": self.name,
+            "slot": slot,
+            "nodes": exp["nodes"],
+            "blocktime": exp["blocktime"],
+            "consensus": exp["consensus"],
+            "version": exp["version"],
+            "prefix": f"exp{slot}-node-besu",
+            "workdir": str(self.workdir),
+            **slot_ports(slot),
+        }
+        self.network_proc = None
+        self.log_file = None
+
+    def command(self, template):
+        return template.format(**self.placeholders)
+
+    def log(self, msg):
+        log_info(f"[{self.name}@slot{self.slot}] {msg}")
+        if self.log_file:
+            self.log_file.write(f"[scheduler] {msg}\n")
+            self.log_file.flush()
+
+    def start_network(self):
+        """
+        Executa --network-up. Comandos que terminam (ex.: docker compose up -d)
+        precisam retornar 0; comandos que continuam rodando (ex.: um no local)
+        ficam em segundo plano ate o fim do experimento.
+        """
+        if not self.args.network_up:
+            return True
+        cmd = self.command(self.args.network_up)
+        self.log(f"Subindo rede: {cmd}")
+        self.network_proc = subprocess.Popen(cmd, shell=True, cwd=base_dir, stdout=self.log_file,
+                                             stderr=subprocess.STDOUT, start_new_session=True)
+        time.sleep(1)
+        code = self.network_proc.poll()
+        if code is not None:
+            self.network_proc = None
+            if code != 0:
+                self.log(f"ERRO: --network-up terminou com codigo {code}")
+                return False
+        return True
+
+    def stop_network(self):
+        if self.args.network_down:
+            cmd = self.command(self.args.network_down)
+            self.log(f"Derrubando rede: {cmd}")
+            subprocess.run(cmd, shell=True, cwd=base_dir, stdout=self.log_file, stderr=subprocess.STDOUT)
+        if self.network_proc is not None and self.network_proc.poll() is None:
+            os.killpg(self.network_proc.pid, signal.SIGTERM)
+            try:
+                self.network_proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                os.killpg(self.network_proc.pid, signal.SIGKILL)
+
+    def wait_network(self):
+        ports = slot_ports(self.slot)
+        readiness = Readiness(f"http://127.0.0.1:{ports['rpc_port']}", f"ws://127.0.0.1:{ports['ws_port']}")
+        try:
+            ready, step = readiness.wait_until_quiescent(timeout=self.args.network_timeout, progress=True)
+        finally:
+            readiness.close()
+        if not ready:
+            self.log(f"ERRO: rede nao ficou pronta em {self.args.network_timeout}s (etapa: {step})")
+        return ready
+
+    def run_benchmarks(self):
+        ports = slot_ports(self.slot)
+        networkconfig = self.workdir / "networkconfig.json"
+        write_networkconfig(self.args.networkconfig, networkconfig, ports["ws_port"])
+        cmd = self.args.runner + [
+            "--rpc-url", f"http://127.0.0.1:{ports['rpc_port']}",
+            "--networkconfig", str(networkconfig),
+            "--reports-dir", str(self.workdir / "reports"),
+            "--nodes", str(self.exp["nodes"]),
+            "--container-prefix", f"/{self.placeholders['prefix']}",
+            "--journal-dir", str(self.journal_dir),
+            "--no-extract",
+        ] + self.args.runner_args
+        if self.args.resume and SweepJournal.latest(self.journal_dir) is not None:
+            cmd.append("--resume")
+        self.log(f"Executando bateria: {' '.join(shlex.quote(c) for c in cmd)}")
+        result = subprocess.run(cmd, cwd=base_dir, stdout=self.log_file, stderr=subprocess.STDOUT)
+        if result.returncode != 0:
+            self.log(f"ERRO: bateria terminou com codigo {result.returncode}")
+        return result.returncode == 0
+
+    def collect(self):
+        """Move relatorios, configs e log para reports_htmls/experiments/{experimento}_{data}_{hora}/"""
+        # Dois slots do mesmo experimento terminando no mesmo segundo: o segundo usa o proximo
+        # horario livre, mantendo o formato {experimento}_{data}_{hora} do nome
+        now = datetime.now()
+        for offset in itertools.count():
+            timestamp = (now + timedelta(seconds=offset)).strftime("%Y%m%d_%H%M%S")
+            exp_dir = self.args.experiments_dir / f"{self.name}_{timestamp}"
+            try:
+                exp_dir.mkdir(parents=True, exist_ok=False)
+                break
+            except FileExistsError:
+                continue
+        reports = self.workdir / "reports"
+        count = 0
+        moved = {}
+        if reports.exists():
+            for path in sorted(reports.glob("*/*")):
+                if path.is_file():
+                    shutil.move(str(path), exp_dir / path.name)
+                    moved[path] = exp_dir / path.name
+                    count += path.suffix == ".html"
+        # O diario da bateria passa a apontar para os relatorios movidos
+        journal_path = SweepJournal.latest(self.journal_dir)
+        if journal_path is not None and moved:
+            SweepJournal.load(journal_path).relocate(moved)
+        self.log_file.close()
+        self.log_file = None
+        shutil.move(str(self.workdir / "experiment.log"), exp_dir / "experiment.log")
+        return exp_dir, count
+
+    def run(self):
+        self.workdir.mkdir(parents=True, exist_ok=True)
+        self.log_file = open(self.workdir / "experiment.log", 'w')
+        started = time.monotonic()
+        ok = False
+        try:
+            ok = self.start_network() and self.wait_network() and self.run_benchmarks()
+        except Exception as e:
+            self.log(f"ERRO inesperado: {e}")
+        finally:
+            try:
+                self.stop_network()
+            except Exception as e:
+                self.log(f"ERRO ao derrubar a rede: {e}")
+        exp_dir, count = self.collect()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+        return {"experiment": exp_dir.name, "ok": ok, "reports": count,
+                "seconds": time.monotonic() - started}
+
+def bind_caliper(sut):
+    """caliper bind no workspace do repositorio, uma vez para todos os slots"""
+    log_info(f"Vinculando o Caliper ao SUT {sut}...")
+    result = subprocess.run(["npx", "caliper", "bind", "--caliper-bind-sut", sut, "--caliper-workspace", "./"],
+                            cwd=base_dir)
+    return result.returncode == 0
+
+def schedule(experiments, args):
+    """
+    Executa os experimentos em paralelo respeitando o orcamento de nucleos e
+    memoria livres medidos no inicio. Um experimento maior que o orcamento
+    inteiro roda sozinho.
+    """
+    budget_cpu = args.cores if args.cores is not None else free_cores()
+    budget_mem = args.memory_gb if args.memory_gb is not None else free_memory_gb()
+    log_info(f"Orcamento: {budget_cpu:.1f} nucleos, {budget_mem:.1f} GB, ate {args.max_parallel} experimentos")
+
+    pending = list(experiments)
+    running = {}
+    used_cpu = used_mem = 0.0
+    slots = SlotPool()
+    results = []
+
+    with ThreadPoolExecutor(max_workers=args.max_parallel) as pool:
+        while pending or running:
+            # Inicia experimentos da fila enquanto couberem no orcamento
+            while pending and len(running) < args.max_parallel:
+                exp = pending[0]
+                cpu, mem = experiment_requirements(exp, args.node_cpu, args.node_memory_gb)
+                fits = used_cpu + cpu <= budget_cpu and used_mem + mem <= budget_mem
+                if not fits and running:
+                    break
+                if not fits:
+                    log_warning(f"{exp['experiment_base']} excede o orcamento ({cpu:.1f} nucleos, {mem:.1f} GB); "
+                                "executando sozinho")
+                pending.pop(0)
+                slot = slots.acquire()
+                used_cpu += cpu
+                used_mem += mem
+                log_info(f"Iniciando {exp['experiment_base']} no slot {slot} "
+                         f"(portas {slot_ports(slot)}, reserva {cpu:.1f} nucleos / {mem:.1f} GB)")
+                future = pool.submit(ExperimentRun(exp, slot, args).run)
+                running[future] = (exp, slot, cpu, mem)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                exp, slot, cpu, mem = running.pop(future)
+                used_cpu -= cpu
+                used_mem -= mem
+                slots.release(slot)
+                result = future.result()
+                results.append(result)
+                if result["ok"]:
+                    log_success(f"{result['experiment']}: {result['reports']} relatorios em {result['seconds']:.0f}s")
+                else:
+                    log_error(f"{result['experiment']}: falhou apos {result['seconds']:.0f}s "
+                              f"({result['reports']} relatorios, ver experiment.log)")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa experimentos em paralelo em redes Besu locais isoladas")
+    parser.add_argument("experiments", nargs="*", help="Nomes dos experimentos (ex.: 6n-5s-qbft-v25.10.0)")
+    parser.add_argument("--nodes", type=int, nargs="+", help="Matriz: numeros de nos")
+    parser.add_argument("--blocktime", type=int, nargs="+", help="Matriz: tempos de bloco (s)")
+    parser.add_argument("--consensus", nargs="+", help="Matriz: algoritmos de consenso")
+    parser.add_argument("--version", nargs="+", help="Matriz: versoes do Besu")
+    parser.add_argument("--network-up", default=None, help="Comando que sobe a rede de um slot (com placeholders)")
+    parser.add_argument("--network-down", default=None, help="Comando que derruba a rede de um slot")
+    parser.add_argument("--network-timeout", type=float, default=NETWORK_TIMEOUT,
+                        help=f"Prazo para a rede ficar pronta (padrao: {NETWORK_TIMEOUT}s)")
+    parser.add_argument("--networkconfig", default=str(NETWORKCONFIG_TEMPLATE),
+                        help="networkconfig.json usado como base para cada slot")
+    parser.add_argument("--runner", default=f"{sys.executable} run_testes_simple.py",
+                        help="Comando da bateria de testes (padrao: run_testes_simple.py)")
+    parser.add_argument("--runner-args", default="", help="Argumentos extras da bateria (ex.: \"--search\")")
+    parser.add_argument("--max-parallel", type=int, default=4, help="Maximo de experimentos simultaneos (padrao: 4)")
+    parser.add_argument("--cores", type=float, default=None, help="Nucleos disponiveis (padrao: livres no host)")
+    parser.add_argument("--memory-gb", type=float, default=None, help="Memoria disponivel (padrao: livre no host)")
+    parser.add_argument("--node-cpu", type=float, default=NODE_CPU, help=f"Nucleos por no (padrao: {NODE_CPU})")
+    parser.add_argument("--node-memory-gb", type=float, default=NODE_MEMORY_GB,
+                        help=f"Memoria por no em GB (padrao: {NODE_MEMORY_GB})")
+    parser.add_argument("--caliper-sut", default=CALIPER_SUT,
+                        help=f"SUT do caliper bind executado antes dos slots (padrao: {CALIPER_SUT})")
+    parser.add_argument("--no-bind", action="store_true",
+                        help="Nao executa o caliper bind antes dos slots (cada bateria o executa, uma de cada vez)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Retoma as baterias interrompidas a partir do diario mais recente de cada experimento "
+                             f"(em {JOURNALS_DIR.relative_to(base_dir)}/{{experimento}}/)")
+    parser.add_argument("--no-extract", action="store_true", help="Nao executa o extract_csv.py ao final")
+    args = parser.parse_args()
+
+    args.runner = shlex.split(args.runner)
+    args.runner_args = shlex.split(args.runner_args)
+    args.experiments_dir = EXPERIMENTS_DIR
+
+    experiments = expand_experiments(args.experiments, args.nodes, args.blocktime, args.consensus, args.version)
+    if not experiments:
+        log_error("Nenhum experimento informado")
+        sys.exit(1)
+    log_info(f"{len(experiments)} experimentos: {', '.join(e['experiment_base'] for e in experiments)}")
+
+    # Bind uma vez antes de qualquer slot: as baterias apenas usam o node_modules ja instalado
+    if not args.no_bind:
+        if not bind_caliper(args.caliper_sut):
+            log_error("caliper bind falhou")
+            sys.exit(1)
+        args.runner_args.append("--skip-bind")
+
+    started = time.monotonic()
+    results = schedule(experiments, args)
+    failed = [r for r in results if not r["ok"]]
+    log_info(f"Tempo total: {time.monotonic() - started:.0f}s; "
+             f"soma dos experimentos: {sum(r['seconds'] for r in results):.0f}s")
+
+    if not args.no_extract:
+        log_info("Convertendo relatorios HTML para CSV...")
+        subprocess.run([sys.executable, "extract_csv.py"], cwd=base_dir)
+
+    if failed:
+        log_error(f"{len(failed)} experimentos falharam: {', '.join(r['experiment'] for r in failed)}")
+        sys.exit(1)
+    log_success("Todos os experimentos concluidos")
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,47 @@
 Script para extrair metricas de relatorios HTML do Caliper
 Processa relatorios na estrutura: reports_htmls/experiments/{experiment_name}/
 Gera CSVs na estrutura: reports_csv/experiments/{experiment_name}/
+Gera o dataset Parquet tipado em: reports_dataset/ (ver caliper_dataset.py)
+
+Uso:
+    python3 extract_csv.py             # processa os relatorios em serie
+    python3 extract_csv.py --jobs 8    # distribui o parse dos relatorios em 8 processos
+    python3 extract_csv.py --force     # ignora o manifesto e reprocessa tudo
+    python3 extract_csv.py --parser bs4  # usa apenas o parser BeautifulSoup (arvore completa)
+    python3 extract_csv.py --no-csv      # gera apenas o dataset Parquet
+
+Alem das tabelas, os dados dos graficos Chart.js embutidos no relatorio
+(chamadas plotChart(...)) sao decodificados em caliper_chart_metrics.csv, em
+formato longo: Round, Monitor, Metric, Container, t, Value.
+
+A extracao e incremental: cada experimento guarda um manifesto
+(extraction_manifest.json) com tamanho, mtime, hash e numero de linhas de cada
+relatorio. Apenas relatorios novos ou alterados sao reprocessados.
+
+Resultados do gerador de carga em Python (rpc_loadgen.py, arquivos
+*_rpc_report_*.csv) ja estao no esquema da tabela de performance e entram
+como relatorios do experimento. Rounds abortados pelo run_testes_simple.py
+(*.aborted.json, sem relatorio HTML) viram uma linha de performance com a
+coluna Aborted (o motivo), que a analise conta como ponto saturado.
 """
 
+import io
 import os
 import re
+import sys
+import csv
+import json
+import html
+import argparse
+import functools
 import pandas as pd
 from bs4 import BeautifulSoup
+from lxml import etree
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import caliper_dataset
+from file_hashes import file_fingerprint
 
 # Cores para output
 class Colors:
@@ -36,15 +70,31 @@ base_dir = Path(__file__).parent
 REPORTS_DIR = base_dir / "reports_htmls" / "experiments"
 OUTPUT_DIR = base_dir / "reports_csv" / "experiments"
 
-# Cria a pasta base de saída, se não existir
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+PERF_CSV_NAME = "caliper_performance_metrics.csv"
+MON_CSV_NAME = "caliper_monitor_metrics.csv"
+CHART_CSV_NAME = "caliper_chart_metrics.csv"
+MANIFEST_NAME = "extraction_manifest.json"
+MANIFEST_VERSION = 7
 
-# Função auxiliar para converter strings numéricas
-def try_float(x):
-    try:
-        return float(x)
-    except:
-        return x
+# kind do dataset Parquet -> contador de linhas no manifesto
+DATASET_KINDS = (("performance", "performance_rows"), ("monitor", "monitor_rows"), ("charts", "chart_rows"))
+
+# Relatorios aceitos em cada experimento: HTML do Caliper, CSV do rpc_loadgen.py
+# (terminado no timestamp, para nao pegar o {relatorio}.blocks.csv do block_analytics.py)
+# e rounds abortados
+REPORT_PATTERNS = ("*.html", "*_rpc_report_*[0-9].csv", "*.aborted.json")
+ABORTED_SUFFIX = ".aborted.json"
+
+CHART_COLUMNS = ["Round", "Monitor", "Metric", "Container", "t", "Value", "Test Type"]
+
+# plotChart("MonitorDocker_open_polarArea0", "{&quot;type&quot;:...}")
+PLOT_CHART_RE = re.compile(r'plotChart\(\s*"([^"]*)"\s*,\s*"([^"]*)"\s*\)')
+# rateControl:\n  type: fixed-rate\n  opts:\n    tps: 180 (primeiro bloco = configuracao do round)
+RATE_TPS_RE = re.compile(r'rateControl:[^<]*?\btps:\s*([\d.]+)')
+# workers:\n  number: 2 (config do benchmark embutida no relatorio)
+WORKERS_RE = re.compile(r'\bworkers:\s*number:\s*(\d+)')
+# MonitorDocker_<round>_<tipo do grafico><indice>
+CHART_ID_RE = re.compile(r'^Monitor([A-Za-z]+)_(.+)_([A-Za-z]+?)\d+$')
 
 def extract_table_data(soup, table_type="performance"):
     """Extrai dados de tabelas do HTML do Caliper"""
@@ -88,89 +138,544 @@ def extract_table_data(soup, table_type="performance"):
 
     return data
 
-# Verifica se diretório de relatórios existe
-if not REPORTS_DIR.exists():
-    log_error(f"Diretorio de relatorios nao encontrado: {REPORTS_DIR}")
-    log_error("Execute os experimentos primeiro")
-    exit(1)
-
-# Percorre os experimentos
-experiments = [d for d in REPORTS_DIR.iterdir() if d.is_dir()]
+def _element_text(elem):
+    """Texto de um elemento lxml, equivalente ao .text.strip() do BeautifulSoup"""
+    return "".join(elem.itertext()).strip()
 
-if not experiments:
-    log_error("Nenhum experimento encontrado")
-    exit(1)
-
-log_info(f"Encontrados {len(experiments)} experimentos")
+def _table_rows(table):
+    """Converte uma tabela lxml em registros (mesmas regras de extract_table_data)"""
+    headers = [_element_text(th) for th in table.iter("th")]
+    if not headers:
+        return []
+    data = []
+    for row in list(table.iter("tr"))[1:]:  # Pula header
+        values = [_element_text(td) for td in row.iter("td")]
+        if values and len(values) == len(headers):
+            data.append(dict(zip(headers, values)))
+    return data
 
-total_processed = 0
-total_failed = 0
+def fast_extract_tables(source):
+    """
+    Extrai as tabelas de performance e de monitoramento com uma passada
+    streaming do lxml (iterparse), sem montar a arvore completa do documento.
+
+    Apenas as tabelas apos os headers "Performance metrics" (h3) e
+    "Resource monitor" (h4) sao mantidas; scripts, estilos e os demais
+    elementos sao descartados assim que terminam, e o parse e interrompido
+    quando as duas tabelas ja foram lidas.
+    """
+    perf_rows, mon_rows = None, None
+    # Estado: quantas tabelas comecaram desde cada header (None = header ainda nao visto)
+    perf_tables, mon_tables = None, None
+    perf_target, mon_candidates = None, []
+    depth = 0  # profundidade dentro de tabelas alvo, para nao descartar seus filhos
+    in_header = 0  # dentro de h3/h4: o texto do header (inclusive o tail dos filhos) ainda sera lido
+
+    if isinstance(source, Path):
+        source = str(source)
+    context = etree.iterparse(source, events=("start", "end"), html=True,
+                              remove_comments=True, remove_pis=True)
+    for event, elem in context:
+        tag = elem.tag
+        if event == "start":
+            if tag in ("h3", "h4"):
+                in_header += 1
+            if tag == "table":
+                if perf_tables is not None and perf_rows is None:
+                    perf_tables += 1
+                    if perf_tables == 1:
+                        perf_target = elem
+                if mon_tables is not None and mon_rows is None:
+                    mon_tables += 1
+                    if mon_tables <= 2:
+                        mon_candidates.append(elem)
+                if elem is perf_target or elem in mon_candidates:
+                    depth += 1
+            continue
 
-for exp_dir in experiments:
-    exp_name = exp_dir.name
-    log_info(f"Processando: {exp_name}")
+        if tag in ("h3", "h4"):
+            in_header -= 1
+        if tag == "h3" and perf_tables is None and "Performance metrics" in _element_text(elem):
+            perf_tables = 0
+        elif tag == "h4" and mon_tables is None and "Resource monitor" in _element_text(elem):
+            mon_tables = 0
+        elif tag == "table" and (elem is perf_target or elem in mon_candidates):
+            depth -= 1
+            if elem is perf_target:
+                perf_rows = _table_rows(elem)
+            if len(mon_candidates) == 2 and elem is mon_candidates[1]:
+                # A tabela de recursos e a segunda tabela apos o header
+                mon_rows = _table_rows(elem)
+
+        if perf_rows is not None and mon_rows is not None:
+            break
+
+        if depth == 0 and in_header == 0 and tag not in ("h3", "h4", "table", "html", "body", "main", "div"):
+            # Libera elementos que nao interessam (scripts, estilos, texto da pagina). clear() tambem
+            # apaga o tail, por isso filhos de headers so sao liberados junto com o header
+            elem.clear()
+
+    # Documento terminou com apenas uma tabela apos o header de monitoramento
+    if mon_rows is None and len(mon_candidates) == 1:
+        mon_rows = _table_rows(mon_candidates[0])
+
+    del context
+    return perf_rows or [], mon_rows or []
+
+def extract_chart_data(html_text):
+    """
+    Decodifica os payloads Chart.js embutidos no relatorio (plotChart).
+
+    Os graficos de monitor do Caliper trazem um valor por container (labels
+    sao os nomes dos containers) e t fica vazio. Graficos de serie temporal
+    (labels sao instantes e cada dataset e um container) geram uma linha por
+    (container, t). Valores repetidos em mais de um grafico (ex.: CPU%(avg)
+    no grafico de barras e no polar) aparecem uma unica vez.
+    """
+    rows = []
+    seen = set()
+    for div_id, payload in PLOT_CHART_RE.findall(html_text):
+        try:
+            chart = json.loads(html.unescape(payload))
+        except ValueError:
+            continue
 
+        match = CHART_ID_RE.match(div_id)
+        monitor, round_label = (match.group(1), match.group(2)) if match else ("", div_id)
+        metric = chart.get("title", "")
+        labels = [html.unescape(str(label)) for label in chart.get("labels", [])]
+        datasets = chart.get("datasets", [])
+
+        # Serie temporal: um dataset por container, labels sao os instantes
+        is_series = any("label" in ds for ds in datasets) and not all(l.startswith("/") for l in labels)
+
+        for ds in datasets:
+            for i, value in enumerate(ds.get("data", [])):
+                if i >= len(labels):
+                    break
+                if is_series:
+                    container, t = ds.get("label", ""), labels[i]
+                else:
+                    container, t = labels[i], None
+                key = (round_label, monitor, metric, container, t)
+                if key in seen:
+                    continue
+                seen.add(key)
+                rows.append({
+                    "Round": round_label,
+                    "Monitor": monitor,
+                    "Metric": metric,
+                    "Container": container,
+                    "t": t,
+                    "Value": str(value),
+                })
+    return rows
+
+def extract_target_tps(html_text):
+    """TPS alvo configurado no rateControl do round (vazio se o controlador nao usa tps)"""
+    match = RATE_TPS_RE.search(html_text)
+    return match.group(1) if match else ""
+
+def extract_workers(html_text):
+    """Numero de workers do Caliper na execucao (vazio se a config nao estiver no relatorio)"""
+    match = WORKERS_RE.search(html_text)
+    return match.group(1) if match else ""
+
+def bs4_extract_tables(html_file):
+    """Extrai as tabelas montando a arvore completa com BeautifulSoup (caminho original)"""
+    with open(html_file, "r", encoding="utf-8") as f:
+        soup = BeautifulSoup(f, "lxml")
+    return extract_table_data(soup, "performance"), extract_table_data(soup, "monitor")
+
+def parse_report(html_file, parser="fast"):
+    """
+    Extrai as linhas de performance e de monitoramento de um relatorio HTML.
+    Executada tanto em serie quanto nos processos do pool (--jobs), por isso
+    recebe apenas o caminho e devolve estruturas simples (picklable).
+
+    Com parser="fast" usa fast_extract_tables() e volta para o BeautifulSoup
+    se o parse streaming falhar ou nao encontrar a tabela de performance.
+
+    Retorna (perf_rows, mon_rows, chart_rows, erro); erro e None em caso de sucesso.
+    """
+    html_file = Path(html_file)
+    try:
+        if html_file.name.endswith(ABORTED_SUFFIX):
+            return aborted_rows(html_file), [], [], None
+
+        if html_file.suffix == ".csv":
+            # Resultado do rpc_loadgen.py: ja e a tabela de performance (CSVs antigos nao tem Driver)
+            with open(html_file, "r", newline="") as f:
+                perf_rows = [{"Driver": "rpc", **row, "Test Type": html_file.stem} for row in csv.DictReader(f)]
+            return perf_rows, [], [], None
+
+        raw = html_file.read_bytes()
+
+        perf_rows, mon_rows = [], []
+        if parser == "fast":
+            try:
+                perf_rows, mon_rows = fast_extract_tables(io.BytesIO(raw))
+            except Exception:
+                perf_rows, mon_rows = [], []
+        if not perf_rows:
+            perf_rows, mon_rows = bs4_extract_tables(html_file)
+
+        # Extrai dados dos graficos embutidos
+        html_text = raw.decode("utf-8", errors="replace")
+        chart_rows = extract_chart_data(html_text)
+        target_tps = extract_target_tps(html_text)
+        workers = extract_workers(html_text)
+
+        # Extrai dados de performance
+        for row in perf_rows:
+            row["TPS"] = target_tps
+            row["Workers"] = workers
+            row["Driver"] = "caliper"
+            row["Test Type"] = html_file.stem  # Nome do arquivo sem extensão
+
+        # Extrai dados de monitoramento
+        for row in mon_rows:
+            row["TPS"] = target_tps
+            row["Workers"] = workers
+            row["Driver"] = "caliper"
+            row["Test Type"] = html_file.stem
+
+        for row in chart_rows:
+            row["Test Type"] = html_file.stem
+
+        return perf_rows, mon_rows, chart_rows, None
+
+    except Exception as e:
+        return [], [], [], str(e)
+
+def aborted_rows(aborted_file):
+    """
+    Linha de performance de um round abortado (.aborted.json do run_testes_simple.py):
+    contagens no momento do aborto, TPS alvo e workers da config copiada junto
+    ({relatorio}.config.yaml); sem throughput nem latencias medidos.
+    """
+    with open(aborted_file, "r") as f:
+        aborted = json.load(f)
+    progress = aborted.get("progress") or {}
+    config_path = aborted_file.with_name(aborted_file.name[:-len(ABORTED_SUFFIX)] + ".config.yaml")
+    workers = extract_workers(config_path.read_text()) if config_path.exists() else ""
+    return [{
+        "Name": progress.get("label") or aborted.get("function"),
+        "Succ": progress.get("succ", ""),
+        "Fail": progress.get("fail", ""),
+        "TPS": aborted.get("tps", ""),
+        "Workers": workers,
+        "Driver": "caliper",
+        "Aborted": aborted.get("reason") or "abortado",
+        "Test Type": aborted_file.name[:-len(".json")],
+    }]
+
+def save_experiment_csvs(exp_name, performance_data, monitor_data, chart_data=None):
+    """
+    Salva os CSVs de um experimento; retorna a lista de arquivos gerados.
+    Tabelas sem linhas tem o CSV anterior removido, para nao deixar dados
+    de relatorios que nao geram mais linhas.
+    """
     # Cria diretório de saída para este experimento
     output_exp_dir = OUTPUT_DIR / exp_name
     output_exp_dir.mkdir(parents=True, exist_ok=True)
 
-    performance_data = []
-    monitor_data = []
-
-    # Processa todos os arquivos HTML no diretório do experimento
-    html_files = list(exp_dir.glob("*.html"))
-
-    if not html_files:
-        log_warning(f"  Nenhum arquivo HTML encontrado")
-        total_failed += 1
-        continue
-
-    for html_file in html_files:
-        try:
-            with open(html_file, "r", encoding="utf-8") as f:
-                soup = BeautifulSoup(f, "lxml")
-
-            # Extrai dados de performance
-            perf_rows = extract_table_data(soup, "performance")
-            for row in perf_rows:
-                row["Test Type"] = html_file.stem  # Nome do arquivo sem extensão
-                performance_data.append(row)
-
-            # Extrai dados de monitoramento
-            mon_rows = extract_table_data(soup, "monitor")
-            for row in mon_rows:
-                row["Test Type"] = html_file.stem
-                monitor_data.append(row)
-
-        except Exception as e:
-            log_warning(f"  Erro ao processar {html_file.name}: {e}")
-            continue
-
-    # Salva os CSVs
     saved_files = []
 
     if performance_data:
         perf_df = pd.DataFrame(performance_data)
-        perf_csv = output_exp_dir / "caliper_performance_metrics.csv"
+        perf_csv = output_exp_dir / PERF_CSV_NAME
         perf_df.to_csv(perf_csv, index=False)
         saved_files.append("performance")
+    else:
+        (output_exp_dir / PERF_CSV_NAME).unlink(missing_ok=True)
 
     if monitor_data:
         monitor_df = pd.DataFrame(monitor_data)
-        mon_csv = output_exp_dir / "caliper_monitor_metrics.csv"
+        mon_csv = output_exp_dir / MON_CSV_NAME
         monitor_df.to_csv(mon_csv, index=False)
         saved_files.append("monitor")
+    else:
+        (output_exp_dir / MON_CSV_NAME).unlink(missing_ok=True)
 
-    if saved_files:
-        log_success(f"  CSVs criados: {', '.join(saved_files)}")
-        total_processed += 1
+    if chart_data:
+        chart_df = pd.DataFrame(chart_data).reindex(columns=CHART_COLUMNS)
+        chart_csv = output_exp_dir / CHART_CSV_NAME
+        chart_df.to_csv(chart_csv, index=False)
+        saved_files.append("charts")
     else:
-        log_warning(f"  Nenhum dado extraido")
-        total_failed += 1
-
-# Resumo
-print(f"\n{'='*60}")
-log_info(f"Total processados com sucesso: {total_processed}")
-if total_failed > 0:
-    log_warning(f"Total com problemas: {total_failed}")
-log_success("Extracao concluida!")
+        (output_exp_dir / CHART_CSV_NAME).unlink(missing_ok=True)
+
+    return saved_files
+
+def load_manifest(output_exp_dir):
+    """Carrega o manifesto de extracao de um experimento (vazio se nao existir ou for invalido)"""
+    manifest_path = output_exp_dir / MANIFEST_NAME
+    try:
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest.get("reports", {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+def save_manifest(output_exp_dir, exp_name, reports):
+    """Grava o manifesto de forma atomica (arquivo temporario + rename)"""
+    output_exp_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_exp_dir / MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"version": MANIFEST_VERSION, "experiment": exp_name, "reports": reports}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+def load_cached_rows(csv_path):
+    """
+    Le um CSV ja extraido e agrupa as linhas por Test Type (nome do relatorio),
+    para reaproveitar os dados de relatorios que nao mudaram.
+    """
+    if not csv_path.exists():
+        return {}
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    if "Test Type" not in df.columns:
+        return {}
+    cached = {}
+    for record in df.to_dict("records"):
+        # Remove as colunas vazias, que vieram de outros relatorios no mesmo CSV
+        row = {k: v for k, v in record.items() if v != ""}
+        cached.setdefault(record["Test Type"], []).append(row)
+    return cached
+
+def parse_all_reports(report_files, jobs=1, parser="fast"):
+    """
+    Faz o parse de todos os relatorios, em serie (jobs=1) ou distribuindo
+    os arquivos em um pool de processos. Os resultados voltam na mesma
+    ordem de report_files, independente da ordem de conclusao.
+    """
+    parse = functools.partial(parse_report, parser=parser)
+    if jobs <= 1 or len(report_files) <= 1:
+        return [parse(f) for f in report_files]
+
+    workers = min(jobs, len(report_files))
+    # chunksize > 1 reduz o overhead de IPC quando ha centenas de relatorios pequenos
+    chunksize = max(1, len(report_files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parse, report_files, chunksize=chunksize))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extrai metricas dos relatorios HTML do Caliper para CSV")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="Numero de processos para o parse dos relatorios (padrao: 1, em serie; 0 = todos os nucleos)")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignora o manifesto e reprocessa todos os relatorios")
+    parser.add_argument("--parser", choices=["fast", "bs4"], default="fast",
+                        help="fast: lxml streaming so das tabelas necessarias (padrao); bs4: arvore completa com BeautifulSoup")
+    parser.add_argument("--no-csv", action="store_true",
+                        help="Nao gera os CSVs por experimento (apenas o dataset Parquet)")
+    parser.add_argument("--no-dataset", action="store_true",
+                        help="Nao gera o dataset Parquet (apenas os CSVs por experimento)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    # Verifica se diretório de relatórios existe
+    if not REPORTS_DIR.exists():
+        log_error(f"Diretorio de relatorios nao encontrado: {REPORTS_DIR}")
+        log_error("Execute os experimentos primeiro")
+        sys.exit(1)
+
+    # Cria a pasta base de saída, se não existir
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Percorre os experimentos
+    experiments = [d for d in REPORTS_DIR.iterdir() if d.is_dir()]
+
+    if not experiments:
+        log_error("Nenhum experimento encontrado")
+        sys.exit(1)
+
+    log_info(f"Encontrados {len(experiments)} experimentos")
+
+    write_dataset = not args.no_dataset
+    if write_dataset and not caliper_dataset.dataset_available():
+        log_warning("pyarrow nao instalado: dataset Parquet desativado (pip install pyarrow)")
+        write_dataset = False
+    write_csv = not args.no_csv
+    if not write_csv and not write_dataset:
+        log_error("Nenhuma saida habilitada (--no-csv sem pyarrow instalado)")
+        sys.exit(1)
+
+    total_processed = 0
+    total_failed = 0
+    total_skipped = 0
+
+    # Planejamento: compara cada relatorio com o manifesto do experimento e
+    # decide o que precisa ser reprocessado. Relatorios inalterados em um
+    # experimento alterado tem suas linhas recuperadas dos CSVs ja gerados
+    # (ou, sem CSV, simplesmente mantem seus arquivos no dataset).
+    plans = []
+    to_parse = []
+
+    for exp_dir in experiments:
+        exp_name = exp_dir.name
+        output_exp_dir = OUTPUT_DIR / exp_name
+
+        # Processa todos os relatorios (HTML e CSV do rpc_loadgen) no diretório do experimento
+        html_files = [f for pattern in REPORT_PATTERNS for f in exp_dir.glob(pattern)]
+
+        if not html_files:
+            log_info(f"Processando: {exp_name}")
+            log_warning(f"  Nenhum arquivo HTML encontrado")
+            # Saidas de uma extracao anterior ficariam desatualizadas
+            if output_exp_dir.exists():
+                exp_info = caliper_dataset.parse_experiment_name(exp_name) if write_dataset else None
+                if exp_info:
+                    for name in load_manifest(output_exp_dir):
+                        caliper_dataset.remove_report_partitions(exp_info, Path(name).stem)
+                for name in (PERF_CSV_NAME, MON_CSV_NAME, CHART_CSV_NAME, MANIFEST_NAME):
+                    (output_exp_dir / name).unlink(missing_ok=True)
+            total_failed += 1
+            continue
+
+        exp_info = None
+        if write_dataset:
+            exp_info = caliper_dataset.parse_experiment_name(exp_name)
+            if not exp_info:
+                log_warning(f"  Nome fora do padrao, {exp_name} nao entra no dataset Parquet")
+
+        last_manifest = load_manifest(output_exp_dir)
+        previous = {} if args.force else last_manifest
+        if exp_info and not last_manifest:
+            # Manifesto ausente ou de outra versao: tira do dataset os arquivos do layout antigo
+            caliper_dataset.remove_legacy_partitions(exp_info)
+        fingerprints = {f: file_fingerprint(f, previous.get(f.name)) for f in html_files}
+        unchanged = {f for f, fp in fingerprints.items()
+                     if f.name in previous and previous[f.name].get("sha256") == fp["sha256"]}
+
+        def dataset_ok(html_file):
+            if not exp_info:
+                return True
+            entry = previous.get(html_file.name, {})
+            kinds = [kind for kind, key in DATASET_KINDS if entry.get(key)]
+            return caliper_dataset.report_partitions_exist(exp_info, html_file.stem, kinds)
+
+        csv_ok = not write_csv or all((output_exp_dir / name).exists()
+                                      for name, key in ((PERF_CSV_NAME, "performance_rows"), (MON_CSV_NAME, "monitor_rows"),
+                                                        (CHART_CSV_NAME, "chart_rows"))
+                                      if any(previous.get(f.name, {}).get(key) for f in html_files))
+
+        if (len(unchanged) == len(html_files) and set(previous) == {f.name for f in html_files}
+                and csv_ok and all(dataset_ok(f) for f in html_files)):
+            # Atualiza apenas os mtimes, se algum arquivo foi tocado sem mudar de conteudo
+            if any(previous[f.name]["mtime_ns"] != fp["mtime_ns"] for f, fp in fingerprints.items()):
+                save_manifest(output_exp_dir, exp_name,
+                              {f.name: {**previous[f.name], **fp} for f, fp in fingerprints.items()})
+            total_skipped += 1
+            continue
+
+        load_cache = write_csv and unchanged
+        cached_perf = load_cached_rows(output_exp_dir / PERF_CSV_NAME) if load_cache else {}
+        cached_mon = load_cached_rows(output_exp_dir / MON_CSV_NAME) if load_cache else {}
+        cached_chart = load_cached_rows(output_exp_dir / CHART_CSV_NAME) if load_cache else {}
+
+        cached = {}
+        for html_file in html_files:
+            entry = previous.get(html_file.name, {})
+            if html_file in unchanged and dataset_ok(html_file):
+                if not write_csv:
+                    # Sem CSV, o relatorio inalterado so precisa manter seus arquivos no dataset
+                    cached[html_file] = None
+                    continue
+                perf_rows = cached_perf.get(html_file.stem, [])
+                mon_rows = cached_mon.get(html_file.stem, [])
+                chart_rows = cached_chart.get(html_file.stem, [])
+                # So reaproveita se os CSVs ainda tem exatamente as linhas registradas
+                if (len(perf_rows) == entry.get("performance_rows") and len(mon_rows) == entry.get("monitor_rows")
+                        and len(chart_rows) == entry.get("chart_rows")):
+                    cached[html_file] = (perf_rows, mon_rows, chart_rows)
+                    continue
+            to_parse.append(html_file)
+
+        removed = set(last_manifest) - {f.name for f in html_files}
+        plans.append((exp_dir, exp_info, html_files, fingerprints, previous, cached, removed))
+
+    if total_skipped:
+        log_info(f"{total_skipped} experimentos sem alteracoes (ignorados)")
+
+    if jobs > 1 and to_parse:
+        log_info(f"Processando {len(to_parse)} relatorios com {jobs} processos")
+    results = dict(zip(to_parse, parse_all_reports(to_parse, jobs, args.parser)))
+
+    for exp_dir, exp_info, html_files, fingerprints, previous, cached, removed in plans:
+        exp_name = exp_dir.name
+        output_exp_dir = OUTPUT_DIR / exp_name
+        n_parsed = sum(1 for f in html_files if f in results)
+        log_info(f"Processando: {exp_name} ({n_parsed} novos/alterados, {len(cached)} do cache)")
+
+        performance_data = []
+        monitor_data = []
+        chart_data = []
+        manifest = {}
+        n_dataset = 0
+
+        for html_file in html_files:
+            if html_file in cached:
+                manifest[html_file.name] = {**previous[html_file.name], **fingerprints[html_file]}
+                if cached[html_file] is None:
+                    continue
+                perf_rows, mon_rows, chart_rows = cached[html_file]
+            else:
+                perf_rows, mon_rows, chart_rows, error = results[html_file]
+                if error:
+                    log_warning(f"  Erro ao processar {html_file.name}: {error}")
+                    continue
+                if exp_info:
+                    for kind, rows in zip(caliper_dataset.KINDS, (perf_rows, mon_rows, chart_rows)):
+                        caliper_dataset.write_report_partition(kind, exp_info, html_file.stem, rows)
+                    n_dataset += 1
+                manifest[html_file.name] = {
+                    **fingerprints[html_file],
+                    "performance_rows": len(perf_rows),
+                    "monitor_rows": len(mon_rows),
+                    "chart_rows": len(chart_rows),
+                }
+            performance_data.extend(perf_rows)
+            monitor_data.extend(mon_rows)
+            chart_data.extend(chart_rows)
+
+        # Relatorios apagados desde a ultima extracao saem do dataset
+        if exp_info:
+            for name in removed:
+                caliper_dataset.remove_report_partitions(exp_info, Path(name).stem)
+
+        # Salva os CSVs
+        saved_files = []
+        if write_csv:
+            saved_files = save_experiment_csvs(exp_name, performance_data, monitor_data, chart_data)
+        if n_dataset:
+            saved_files.append(f"parquet ({n_dataset} relatorios)")
+        save_manifest(output_exp_dir, exp_name, manifest)
+
+        if saved_files:
+            log_success(f"  Saidas atualizadas: {', '.join(saved_files)}")
+            total_processed += 1
+        elif manifest:
+            log_success(f"  Sem novos dados (relatorios mantidos do cache)")
+            total_processed += 1
+        else:
+            log_warning(f"  Nenhum dado extraido")
+            total_failed += 1
+
+    # Resumo
+    print(f"\n{'='*60}")
+    log_info(f"Total processados com sucesso: {total_processed}")
+    if total_skipped > 0:
+        log_info(f"Total sem alteracoes: {total_skipped}")
+    if total_failed > 0:
+        log_warning(f"Total com problemas: {total_failed}")
+    log_success("Extracao concluida!")
+
+if __name__ == "__main__":
+    main()
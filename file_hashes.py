@@ -0,0 +1,27 @@
+"""
+Hash de arquivos com reaproveitamento por tamanho e mtime, usado pelo
+manifesto do extract_csv.py e pelo cache da analise (analysis_cache.py)
+"""
+
+import hashlib
+
+def file_sha256(path):
+    """Hash SHA-256 do conteudo de um arquivo, lido em blocos"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def file_fingerprint(path, previous=None):
+    """
+    Tamanho, mtime e hash de um arquivo. Se tamanho e mtime nao mudaram
+    desde a execucao anterior, reaproveita o hash em vez de reler o arquivo.
+    """
+    st = path.stat()
+    fingerprint = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if previous and previous.get("size") == st.st_size and previous.get("mtime_ns") == st.st_mtime_ns:
+        fingerprint["sha256"] = previous.get("sha256")
+    else:
+        fingerprint["sha256"] = file_sha256(path)
+    return fingerprint
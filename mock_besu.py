@@ -0,0 +1,565 @@
+#!/usr/bin/env python3
+"""
+No Besu simulado (asyncio) para testar e medir o harness sem rede real
+Atende JSON-RPC por HTTP (porta RPC) e por WebSocket (porta WS), com a parte
+da API eth usada pelo Caliper, pelo deploy e pelas verificacoes de prontidao:
+    eth_blockNumber, eth_chainId, net_version, eth_getTransactionCount,
+    eth_gasPrice, eth_estimateGas, eth_sendRawTransaction,
+    eth_getTransactionReceipt, eth_getTransactionByHash, eth_call,
+    eth_getCode, eth_getBalance, eth_getBlockByNumber, eth_getBlockByHash,
+    eth_subscribe/eth_unsubscribe (newHeads), txpool_besuStatistics
+
+Comportamento configuravel:
+  - tempo de bloco e maximo de transacoes por bloco
+  - latencia de inclusao (tempo minimo no txpool antes de entrar em um bloco)
+  - latencia de resposta do RPC
+  - injecao de falhas: transacoes revertidas (status 0x0) e erros de RPC
+    em eth_sendRawTransaction, sorteados com semente fixa
+
+Simplificacoes: o hash da transacao e o sha3-256 do raw (o hashlib nao tem
+keccak), o remetente nao e recuperado da assinatura e eth_getTransactionCount
+devolve o nonce seguinte conhecido para qualquer endereco.
+
+O WebSocket (RFC 6455) e implementado diretamente sobre asyncio, sem
+dependencias externas.
+
+Uso:
+    python3 mock_besu.py --rpc-port 8545 --ws-port 8645 --block-time 2
+    python3 mock_besu.py --fail-rate 0.05 --inclusion-latency 1.5 --latency-ms 20
+"""
+
+import json
+import time
+import base64
+import random
+import asyncio
+import hashlib
+import argparse
+
+# Cores para output
+class Colors:
+    BLUE = '\033[0;34m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    RED = '\033[0;31m'
+    NC = '\033[0m'
+
+def log_info(msg):
+    print(f"{Colors.BLUE}[INFO]{Colors.NC} {msg}", flush=True)
+
+def log_success(msg):
+    print(f"{Colors.GREEN}[OK]{Colors.NC} {msg}", flush=True)
+
+def log_warning(msg):
+    print(f"{Colors.YELLOW}[WARN]{Colors.NC} {msg}", flush=True)
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+ZERO_HASH = "0x" + "00" * 32
+ZERO_ADDRESS = "0x" + "00" * 20
+EMPTY_BLOOM = "0x" + "00" * 256
+BLOCK_GAS_LIMIT = 0x1fffffffffffff
+TX_GAS = 21000
+# Retorno padrao de eth_call: uint256 = 0
+DEFAULT_CALL_RESULT = "0x" + "00" * 32
+# Codigo retornado por eth_getCode para enderecos com contrato
+DEFAULT_CODE = "0x6080604052"
+
+def to_hex(value):
+    return hex(value)
+
+def sha3_hex(data, size=32):
+    return "0x" + hashlib.sha3_256(data).hexdigest()[:size * 2]
+
+def rlp_decode(data):
+    """Decodifica um item RLP (bytes ou lista aninhada); retorna (item, resto)"""
+    prefix = data[0]
+    if prefix < 0x80:
+        return data[:1], data[1:]
+    if prefix < 0xb8:
+        length = prefix - 0x80
+        return data[1:1 + length], data[1 + length:]
+    if prefix < 0xc0:
+        size = prefix - 0xb7
+        length = int.from_bytes(data[1:1 + size], "big")
+        return data[1 + size:1 + size + length], data[1 + size + length:]
+    if prefix < 0xf8:
+        length = prefix - 0xc0
+        payload, rest = data[1:1 + length], data[1 + length:]
+    else:
+        size = prefix - 0xf7
+        length = int.from_bytes(data[1:1 + size], "big")
+        payload, rest = data[1 + size:1 + size + length], data[1 + size + length:]
+    items = []
+    while payload:
+        item, payload = rlp_decode(payload)
+        items.append(item)
+    return items, rest
+
+def raw_bytes(raw_hex):
+    """Bytes de um hex com ou sem o prefixo 0x"""
+    return bytes.fromhex(raw_hex[2:] if raw_hex.startswith("0x") else raw_hex)
+
+def decode_raw_transaction(raw_hex):
+    """
+    Campos de uma transacao assinada (legacy, EIP-2930 ou EIP-1559):
+    nonce, to (None na criacao de contrato), gas, value e data.
+    """
+    raw = raw_bytes(raw_hex)
+    tx_type = 0
+    if raw and raw[0] < 0x7f:
+        tx_type, raw = raw[0], raw[1:]
+    fields, _ = rlp_decode(raw)
+    if tx_type == 0:
+        nonce, gas_price, gas, to, value, data = fields[:6]
+    elif tx_type == 1:
+        _, nonce, gas_price, gas, to, value, data = fields[:7]
+    else:
+        _, nonce, _, gas_price, gas, to, value, data = fields[:8]
+    as_int = lambda b: int.from_bytes(b, "big") if b else 0
+    return {
+        "type": tx_type,
+        "nonce": as_int(nonce),
+        "gasPrice": as_int(gas_price),
+        "gas": as_int(gas),
+        "to": "0x" + to.hex() if to else None,
+        "value": as_int(value),
+        "input": "0x" + data.hex(),
+    }
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+class MockChain:
+    """Estado da cadeia simulada: txpool, blocos, recibos e contratos"""
+
+    def __init__(self, block_time=1.0, inclusion_latency=0.0, max_txs_per_block=0, fail_rate=0.0,
+                 rpc_error_rate=0.0, chain_id=1337, seed=42, call_result=DEFAULT_CALL_RESULT,
+                 contracts=None):
+        self.block_time = block_time
+        self.inclusion_latency = inclusion_latency
+        self.max_txs_per_block = max_txs_per_block
+        self.fail_rate = fail_rate
+        self.rpc_error_rate = rpc_error_rate
+        self.chain_id = chain_id
+        self.call_result = call_result
+        self.random = random.Random(seed)
+
+        self.blocks = []
+        self.blocks_by_hash = {}
+        self.pending = []           # (chegada, tx)
+        self.transactions = {}      # hash -> tx
+        self.receipts = {}          # hash -> recibo
+        self.code = {addr.lower(): DEFAULT_CODE for addr in (contracts or [])}
+        self.next_nonce = 0
+        self.subscribers = set()    # callbacks de newHeads
+        self.stats = {"received": 0, "rejected": 0, "reverted": 0}
+        self._new_block(0, [])
+
+    # Blocos -------------------------------------------------------------
+
+    def _new_block(self, timestamp, txs):
+        number = len(self.blocks)
+        parent = self.blocks[-1]["hash"] if self.blocks else ZERO_HASH
+        block_hash = sha3_hex(f"block-{number}-{parent}".encode())
+        gas_used = 0
+        for index, tx in enumerate(txs):
+            tx.update(blockHash=block_hash, blockNumber=to_hex(number), transactionIndex=to_hex(index))
+            gas_used += TX_GAS
+            reverted = self.random.random() < self.fail_rate
+            self.stats["reverted"] += reverted
+            self.receipts[tx["hash"]] = {
+                "transactionHash": tx["hash"],
+                "transactionIndex": to_hex(index),
+                "blockHash": block_hash,
+                "blockNumber": to_hex(number),
+                "from": tx["from"],
+                "to": tx["to"],
+                "cumulativeGasUsed": to_hex(gas_used),
+                "gasUsed": to_hex(TX_GAS),
+                "effectiveGasPrice": to_hex(tx["_gasPrice"]),
+                "contractAddress": tx["_contractAddress"],
+                "logs": [],
+                "logsBloom": EMPTY_BLOOM,
+                "status": "0x0" if reverted else "0x1",
+                "type": to_hex(tx["_type"]),
+            }
+            if tx["_contractAddress"] and not reverted:
+                self.code[tx["_contractAddress"]] = DEFAULT_CODE
+        block = {
+            "number": to_hex(number),
+            "hash": block_hash,
+            "parentHash": parent,
+            "nonce": "0x0000000000000000",
+            "mixHash": ZERO_HASH,
+            "sha3Uncles": ZERO_HASH,
+            "logsBloom": EMPTY_BLOOM,
+            "transactionsRoot": ZERO_HASH,
+            "stateRoot": ZERO_HASH,
+            "receiptsRoot": ZERO_HASH,
+            "miner": ZERO_ADDRESS,
+            "difficulty": "0x1",
+            "totalDifficulty": to_hex(number + 1),
+            "extraData": "0x",
+            "size": to_hex(512 + 128 * len(txs)),
+            "gasLimit": to_hex(BLOCK_GAS_LIMIT),
+            "gasUsed": to_hex(gas_used),
+            "timestamp": to_hex(int(timestamp)),
+            "baseFeePerGas": "0x0",
+            "transactions": [tx["hash"] for tx in txs],
+            "uncles": [],
+        }
+        self.blocks.append(block)
+        self.blocks_by_hash[block_hash] = block
+        return block
+
+    def produce_block(self, now=None):
+        """Inclui as transacoes do txpool que ja cumpriram a latencia de inclusao"""
+        now = time.time() if now is None else now
+        ready = [tx for arrival, tx in self.pending if now - arrival >= self.inclusion_latency]
+        if self.max_txs_per_block:
+            ready = ready[:self.max_txs_per_block]
+        included = {tx["hash"] for tx in ready}
+        self.pending = [(arrival, tx) for arrival, tx in self.pending if tx["hash"] not in included]
+        block = self._new_block(now, ready)
+        header = {k: v for k, v in block.items() if k != "transactions"}
+        for notify in list(self.subscribers):
+            notify(header)
+        return block
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.block_time)
+            self.produce_block()
+
+    # Transacoes ---------------------------------------------------------
+
+    def send_raw_transaction(self, raw_hex):
+        if self.rpc_error_rate and self.random.random() < self.rpc_error_rate:
+            self.stats["rejected"] += 1
+            raise RpcError(-32000, "Transaction rejected (falha injetada)")
+        try:
+            decoded = decode_raw_transaction(raw_hex)
+        except (ValueError, IndexError) as e:
+            raise RpcError(-32602, f"Invalid params: {e}")
+        tx_hash = sha3_hex(raw_bytes(raw_hex))
+        if tx_hash in self.transactions:
+            raise RpcError(-32000, "Known transaction")
+        contract = None if decoded["to"] else sha3_hex(f"contract-{tx_hash}".encode(), 20)
+        tx = {
+            "hash": tx_hash,
+            "nonce": to_hex(decoded["nonce"]),
+            "blockHash": None,
+            "blockNumber": None,
+            "transactionIndex": None,
+            "from": ZERO_ADDRESS,
+            "to": decoded["to"],
+            "value": to_hex(decoded["value"]),
+            "gas": to_hex(decoded["gas"]),
+            "gasPrice": to_hex(decoded["gasPrice"]),
+            "input": decoded["input"],
+            "_type": decoded["type"],
+            "_gasPrice": decoded["gasPrice"],
+            "_contractAddress": contract,
+        }
+        self.transactions[tx_hash] = tx
+        self.pending.append((time.time(), tx))
+        self.next_nonce = max(self.next_nonce, decoded["nonce"] + 1)
+        self.stats["received"] += 1
+        return tx_hash
+
+    def public_tx(self, tx):
+        return {k: v for k, v in tx.items() if not k.startswith("_")}
+
+    def get_block(self, tag):
+        if tag in ("latest", "pending", "safe", "finalized"):
+            return self.blocks[-1]
+        if tag == "earliest":
+            return self.blocks[0]
+        number = int(tag, 16)
+        return self.blocks[number] if number < len(self.blocks) else None
+
+    def block_view(self, block, full):
+        if block is None:
+            return None
+        if not full:
+            return block
+        return {**block, "transactions": [self.public_tx(self.transactions[h]) for h in block["transactions"]]}
+
+    # Dispatcher JSON-RPC ------------------------------------------------
+
+    def call(self, method, params):
+        if method == "eth_blockNumber":
+            return to_hex(len(self.blocks) - 1)
+        if method == "eth_chainId":
+            return to_hex(self.chain_id)
+        if method == "net_version":
+            return str(self.chain_id)
+        if method == "web3_clientVersion":
+            return "besu/mock"
+        if method in ("net_listening",):
+            return True
+        if method == "net_peerCount":
+            return "0x0"
+        if method == "eth_syncing":
+            return False
+        if method == "eth_accounts":
+            return []
+        if method == "eth_gasPrice":
+            return "0x0"
+        if method == "eth_estimateGas":
+            return to_hex(TX_GAS * 10)
+        if method == "eth_getBalance":
+            return to_hex(10 ** 24)
+        if method == "eth_getTransactionCount":
+            return to_hex(self.next_nonce)
+        if method == "eth_sendRawTransaction":
+            return self.send_raw_transaction(params[0])
+        if method == "eth_getTransactionReceipt":
+            return self.receipts.get(params[0])
+        if method == "eth_getTransactionByHash":
+            tx = self.transactions.get(params[0])
+            return self.public_tx(tx) if tx else None
+        if method == "eth_call":
+            return self.call_result
+        if method == "eth_getCode":
+            return self.code.get(params[0].lower(), "0x")
+        if method == "eth_getBlockByNumber":
+            return self.block_view(self.get_block(params[0]), params[1] if len(params) > 1 else False)
+        if method == "eth_getBlockByHash":
+            return self.block_view(self.blocks_by_hash.get(params[0]), params[1] if len(params) > 1 else False)
+        if method == "txpool_besuStatistics":
+            return {"maxSize": 4096, "localCount": len(self.pending), "remoteCount": 0}
+        raise RpcError(-32601, "Method not found")
+
+class MockNode:
+    """Servidores HTTP e WebSocket sobre a mesma MockChain"""
+
+    def __init__(self, chain, latency=0.0):
+        self.chain = chain
+        self.latency = latency
+        self.requests = 0
+        self.subscriptions = 0
+
+    async def handle_payload(self, payload, subscribe=None):
+        """Processa uma requisicao (ou lote) JSON-RPC; retorna a resposta serializavel"""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if isinstance(payload, list):
+            return [await self.handle_single(item, subscribe) for item in payload]
+        return await self.handle_single(payload, subscribe)
+
+    async def handle_single(self, request, subscribe):
+        self.requests += 1
+        request_id = request.get("id") if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict) or "method" not in request:
+                raise RpcError(-32600, "Invalid Request")
+            method, params = request["method"], request.get("params") or []
+            if method == "eth_subscribe":
+                if subscribe is None:
+                    raise RpcError(-32601, "Subscriptions only over WebSocket")
+                result = subscribe(params)
+            elif method == "eth_unsubscribe":
+                result = subscribe(None, params[0]) if subscribe else False
+            else:
+                result = self.chain.call(method, params)
+            return {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except RpcError as e:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": e.code, "message": e.message}}
+        except (IndexError, KeyError, TypeError, ValueError) as e:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32602, "message": f"Invalid params: {e}"}}
+
+    # HTTP ---------------------------------------------------------------
+
+    async def handle_connection(self, reader, writer):
+        """Conexao HTTP keep-alive; faz upgrade para WebSocket quando pedido"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                if headers.get("upgrade", "").lower() == "websocket":
+                    await self.websocket_session(reader, writer, headers)
+                    return
+
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                try:
+                    response = await self.handle_payload(json.loads(body))
+                    status = "200 OK"
+                except ValueError:
+                    response = {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}}
+                    status = "400 Bad Request"
+                data = json.dumps(response).encode()
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\nConnection: keep-alive\r\n\r\n".encode() + data)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    # WebSocket ----------------------------------------------------------
+
+    async def websocket_session(self, reader, writer, headers):
+        accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + WS_GUID).encode()).digest())
+        writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+        await writer.drain()
+
+        subscriptions = {}
+        send_lock = asyncio.Lock()
+
+        async def send(opcode, payload):
+            async with send_lock:
+                writer.write(encode_frame(opcode, payload))
+                await writer.drain()
+
+        def subscribe(params, unsubscribe_id=None):
+            if params is None:
+                callback = subscriptions.pop(unsubscribe_id, None)
+                self.chain.subscribers.discard(callback)
+                return callback is not None
+            if params[0] != "newHeads":
+                raise RpcError(-32602, f"Unsupported subscription: {params[0]}")
+            self.subscriptions += 1
+            sub_id = to_hex(self.subscriptions)
+
+            def notify(header):
+                message = {"jsonrpc": "2.0", "method": "eth_subscription",
+                           "params": {"subscription": sub_id, "result": header}}
+                asyncio.ensure_future(send(0x1, json.dumps(message).encode()))
+            subscriptions[sub_id] = notify
+            self.chain.subscribers.add(notify)
+            return sub_id
+
+        try:
+            while True:
+                opcode, payload = await read_message(reader)
+                if opcode == 0x8:
+                    await send(0x8, payload[:2])
+                    break
+                if opcode == 0x9:
+                    await send(0xA, payload)
+                    continue
+                if opcode not in (0x1, 0x2):
+                    continue
+                try:
+                    response = await self.handle_payload(json.loads(payload), subscribe)
+                except ValueError:
+                    response = {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}}
+                await send(0x1, json.dumps(response).encode())
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for callback in subscriptions.values():
+                self.chain.subscribers.discard(callback)
+            writer.close()
+
+def apply_mask(payload, mask):
+    """XOR do payload com a chave de 4 bytes (feito sobre inteiros, sem laco por byte)"""
+    n = len(payload)
+    if not n:
+        return payload
+    key = (mask * (n // 4 + 1))[:n]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(n, "big")
+
+def encode_frame(opcode, payload, mask=None):
+    """Frame WebSocket com FIN; o servidor envia sem mascara, o cliente com mask (4 bytes)"""
+    header = bytes([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    length = len(payload)
+    if length < 126:
+        header += bytes([mask_bit | length])
+    elif length < 1 << 16:
+        header += bytes([mask_bit | 126]) + length.to_bytes(2, "big")
+    else:
+        header += bytes([mask_bit | 127]) + length.to_bytes(8, "big")
+    if mask:
+        return header + mask + apply_mask(payload, mask)
+    return header + payload
+
+async def read_frame(reader):
+    """Le um frame; retorna (fin, opcode, payload desmascarado)"""
+    first, second = await reader.readexactly(2)
+    fin, opcode = first & 0x80, first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        length = int.from_bytes(await reader.readexactly(2), "big")
+    elif length == 127:
+        length = int.from_bytes(await reader.readexactly(8), "big")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = apply_mask(payload, mask)
+    return fin, opcode, payload
+
+async def read_message(reader):
+    """Le uma mensagem completa (juntando frames de continuacao)"""
+    fin, opcode, payload = await read_frame(reader)
+    while not fin:
+        fin, _, more = await read_frame(reader)
+        payload += more
+    return opcode, payload
+
+async def serve(args):
+    contracts = []
+    if args.networkconfig:
+        with open(args.networkconfig, 'r') as f:
+            config = json.load(f)
+        contracts = [c["address"] for c in config["ethereum"].get("contracts", {}).values() if c.get("address")]
+
+    chain = MockChain(block_time=args.block_time, inclusion_latency=args.inclusion_latency,
+                      max_txs_per_block=args.max_txs_per_block, fail_rate=args.fail_rate,
+                      rpc_error_rate=args.rpc_error_rate, chain_id=args.chain_id, seed=args.seed,
+                      call_result=args.call_result, contracts=contracts)
+    node = MockNode(chain, latency=args.latency_ms / 1000)
+    servers = [await asyncio.start_server(node.handle_connection, args.host, port)
+               for port in dict.fromkeys((args.rpc_port, args.ws_port))]
+    log_success(f"No simulado em http://{args.host}:{args.rpc_port} e ws://{args.host}:{args.ws_port} "
+                f"(bloco a cada {args.block_time:g}s, chainId {args.chain_id})")
+    producer = asyncio.ensure_future(chain.run())
+    try:
+        await asyncio.gather(*(server.serve_forever() for server in servers))
+    finally:
+        producer.cancel()
+        log_info(f"{len(chain.blocks) - 1} blocos, {node.requests} requisicoes, {chain.stats}")
+
+def main():
+    parser = argparse.ArgumentParser(description="No Besu simulado (JSON-RPC HTTP/WebSocket)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--rpc-port", type=int, default=8545, help="Porta JSON-RPC HTTP (padrao: 8545)")
+    parser.add_argument("--ws-port", type=int, default=8645, help="Porta WebSocket (padrao: 8645)")
+    parser.add_argument("--block-time", type=float, default=1.0, help="Tempo de bloco em segundos (padrao: 1)")
+    parser.add_argument("--inclusion-latency", type=float, default=0.0,
+                        help="Tempo minimo de uma transacao no txpool antes de entrar em um bloco (s)")
+    parser.add_argument("--max-txs-per-block", type=int, default=0, help="Limite de transacoes por bloco (0: sem limite)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latencia de resposta do RPC (ms)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fracao de transacoes revertidas (status 0x0)")
+    parser.add_argument("--rpc-error-rate", type=float, default=0.0,
+                        help="Fracao de eth_sendRawTransaction rejeitados com erro")
+    parser.add_argument("--chain-id", type=int, default=1337)
+    parser.add_argument("--seed", type=int, default=42, help="Semente da injecao de falhas")
+    parser.add_argument("--call-result", default=DEFAULT_CALL_RESULT, help="Retorno de eth_call")
+    parser.add_argument("--networkconfig", default=None,
+                        help="networkconfig.json cujos contratos ja existem (eth_getCode)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
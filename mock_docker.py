@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Docker Engine simulado (asyncio) em um socket Unix, para testar o
+docker_sampler.py sem Docker
+Atende a parte da API usada pelo amostrador:
+    GET /containers/json
+    GET /containers/{id}/stats?stream=false&one-shot=true
+
+Os containers node-besu1..N tem contadores acumulados de CPU, memoria, rede
+e disco que evoluem com o relogio: CPU base com um pico a cada bloco
+(tempo de bloco configuravel), escrita em disco a cada bloco e o
+node-besu1 com o dobro da memoria dos demais, como nas redes reais.
+
+As estatisticas saem com Transfer-Encoding: chunked (como no Docker) e a
+lista de containers com Content-Length.
+
+Uso:
+    python3 mock_docker.py --socket /tmp/docker.sock --nodes 4 --block-time 2
+"""
+
+import re
+import json
+import time
+import asyncio
+import argparse
+import hashlib
+
+# Cores para output
+class Colors:
+    BLUE = '\033[0;34m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    RED = '\033[0;31m'
+    NC = '\033[0m'
+
+def log_info(msg):
+    print(f"{Colors.BLUE}[INFO]{Colors.NC} {msg}", flush=True)
+
+def log_success(msg):
+    print(f"{Colors.GREEN}[OK]{Colors.NC} {msg}", flush=True)
+
+STATS_RE = re.compile(r'^/containers/([0-9a-f]+)/stats')
+
+class MockContainer:
+    """Contadores de um container, integrados a cada consulta"""
+
+    def __init__(self, name, index, block_time, cpus, base_cpu, spike_cpu, spike_s, memory_gb, block_write_mb):
+        self.name = name
+        self.id = hashlib.sha256(name.encode()).hexdigest()
+        self.block_time = block_time
+        self.cpus = cpus
+        self.base_cpu = base_cpu
+        self.spike_cpu = spike_cpu
+        self.spike_s = spike_s
+        self.memory = int(memory_gb * 1024 ** 3)
+        self.block_write = int(block_write_mb * 1024 ** 2)
+        # Nos diferentes produzem o pico em fases diferentes do bloco
+        self.phase = (index * 0.1) % block_time
+        self.started = self.last = time.time()
+        self.cpu_ns = 0.0
+
+    def cpu_fraction(self, t):
+        """Fracao da maquina usada pelo container no instante t"""
+        in_block = (t - self.started - self.phase) % self.block_time
+        return self.spike_cpu if in_block < self.spike_s else self.base_cpu
+
+    def stats(self, now):
+        # Integracao do uso de CPU desde a ultima consulta (passos de 10 ms)
+        t = self.last
+        while t < now:
+            step = min(0.01, now - t)
+            self.cpu_ns += self.cpu_fraction(t + step / 2) * step * 1e9 * self.cpus
+            t += step
+        self.last = now
+        elapsed = now - self.started
+        blocks = int(elapsed / self.block_time)
+        return {
+            "read": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(now)) + "Z",
+            "cpu_stats": {
+                "cpu_usage": {"total_usage": int(self.cpu_ns)},
+                "system_cpu_usage": int(now * 1e9 * self.cpus),
+                "online_cpus": self.cpus,
+            },
+            "precpu_stats": {},
+            "memory_stats": {"usage": self.memory + 64 * 1024 ** 2, "stats": {"inactive_file": 64 * 1024 ** 2}},
+            "networks": {"eth0": {"rx_bytes": int(elapsed * 20000), "tx_bytes": int(elapsed * 18000)}},
+            "blkio_stats": {"io_service_bytes_recursive": [
+                {"major": 8, "minor": 0, "op": "read", "value": 4096},
+                {"major": 8, "minor": 0, "op": "write", "value": blocks * self.block_write},
+            ]},
+        }
+
+class MockDocker:
+    def __init__(self, containers):
+        self.containers = {c.id: c for c in containers}
+        self.requests = 0
+
+    def route(self, path):
+        if path.startswith("/containers/json"):
+            return 200, [{"Id": c.id, "Names": [f"/{c.name}"], "State": "running"}
+                         for c in self.containers.values()], False
+        match = STATS_RE.match(path)
+        if match:
+            container = self.containers.get(match.group(1))
+            if container is None:
+                return 404, {"message": f"No such container: {match.group(1)}"}, False
+            return 200, container.stats(time.time()), True
+        return 404, {"message": "page not found"}, False
+
+    async def handle_connection(self, reader, writer):
+        """Conexao HTTP keep-alive"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                self.requests += 1
+                status, body, chunked = self.route(request_line.split()[1].decode())
+                data = json.dumps(body).encode() + b"\n"
+                reason = "OK" if status == 200 else "Not Found"
+                if chunked:
+                    writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                                 f"Transfer-Encoding: chunked\r\n\r\n".encode()
+                                 + f"{len(data):x}\r\n".encode() + data + b"\r\n0\r\n\r\n")
+                else:
+                    writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                                 f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, IndexError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(args):
+    containers = [MockContainer(f"{prefix}{i}", i, args.block_time, args.cpus, args.base_cpu, args.spike_cpu,
+                                args.spike_s, args.memory_gb * (2 if i == 1 else 1), args.block_write_mb)
+                  for prefix in args.prefix for i in range(1, args.nodes + 1)]
+    docker = MockDocker(containers)
+    server = await asyncio.start_unix_server(docker.handle_connection, args.socket)
+    log_success(f"Docker simulado em {args.socket} ({len(containers)} containers, bloco a cada {args.block_time:g}s)")
+    try:
+        await server.serve_forever()
+    finally:
+        log_info(f"{docker.requests} requisicoes")
+
+def main():
+    parser = argparse.ArgumentParser(description="Docker Engine simulado para o docker_sampler.py")
+    parser.add_argument("--socket", default="/tmp/mock-docker.sock", help="Socket Unix (padrao: /tmp/mock-docker.sock)")
+    parser.add_argument("--nodes", type=int, default=4, help="Containers por rede")
+    parser.add_argument("--prefix", nargs="+", default=["node-besu"],
+                        help="Prefixo dos containers de cada rede (ex.: exp0-node-besu exp1-node-besu)")
+    parser.add_argument("--block-time", type=float, default=2.0, help="Tempo de bloco em segundos (padrao: 2)")
+    parser.add_argument("--cpus", type=int, default=4, help="CPUs online reportadas")
+    parser.add_argument("--base-cpu", type=float, default=0.02, help="Fracao da maquina usada fora do pico")
+    parser.add_argument("--spike-cpu", type=float, default=0.3, help="Fracao da maquina usada no pico do bloco")
+    parser.add_argument("--spike-s", type=float, default=0.3, help="Duracao do pico a cada bloco (s)")
+    parser.add_argument("--memory-gb", type=float, default=0.5, help="Memoria de cada no (node-besu1 usa o dobro)")
+    parser.add_argument("--block-write-mb", type=float, default=0.25, help="Escrita em disco por bloco (MB)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Analise de recursos por no da rede Besu
+A media de CPU e memoria sobre todos os containers esconde nos que consomem
+muito mais que os outros (ex.: o node-besu1 com o dobro da memoria). Aqui
+cada no e analisado separadamente: dispersao entre os nos (max/mediana),
+nos quentes e eficiencia da rede (throughput por % de CPU e por GB de
+memoria somados sobre os nos).
+
+Os relatorios do Caliper escolhem a unidade de cada coluna conforme os
+valores (Memory [GB] ou [MB], Disc Write [KB] ou [MB], ...); normalize_units
+converte todas para um schema unico: memoria em GB, disco e rede em MB.
+"""
+
+import pandas as pd
+
+# Containers dos nos da rede (as demais linhas do monitor sao ignoradas)
+NODE_PATTERN = r'node-besu\d+'
+
+# Unidades dos relatorios do Caliper (multiplos de 1024 bytes)
+BYTE_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+# Metrica do relatorio -> (coluna normalizada, unidade)
+SIZE_METRICS = {
+    'Memory(max)': ('memory_max_gb', 'GB'),
+    'Memory(avg)': ('memory_avg_gb', 'GB'),
+    'Traffic In': ('traffic_in_mb', 'MB'),
+    'Traffic Out': ('traffic_out_mb', 'MB'),
+    'Disc Write': ('disc_write_mb', 'MB'),
+    'Disc Read': ('disc_read_mb', 'MB'),
+}
+CPU_METRICS = {'CPU%(max)': 'cpu_max', 'CPU%(avg)': 'cpu_avg'}
+
+RESOURCE_COLUMNS = list(CPU_METRICS.values()) + [name for name, _ in SIZE_METRICS.values()]
+
+# Metricas comparadas entre os nos: coluna normalizada -> prefixo das colunas de resumo
+IMBALANCE_METRICS = {'cpu_avg': 'cpu', 'memory_avg_gb': 'memory_gb', 'disc_write_mb': 'disc_write_mb'}
+
+# No quente: metrica ao menos 1.5x a mediana dos nos no mesmo ponto
+DEFAULT_HOT_RATIO = 1.5
+
+def source_columns():
+    """Todas as colunas de recursos que um relatorio pode ter, em qualquer unidade"""
+    return list(CPU_METRICS) + [f"{metric} [{unit}]" for metric in SIZE_METRICS for unit in BYTE_UNITS]
+
+def normalize_units(df):
+    """
+    Converte as colunas de recursos do monitor para o schema unico
+    (RESOURCE_COLUMNS). Cada linha usa a coluna que tiver valor, em
+    qualquer unidade; colunas ausentes ficam NaN.
+    """
+    out = pd.DataFrame(index=df.index)
+    for col, name in CPU_METRICS.items():
+        out[name] = pd.to_numeric(df[col], errors='coerce') if col in df.columns else float('nan')
+    for metric, (name, unit) in SIZE_METRICS.items():
+        values = pd.Series(float('nan'), index=df.index)
+        for src_unit, size in BYTE_UNITS.items():
+            col = f"{metric} [{src_unit}]"
+            if col in df.columns:
+                values = values.fillna(pd.to_numeric(df[col], errors='coerce') * size / BYTE_UNITS[unit])
+        out[name] = values
+    return out
+
+def node_points(mon_df, keys):
+    """
+    Uma linha por no e ponto (keys), com a media das repeticoes em unidades
+    normalizadas e a razao de cada metrica para a mediana dos nos do ponto.
+    """
+    names = mon_df['Name'].astype('string')
+    df = mon_df[names.str.contains(NODE_PATTERN, na=False)]
+    nodes = normalize_units(df)
+    for key in keys:
+        nodes[key] = df[key]
+    nodes['node'] = names[df.index].str.lstrip('/')
+
+    nodes = nodes.groupby(list(keys) + ['node'], dropna=False)[RESOURCE_COLUMNS].mean().reset_index()
+    nodes['node_index'] = nodes['node'].str.extract(r'(\d+)$', expand=False).astype(float)
+    nodes = nodes.sort_values(list(keys) + ['node_index']).drop(columns='node_index').reset_index(drop=True)
+
+    grouped = nodes.groupby(list(keys), dropna=False)
+    for metric, prefix in IMBALANCE_METRICS.items():
+        median = grouped[metric].transform('median')
+        nodes[f'{prefix}_ratio'] = (nodes[metric] / median).where(median > 0)
+    return nodes
+
+def node_imbalance(nodes, keys):
+    """
+    Resumo de cada ponto sobre os nos: total da rede, mediana, maximo,
+    desbalanceamento (max/mediana) e o no mais carregado de cada metrica.
+    """
+    keys = list(keys)
+    grouped = nodes.groupby(keys, dropna=False)
+    summary = grouped['node'].nunique().rename('node_count').reset_index()
+    summary['total_cpu'] = grouped['cpu_avg'].sum(min_count=1).to_numpy()
+    summary['total_memory_gb'] = grouped['memory_avg_gb'].sum(min_count=1).to_numpy()
+    summary['total_disc_write_mb'] = grouped['disc_write_mb'].sum(min_count=1).to_numpy()
+
+    for metric, prefix in IMBALANCE_METRICS.items():
+        median = grouped[metric].median().to_numpy()
+        peak = grouped[metric].max().to_numpy()
+        summary[f'{prefix}_median'] = median
+        summary[f'{prefix}_max'] = peak
+        summary[f'{prefix}_imbalance'] = summary[f'{prefix}_max'] / summary[f'{prefix}_median'].where(median > 0)
+        # No mais carregado: primeira linha de cada ponto ordenado pela metrica
+        hottest = (nodes.dropna(subset=[metric]).sort_values(metric, ascending=False)
+                   .drop_duplicates(keys)[keys + ['node']].rename(columns={'node': f'{prefix}_hot_node'}))
+        summary = summary.merge(hottest, on=keys, how='left')
+    return summary
+
+def hot_nodes(nodes, keys, hot_ratio=DEFAULT_HOT_RATIO):
+    """
+    Nos quentes: para cada grupo (keys, ex. experimento), no e metrica, em
+    quantos pontos o no ficou ao menos hot_ratio vezes acima da mediana dos
+    nos, e a razao media nesses pontos.
+    """
+    keys = list(keys)
+    frames = []
+    for metric, prefix in IMBALANCE_METRICS.items():
+        ratio = nodes[f'{prefix}_ratio']
+        points = nodes[ratio.notna()].assign(hot=ratio >= hot_ratio, ratio=ratio.where(ratio >= hot_ratio))
+        if points.empty:
+            continue
+        counts = points.groupby(keys + ['node'], dropna=False).agg(
+            hot_points=('hot', 'sum'),
+            points=('hot', 'size'),
+            mean_ratio=('ratio', 'mean'),
+        ).reset_index()
+        frames.append(counts[counts['hot_points'] > 0].assign(metric=prefix))
+    if not frames:
+        return pd.DataFrame(columns=keys + ['node', 'metric', 'hot_points', 'points', 'mean_ratio'])
+    hot = pd.concat(frames, ignore_index=True)
+    hot = hot[keys + ['node', 'metric', 'hot_points', 'points', 'mean_ratio']]
+    return hot.sort_values(keys + ['hot_points', 'mean_ratio'], ascending=[True] * len(keys) + [False, False],
+                           na_position='last').reset_index(drop=True)
+
+def efficiency(df, throughput_col='throughput'):
+    """
+    Throughput por % de CPU e por GB de memoria, somados sobre os nos
+    (colunas total_cpu e total_memory_gb de node_imbalance). Se a eficiencia
+    cai com mais validadores, os nos extras so adicionam overhead.
+    """
+    df = df.copy()
+    df['tps_per_cpu'] = df[throughput_col] / df['total_cpu'].where(df['total_cpu'] > 0)
+    df['tps_per_gb'] = df[throughput_col] / df['total_memory_gb'].where(df['total_memory_gb'] > 0)
+    return df
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Gerador de carga de leitura (eth_call) em Python/asyncio
+Alternativa ao worker do Caliper para workloads somente leitura, que ficam
+limitados pelo worker unico (~630 TPS no query) e nao pelo Besu:
+  - pool de conexoes WebSocket com o no (--connections)
+  - lotes JSON-RPC (--batch-size requisicoes por mensagem)
+  - controle de taxa em malha aberta: a i-esima chamada tem horario
+    agendado t0 + i/tps, independente das respostas; a latencia e medida a
+    partir do horario agendado, entao atrasos do proprio gerador aparecem
+    na latencia em vez de reduzirem a taxa
+
+Workloads suportados (mesmos argumentos dos modulos .js do benchmark):
+    query            simple.query(acc_id), contas sorteadas como no SimpleState
+    getLatestStatus  NodeHealthMonitor.getLatestStatus(node)
+    statusReports    NodeHealthMonitor.statusReports(node, 0)
+
+O resultado e um CSV com o mesmo esquema da tabela de performance do
+extract_csv.py ({funcao}_rpc_report_{tps}_{timestamp}.csv), que o
+extract_csv.py incorpora como se fosse um relatorio do Caliper.
+
+Uso:
+    python3 rpc_loadgen.py query --tps 2000 --tx-number 20000 --connections 8 --batch-size 20
+    python3 rpc_loadgen.py getLatestStatus --config benchmarks/scenario-monitoring/NodeHealthMonitor/config-getLatestStatus.yaml
+"""
+
+import os
+import csv
+import json
+import math
+import time
+import base64
+import random
+import asyncio
+import argparse
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+from mock_besu import encode_frame, read_message
+
+try:
+    import yaml
+except ImportError:  # PyYAML e necessario apenas para ler a config do benchmark
+    yaml = None
+
+base_dir = Path(__file__).parent
+NETWORKCONFIG_PATH = base_dir / "networks" / "besu" / "networkconfig.json"
+
+DEFAULT_CONNECTIONS = 4
+DEFAULT_BATCH_SIZE = 10
+BATCH_INTERVAL = 0.005   # periodo do agendador (s): chamadas vencidas no periodo vao no mesmo lote
+REQUEST_TIMEOUT = 30.0
+
+# Mesmas colunas da tabela de performance extraida pelo extract_csv.py
+PERF_FIELDS = ["Name", "Succ", "Fail", "Send Rate (TPS)", "Max Latency (s)", "Min Latency (s)",
+               "Avg Latency (s)", "Throughput (TPS)", "TPS", "Driver", "Test Type"]
+
+# Cores para output
+class Colors:
+    BLUE = '\033[0;34m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    RED = '\033[0;31m'
+    NC = '\033[0m'
+
+def log_info(msg):
+    print(f"{Colors.BLUE}[INFO]{Colors.NC} {msg}")
+
+def log_success(msg):
+    print(f"{Colors.GREEN}[OK]{Colors.NC} {msg}")
+
+def log_warning(msg):
+    print(f"{Colors.YELLOW}[WARN]{Colors.NC} {msg}")
+
+def log_error(msg):
+    print(f"{Colors.RED}[ERROR]{Colors.NC} {msg}")
+
+# Keccak-256 -----------------------------------------------------------------
+# O hashlib so tem o SHA3 padronizado (padding diferente); o keccak e necessario
+# apenas para os seletores das funcoes, calculados uma vez por execucao.
+
+def _rc_bit(t):
+    r = 1
+    for _ in range(t % 255):
+        r <<= 1
+        if r & 0x100:
+            r ^= 0x171
+    return r & 1
+
+_ROUND_CONSTANTS = [sum(_rc_bit(j + 7 * i) << ((1 << j) - 1) for j in range(7)) for i in range(24)]
+_ROTATIONS = [[0] * 5 for _ in range(5)]
+_x, _y = 1, 0
+for _t in range(24):
+    _ROTATIONS[_x][_y] = ((_t + 1) * (_t + 2) // 2) % 64
+    _x, _y = _y, (2 * _x + 3 * _y) % 5
+_MASK64 = (1 << 64) - 1
+
+def _keccak_f(lanes):
+    for rc in _ROUND_CONSTANTS:
+        c = [lanes[x][0] ^ lanes[x][1] ^ lanes[x][2] ^ lanes[x][3] ^ lanes[x][4] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ (((c[(x + 1) % 5] << 1) | (c[(x + 1) % 5] >> 63)) & _MASK64) for x in range(5)]
+        lanes = [[lanes[x][y] ^ d[x] for y in range(5)] for x in range(5)]
+        b = [[0] * 5 for _ in range(5)]
+        for x in range(5):
+            for y in range(5):
+                r = _ROTATIONS[x][y]
+                b[y][(2 * x + 3 * y) % 5] = ((lanes[x][y] << r) | (lanes[x][y] >> (64 - r))) & _MASK64 if r else lanes[x][y]
+        lanes = [[b[x][y] ^ (~b[(x + 1) % 5][y] & b[(x + 2) % 5][y]) for y in range(5)] for x in range(5)]
+        lanes[0][0] ^= rc
+    return lanes
+
+def keccak256(data):
+    rate = 136
+    padded = bytearray(data) + b"\x01" + b"\x00" * ((-len(data) - 1) % rate)
+    padded[-1] |= 0x80
+    lanes = [[0] * 5 for _ in range(5)]
+    for offset in range(0, len(padded), rate):
+        block = padded[offset:offset + rate]
+        for i in range(rate // 8):
+            lanes[i % 5][i // 5] ^= int.from_bytes(block[8 * i:8 * i + 8], "little")
+        lanes = _keccak_f(lanes)
+    return b"".join(lanes[i % 5][i // 5].to_bytes(8, "little") for i in range(4))
+
+# ABI ------------------------------------------------------------------------
+
+def function_selector(abi_entry):
+    signature = f"{abi_entry['name']}({','.join(i['type'] for i in abi_entry['inputs'])})"
+    return keccak256(signature.encode())[:4]
+
+def _encode_static(abi_type, value):
+    if abi_type == "address":
+        return bytes(12) + bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    if abi_type == "bool":
+        return int(bool(value)).to_bytes(32, "big")
+    if abi_type.startswith(("uint", "int")):
+        return int(value).to_bytes(32, "big", signed=abi_type.startswith("int"))
+    if abi_type.startswith("bytes"):
+        raw = bytes.fromhex(value[2:]) if isinstance(value, str) else bytes(value)
+        return raw.ljust(32, b"\x00")
+    raise ValueError(f"tipo ABI nao suportado: {abi_type}")
+
+def encode_call(abi_entry, args):
+    """Calldata (seletor + argumentos) para os tipos usados nos contratos do benchmark"""
+    head, tail = b"", b""
+    types = [i["type"] for i in abi_entry["inputs"]]
+    offset = 32 * len(types)
+    for abi_type, value in zip(types, args):
+        if abi_type in ("string", "bytes"):
+            raw = value.encode() if isinstance(value, str) and abi_type == "string" else (
+                bytes.fromhex(value[2:]) if isinstance(value, str) else bytes(value))
+            head += (offset + len(tail)).to_bytes(32, "big")
+            tail += len(raw).to_bytes(32, "big") + raw.ljust(math.ceil(len(raw) / 32) * 32, b"\x00")
+        else:
+            head += _encode_static(abi_type, value)
+    return "0x" + (function_selector(abi_entry) + head + tail).hex()
+
+# Workloads ------------------------------------------------------------------
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+NODE_ADDRESS = "0x7a5583095f747317be8a48d9a944aa0a9508f1d2"
+
+def account_key(number):
+    """Nome da conta como SimpleState._get26Num (worker 0): 1 -> 'b', 27 -> 'bb'"""
+    result = ""
+    while number > 0:
+        result += ALPHABET[number % 26]
+        number //= 26
+    return result
+
+def query_args(arguments, rng):
+    accounts = int(arguments.get("numberOfAccounts", 1000))
+    return [account_key(math.ceil(rng.random() * accounts) or 1)]
+
+def latest_status_args(arguments, rng):
+    return list(arguments.get("getLatestStatus") or [NODE_ADDRESS])
+
+def status_reports_args(arguments, rng):
+    return [NODE_ADDRESS, 0]
+
+# funcao -> (contrato no networkconfig.json, gerador de argumentos)
+READ_WORKLOADS = {
+    "query": ("simple", query_args),
+    "getLatestStatus": ("NodeHealthMonitor", latest_status_args),
+    "statusReports": ("NodeHealthMonitor", status_reports_args),
+}
+
+def load_round(config_path, function_name):
+    """txNumber, tps e argumentos do round da funcao na config do benchmark"""
+    if yaml is None:
+        raise RuntimeError("PyYAML nao instalado: instale com 'pip install pyyaml'")
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+    for round_cfg in config["test"]["rounds"]:
+        if round_cfg.get("label") == function_name:
+            return {
+                "tx_number": round_cfg.get("txNumber"),
+                "tps": round_cfg.get("rateControl", {}).get("opts", {}).get("tps"),
+                "arguments": round_cfg.get("workload", {}).get("arguments", {}) or {},
+            }
+    raise ValueError(f"round '{function_name}' nao encontrado em {config_path}")
+
+# Conexoes WebSocket ---------------------------------------------------------
+
+class RpcConnection:
+    """Conexao WebSocket JSON-RPC; respostas (inclusive de lotes) casadas por id"""
+
+    def __init__(self):
+        self.reader = self.writer = None
+        self.pending = {}
+        self.listener = None
+
+    async def connect(self, url):
+        parsed = urlparse(url)
+        self.reader, self.writer = await asyncio.open_connection(parsed.hostname, parsed.port or 80)
+        key = base64.b64encode(os.urandom(16)).decode()
+        self.writer.write((f"GET {parsed.path or '/'} HTTP/1.1\r\nHost: {parsed.netloc}\r\n"
+                           f"Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                           f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+        await self.writer.drain()
+        status = await self.reader.readline()
+        if b" 101 " not in status:
+            raise ConnectionError(f"handshake WebSocket recusado: {status.decode(errors='replace').strip()}")
+        while (await self.reader.readline()) not in (b"\r\n", b""):
+            pass
+        self.listener = asyncio.ensure_future(self._listen())
+
+    async def _listen(self):
+        try:
+            while True:
+                opcode, payload = await read_message(self.reader)
+                if opcode == 0x8:
+                    break
+                if opcode not in (0x1, 0x2):
+                    continue
+                message = json.loads(payload)
+                for response in (message if isinstance(message, list) else [message]):
+                    future = self.pending.pop(response.get("id"), None)
+                    if future is not None and not future.done():
+                        future.set_result(response)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("conexao encerrada"))
+            self.pending.clear()
+
+    def send(self, requests):
+        """Envia um lote (ou uma requisicao); retorna os futures das respostas"""
+        loop = asyncio.get_running_loop()
+        futures = []
+        for request in requests:
+            future = loop.create_future()
+            self.pending[request["id"]] = future
+            futures.append(future)
+        body = requests if len(requests) > 1 else requests[0]
+        self.writer.write(encode_frame(0x1, json.dumps(body).encode(), mask=os.urandom(4)))
+        return futures
+
+    async def close(self):
+        if self.writer is not None:
+            try:
+                self.writer.write(encode_frame(0x8, (1000).to_bytes(2, "big"), mask=os.urandom(4)))
+                await self.writer.drain()
+            except ConnectionError:
+                pass
+            self.writer.close()
+        if self.listener is not None:
+            self.listener.cancel()
+
+# Execucao -------------------------------------------------------------------
+
+async def _collect(futures, scheduled, results, timeout):
+    """Aguarda as respostas de um lote e registra (agendado, concluido, sucesso)"""
+    done, _ = await asyncio.wait(futures, timeout=timeout)
+    finished = time.monotonic()
+    for future, when in zip(futures, scheduled):
+        ok = False
+        if future in done and future.exception() is None:
+            ok = "result" in future.result()
+        elif future not in done:
+            future.cancel()
+        results.append((when, finished, ok))
+
+async def run_load(url, calls, tps, connections=DEFAULT_CONNECTIONS, batch_size=DEFAULT_BATCH_SIZE,
+                   timeout=REQUEST_TIMEOUT, progress=True):
+    """
+    Executa as chamadas (lista de (to, data, from)) a tps em malha aberta.
+    Retorna (resultados, primeiro envio, ultimo envio); resultados sao
+    (agendado, concluido, sucesso) em segundos de time.monotonic().
+    """
+    pool = [RpcConnection() for _ in range(connections)]
+    await asyncio.gather(*(conn.connect(url) for conn in pool))
+
+    results, tasks = [], []
+    sent, next_conn, next_id = 0, 0, 1
+    first_send = last_send = None
+    start = time.monotonic() + 0.05
+    next_report = start + 5
+    try:
+        while sent < len(calls):
+            now = time.monotonic()
+            due = min(len(calls), int((now - start) * tps) + 1) if now >= start else 0
+            while sent < due:
+                chunk = min(batch_size, due - sent)
+                requests, scheduled = [], []
+                for i in range(sent, sent + chunk):
+                    to, data, sender = calls[i]
+                    requests.append({"jsonrpc": "2.0", "id": next_id, "method": "eth_call",
+                                     "params": [{"from": sender, "to": to, "data": data}, "latest"]})
+                    scheduled.append(start + i / tps)
+                    next_id += 1
+                conn = pool[next_conn]
+                next_conn = (next_conn + 1) % len(pool)
+                try:
+                    futures = conn.send(requests)
+                except (ConnectionError, RuntimeError, AttributeError):
+                    results.extend((when, time.monotonic(), False) for when in scheduled)
+                else:
+                    tasks.append(asyncio.ensure_future(_collect(futures, scheduled, results, timeout)))
+                first_send = first_send or time.monotonic()
+                last_send = time.monotonic()
+                sent += chunk
+            if progress and now >= next_report:
+                succ = sum(1 for r in results if r[2])
+                log_info(f"Submitted: {sent} Succ: {succ} Fail:{len(results) - succ} Unfinished:{sent - len(results)}")
+                next_report += 5
+            # Proximo despertar: a proxima chamada agendada, agrupando as vencidas no periodo
+            wake = start + sent / tps
+            await asyncio.sleep(max(wake - time.monotonic(), BATCH_INTERVAL))
+        await asyncio.gather(*tasks)
+    finally:
+        await asyncio.gather(*(conn.close() for conn in pool), return_exceptions=True)
+    return results, first_send, last_send
+
+def summarize(results, first_send, last_send, label, tps, test_type):
+    """Linha no esquema da tabela de performance do Caliper"""
+    succ = [finished - when for when, finished, ok in results if ok]
+    n_fail = len(results) - len(succ)
+    last_finish = max((finished for _, finished, _ in results), default=last_send)
+    send_duration = (last_send - first_send) if first_send and last_send else 0
+    total_duration = (last_finish - first_send) if first_send else 0
+    return {
+        "Name": label,
+        "Succ": len(succ),
+        "Fail": n_fail,
+        "Send Rate (TPS)": f"{len(results) / send_duration:.1f}" if send_duration > 0 else "-",
+        "Max Latency (s)": f"{max(succ):.2f}" if succ else "-",
+        "Min Latency (s)": f"{min(succ):.2f}" if succ else "-",
+        "Avg Latency (s)": f"{sum(succ) / len(succ):.2f}" if succ else "-",
+        "Throughput (TPS)": f"{len(succ) / total_duration:.1f}" if total_duration > 0 else "-",
+        "TPS": tps,
+        "Driver": "rpc",
+        "Test Type": test_type,
+    }
+
+def build_calls(function_name, networkconfig, tx_number, arguments=None, seed=None):
+    """Lista de (to, data, from) das chamadas do round"""
+    contract_name, make_args = READ_WORKLOADS[function_name]
+    with open(networkconfig, 'r') as f:
+        ethereum = json.load(f)["ethereum"]
+    contract = ethereum["contracts"][contract_name]
+    abi_entry = next(e for e in contract["abi"] if e.get("type") == "function" and e["name"] == function_name)
+    rng = random.Random(seed)
+    sender = ethereum.get("fromAddress")
+    return [(contract["address"], encode_call(abi_entry, make_args(arguments or {}, rng)), sender)
+            for _ in range(tx_number)]
+
+def run_round(function_name, tps, tx_number, output_dir, networkconfig=NETWORKCONFIG_PATH, arguments=None,
+              connections=DEFAULT_CONNECTIONS, batch_size=DEFAULT_BATCH_SIZE, url=None, seed=None):
+    """Executa um round e grava o CSV de performance; retorna (caminho, linha)"""
+    if url is None:
+        with open(networkconfig, 'r') as f:
+            url = json.load(f)["ethereum"]["url"]
+    calls = build_calls(function_name, networkconfig, tx_number, arguments, seed)
+    log_info(f"{function_name}: {tx_number} eth_call a {tps} TPS em {url} "
+             f"({connections} conexoes, lotes de ate {batch_size})")
+    results, first_send, last_send = asyncio.run(run_load(url, calls, tps, connections, batch_size))
+
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report_path = output_dir / f"{function_name}_rpc_report_{tps}_{timestamp}.csv"
+    row = summarize(results, first_send, last_send, function_name, tps, report_path.stem)
+    with open(report_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=PERF_FIELDS)
+        writer.writeheader()
+        writer.writerow(row)
+    return report_path, row
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga de leitura (eth_call) com conexoes WebSocket e lotes JSON-RPC")
+    parser.add_argument("function", choices=sorted(READ_WORKLOADS), help="Funcao de leitura do benchmark")
+    parser.add_argument("--config", default=None, help="config-*.yaml do benchmark (txNumber, tps e argumentos)")
+    parser.add_argument("--tps", type=int, default=None, help="Taxa alvo (padrao: a da config, ou 100)")
+    parser.add_argument("--tx-number", type=int, default=None, help="Numero de chamadas (padrao: o da config, ou 1000)")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS,
+                        help=f"Conexoes WebSocket no pool (padrao: {DEFAULT_CONNECTIONS})")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Maximo de chamadas por lote JSON-RPC (padrao: {DEFAULT_BATCH_SIZE}; 1 desativa)")
+    parser.add_argument("--networkconfig", default=str(NETWORKCONFIG_PATH))
+    parser.add_argument("--url", default=None, help="URL WebSocket (padrao: a do networkconfig.json)")
+    parser.add_argument("--output-dir", default=None, help="Diretorio do CSV (padrao: reports_htmls/{funcao})")
+    parser.add_argument("--seed", type=int, default=None, help="Semente do sorteio dos argumentos")
+    args = parser.parse_args()
+
+    round_cfg = load_round(args.config, args.function) if args.config else {"arguments": {}}
+    tps = args.tps or round_cfg.get("tps") or 100
+    tx_number = args.tx_number or round_cfg.get("tx_number") or 1000
+    output_dir = args.output_dir or base_dir / "reports_htmls" / args.function
+
+    try:
+        report_path, row = run_round(args.function, tps, tx_number, output_dir, args.networkconfig,
+                                     round_cfg["arguments"], args.connections, args.batch_size, args.url, args.seed)
+    except (OSError, ConnectionError) as e:
+        log_error(f"Falha ao conectar: {e}")
+        raise SystemExit(1)
+    log_success(f"Succ: {row['Succ']} Fail: {row['Fail']} | Send Rate: {row['Send Rate (TPS)']} TPS | "
+                f"Throughput: {row['Throughput (TPS)']} TPS | Latencia media: {row['Avg Latency (s)']}s")
+    log_success(f"Resultado salvo em {report_path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,21 @@
 import os
+import json
+import argparse
 import subprocess
 import time
 from datetime import datetime
 import sys
 
+from besu_readiness import Readiness, RpcError, ws_url_from_config, RPC_URL, DEFAULT_TIMEOUT
+from benchmark_matrix import RUNS_DIR, CONTAINER_PREFIX, containers_pattern, render_run_config, record_with_report
+from caliper_monitor import RoundProgress, run_streaming, DEFAULT_MAX_FAIL_RATE, DEFAULT_MAX_LATENCY
+from sweep_journal import SweepJournal, JOURNAL_DIR_NAME
+from deploy_cache import DeployCache, chain_identity, contract_fingerprint, file_lock
+from rpc_loadgen import READ_WORKLOADS, DEFAULT_CONNECTIONS, DEFAULT_BATCH_SIZE, load_round, run_round
+from block_analytics import record_round_blocks, describe_summary
+from caliper_logs import round_window
+from docker_sampler import DOCKER_SOCKET, RING_SUFFIX, start_recorder, stop_recorder
+
 num_testes = 5
 # Caminhos para cada configuração de função
 BENCHMARK_FILES = {
@@ -21,43 +33,81 @@ TPS_LIST_QUERY = [100, 200, 300, 400, 500, 600, 700] # query
 TPS_LIST_TRANSFER = [70, 80, 90, 100, 110] # transfer
 TPS_LIST = [10]
 
-# Atualiza o valor de TPS no arquivo de benchmark YAML
-def update_tps_in_file(file_path, tps):
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
+# Parametros fixos de todas as execucoes (workers, tx_number, nodes), alem do tps.
+# Os config-*.yaml sao apenas templates: cada execucao gera a sua config em runs/
+RUN_PARAMS = {}
 
-    new_lines = []
-    for line in lines:
-        if line.strip().startswith("tps:"):
-            new_lines.append(f"          tps: {tps}\n")
-        else:
-            new_lines.append(line)
+# Endpoints e diretorios da rede alvo; o experiment_scheduler.py os troca para
+# rodar varias redes isoladas ao mesmo tempo
+RPC_ENDPOINT = RPC_URL
+NETWORKCONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'networks/besu/networkconfig.json')
+REPORTS_ROOT = "reports_htmls"
+
+# Limites para abortar um round em andamento (0 desativa); o round abortado conta como saturado
+ABORT_LIMITS = {"max_fail_rate": DEFAULT_MAX_FAIL_RATE, "max_latency": DEFAULT_MAX_LATENCY}
+
+# Driver das funcoes de leitura: "caliper" ou "rpc" (rpc_loadgen.py, eth_call em lotes
+# por um pool de conexoes WebSocket); as funcoes de escrita sempre usam o Caliper
+DRIVER = "caliper"
+RPC_LOAD = {"connections": DEFAULT_CONNECTIONS, "batch_size": DEFAULT_BATCH_SIZE}
+
+# Amostragem dos containers em alta frequencia durante cada round do Caliper
+# (docker_sampler.py); intervalo 0 desativa
+SAMPLER = {"interval": 0, "socket": DOCKER_SOCKET}
+
+# Metricas por bloco da faixa de blocos de cada ponto ({relatorio}.blocks.csv); --no-blocks desativa
+BLOCK_ANALYTICS = True
+
+# Diario da bateria: pontos concluidos (cenario, funcao, tps, repeticao), para --resume
+JOURNAL = None
+
+# Reaproveita o contrato ja implantado na mesma rede (deploy_cache.json); --redeploy desativa
+USE_DEPLOY_CACHE = True
 
-    with open(file_path, 'w') as file:
-        file.writelines(new_lines)
+# Baterias em paralelo (experiment_scheduler.py) compartilham o projeto Hardhat
+# (ignition/deployments/chain-<chainId>) e o node_modules do workspace do Caliper:
+# o deploy e o caliper bind rodam um de cada vez, sob estes locks
+DEPLOY_LOCK = RUNS_DIR / "hardhat-deploy.lock"
+BIND_LOCK = RUNS_DIR / "caliper-bind.lock"
+CALIPER_SUT = "besu:latest"
+
+# Prazo das esperas de prontidao da rede (substituem os sleeps fixos)
+READY_TIMEOUT = DEFAULT_TIMEOUT
+_readiness = None
+
+# Modo --search: busca do ponto de saturacao por rampa + bissecao do tps do fixed-rate
+SEARCH_GROWTH = 2          # fator de crescimento da rampa
+SEARCH_TOLERANCE = 5       # largura final do intervalo (TPS)
+SEARCH_MAX_TPS = 2000      # teto da rampa
+
+# Sondagens de prontidao com conexao JSON-RPC persistente (criada uma vez)
+def get_readiness():
+    global _readiness
+    if _readiness is None:
+        _readiness = Readiness(RPC_ENDPOINT, ws_url_from_config(NETWORKCONFIG_PATH))
+    return _readiness
 
 # Verifica conectividade com a rede Besu
 def check_network_connection():
     print("Verificando conectividade com a rede Besu...")
-    for i in range(10):
-        try:
-            result = subprocess.run(
-                ['curl', '-s', '-X', 'POST', '--data',
-                 '{"jsonrpc":"2.0","method":"eth_blockNumber","params":[],"id":1}',
-                 'http://127.0.0.1:8545'],
-                capture_output=True,
-                timeout=5
-            )
-            if result.returncode == 0:
-                print(f"Rede Besu acessivel (tentativa {i+1}/10)")
-                return True
-        except:
-            pass
-        print(f"Tentativa {i+1}/10 falhou, aguardando 3s...")
-        time.sleep(3)
-    print("ERRO: Rede Besu nao esta acessivel")
+    start = time.monotonic()
+    if get_readiness().wait_for_rpc(timeout=READY_TIMEOUT):
+        print(f"Rede Besu acessivel ({time.monotonic() - start:.1f}s)")
+        return True
+    print(f"ERRO: Rede Besu nao esta acessivel (prazo de {READY_TIMEOUT}s)")
     return False
 
+# Aguarda a rede ficar quieta: blocos avancando (progress), txpool vazio e porta WebSocket livre
+def wait_network_ready(reason, progress=False):
+    print(f"Aguardando rede pronta ({reason})...")
+    start = time.monotonic()
+    ready, step = get_readiness().wait_until_quiescent(timeout=READY_TIMEOUT, progress=progress)
+    if ready:
+        print(f"Rede pronta em {time.monotonic() - start:.1f}s")
+    else:
+        print(f"AVISO: prazo de {READY_TIMEOUT}s esgotado aguardando: {step}")
+    return ready
+
 # Implanta o contrato Simple na rede
 def deploy_simple_contract():
     print("\n" + "="*50)
@@ -68,13 +118,28 @@ def deploy_simple_contract():
         print("ERRO: Nao foi possivel conectar na rede Besu")
         return False
 
-    # Aguardar estabilizacao adicional
-    print("Aguardando estabilizacao adicional (15 segundos)...")
-    time.sleep(15)
-
     # Caminho para o diretório Hardhat
     hardhat_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../Hardhat-contracts'))
 
+    # Reaproveita o deploy anterior se a rede e o contrato forem os mesmos e o codigo ainda estiver no endereco
+    client = get_readiness().rpc
+    cache = DeployCache()
+    identity = None
+    if USE_DEPLOY_CACHE:
+        try:
+            identity = chain_identity(client)
+            address = cache.lookup(client, "simple", contract_fingerprint("Simple", hardhat_dir), identity)
+        except RpcError as e:
+            print(f"AVISO: cache de deploy indisponivel ({e})")
+            address = None
+        if address:
+            print(f"Contrato Simple ja implantado em {address} (cache de deploy: mesma rede e mesmo bytecode)")
+            return update_contract_address(address)
+
+    # Aguardar a rede produzir blocos antes do deploy
+    if not wait_network_ready("antes do deploy", progress=True):
+        return False
+
     if not os.path.exists(hardhat_dir):
         print(f"ERRO: Diretorio Hardhat-contracts nao encontrado em {hardhat_dir}")
         return False
@@ -82,15 +147,17 @@ def deploy_simple_contract():
     # Deploy usando Hardhat Ignition
     print(f"Executando deploy no diretorio: {hardhat_dir}")
     try:
-        result = subprocess.run(
-            ['npx', 'hardhat', 'ignition', 'deploy', './ignition/modules/Simple.ts',
-             '--network', 'besu', '--reset'],
-            cwd=hardhat_dir,
-            capture_output=True,
-            text=True,
-            timeout=120,
-            input='y\ny\n'  # Confirma automaticamente (duas vezes: deploy e reset)
-        )
+        with file_lock(DEPLOY_LOCK):
+            result = subprocess.run(
+                ['npx', 'hardhat', 'ignition', 'deploy', './ignition/modules/Simple.ts',
+                 '--network', 'besu', '--reset'],
+                cwd=hardhat_dir,
+                env={**os.environ, "BESU_RPC_URL": RPC_ENDPOINT},
+                capture_output=True,
+                text=True,
+                timeout=120,
+                input='y\ny\n'  # Confirma automaticamente (duas vezes: deploy e reset)
+            )
 
         if result.returncode != 0:
             print(f"ERRO ao implantar contrato: {result.stderr}")
@@ -107,27 +174,17 @@ def deploy_simple_contract():
         contract_address = match.group(1)
         print(f"Contrato Simple implantado em: {contract_address}")
 
-        # Atualizar networkconfig.json
-        networkconfig_path = os.path.join(os.path.dirname(__file__),
-                                          'networks/besu/networkconfig.json')
-
-        if not os.path.exists(networkconfig_path):
-            print(f"ERRO: networkconfig.json nao encontrado em {networkconfig_path}")
+        if not update_contract_address(contract_address):
             return False
 
-        # Ler arquivo JSON
-        import json
-        with open(networkconfig_path, 'r') as f:
-            config = json.load(f)
-
-        # Atualizar endereco do contrato
-        config['ethereum']['contracts']['simple']['address'] = contract_address
-
-        # Salvar arquivo JSON
-        with open(networkconfig_path, 'w') as f:
-            json.dump(config, f, indent=4)
+        # Registra o deploy no cache (o artefato compilado ja existe apos o deploy)
+        try:
+            if cache.store(client, "simple", contract_fingerprint("Simple", hardhat_dir), contract_address,
+                           identity or chain_identity(client)):
+                print(f"Deploy registrado no cache ({cache.path})")
+        except RpcError as e:
+            print(f"AVISO: deploy nao registrado no cache ({e})")
 
-        print(f"networkconfig.json atualizado com novo endereco")
         print("="*50)
         print("Contrato Simple implantado com sucesso!")
         print("="*50 + "\n")
@@ -140,42 +197,418 @@ def deploy_simple_contract():
         print(f"ERRO inesperado ao implantar contrato: {e}")
         return False
 
+# Instala o conector do SUT no workspace do Caliper uma vez, antes da bateria
+# (os rounds rodam o launch sem --caliper-bind-sut, sem refazer o npm install)
+def bind_caliper():
+    print(f"Vinculando o Caliper ao SUT {CALIPER_SUT}...")
+    with file_lock(BIND_LOCK):
+        result = subprocess.run(['npx', 'caliper', 'bind', '--caliper-bind-sut', CALIPER_SUT,
+                                 '--caliper-workspace', './'])
+    if result.returncode != 0:
+        print(f"ERRO: caliper bind terminou com codigo {result.returncode}")
+    return result.returncode == 0
+
+# Grava o endereco do contrato Simple no networkconfig.json
+def update_contract_address(contract_address):
+    networkconfig_path = NETWORKCONFIG_PATH
+
+    if not os.path.exists(networkconfig_path):
+        print(f"ERRO: networkconfig.json nao encontrado em {networkconfig_path}")
+        return False
+
+    with open(networkconfig_path, 'r') as f:
+        config = json.load(f)
+
+    if config['ethereum']['contracts']['simple']['address'] == contract_address:
+        return True
+
+    config['ethereum']['contracts']['simple']['address'] = contract_address
+    with open(networkconfig_path, 'w') as f:
+        json.dump(config, f, indent=4)
+
+    print(f"networkconfig.json atualizado com novo endereco")
+    return True
+
 # Executa o Caliper para uma função e TPS
 def run_test(tps, function_name, benchmark_file):
-    update_tps_in_file(benchmark_file, tps)
+    if DRIVER == "rpc" and function_name in READ_WORKLOADS:
+        return run_rpc_test(tps, function_name, benchmark_file)
+
+    # Config propria da execucao, gerada a partir do template (que nao e alterado)
+    run_dir = render_run_config(benchmark_file, function_name, {**RUN_PARAMS, "tps": tps})
+    run_report = os.path.join(run_dir, 'report.html')
     timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-    report_dir = f"reports_htmls/{function_name}"
+    report_dir = os.path.join(REPORTS_ROOT, function_name)
     os.makedirs(report_dir, exist_ok=True)
     report_path = os.path.join(report_dir, f"{function_name}_report_{tps}_{timestamp}.html")
 
     cmd = [
         'npx', 'caliper', 'launch', 'manager',
         '--caliper-workspace', './',
-        '--caliper-benchconfig', benchmark_file,
-        '--caliper-networkconfig', 'networks/besu/networkconfig.json',
-        '--caliper-bind-sut', 'besu:latest',
+        '--caliper-benchconfig', os.path.join(run_dir, 'config.yaml'),
+        '--caliper-networkconfig', NETWORKCONFIG_PATH,
+        '--caliper-report-path', run_report,
         '--caliper-flow-skip-install'
     ]
 
-    subprocess.run(cmd)
-
-    if os.path.exists('report.html'):
-        os.rename('report.html', report_path)
+    # Saida do Caliper acompanhada ao vivo; o log fica junto do relatorio
+    progress = RoundProgress(**ABORT_LIMITS)
+    log_path = os.path.splitext(report_path)[0] + ".log"
+    sampler = None
+    if SAMPLER["interval"] > 0:
+        # Ring buffer de amostras junto do relatorio, analisado com o log pelo docker_sampler.py;
+        # so os containers desta rede (--container-prefix/--nodes)
+        pattern = containers_pattern(RUN_PARAMS.get("nodes"), RUN_PARAMS.get("container_prefix", CONTAINER_PREFIX))
+        sampler = start_recorder(os.path.splitext(report_path)[0] + RING_SUFFIX, SAMPLER["interval"], SAMPLER["socket"],
+                                 pattern=pattern)
+    try:
+        _, abort_reason = run_streaming(cmd, log_path, progress)
+    finally:
+        if sampler is not None and stop_recorder(sampler) != 0:
+            print(f"AVISO: amostragem dos containers falhou (codigo {sampler.returncode})")
+
+    if abort_reason:
+        # Round abortado: registrado como saturado, sem relatorio HTML
+        aborted_path = os.path.splitext(report_path)[0] + ".aborted.json"
+        with open(aborted_path, 'w') as f:
+            json.dump({"function": function_name, "tps": tps, "status": "saturated",
+                       "reason": abort_reason, "progress": progress.summary()}, f, indent=4)
+        record_with_report(run_dir, report_path)
+        print(f"\nRound abortado ({abort_reason}); registrado como saturado em {aborted_path}")
+        report_path = None
+    elif os.path.exists(run_report):
+        os.replace(run_report, report_path)
+        record_with_report(run_dir, report_path)
         print(f"✅ Relatório salvo em {report_path}")
     else:
-        print(f"Relatorio nao encontrado para {function_name} @ {tps} TPS.")
+        print(f"Relatorio nao encontrado para {function_name} @ {tps} TPS (config em {run_dir}).")
+        report_path = None
+
+    # Aguarda as conexões WebSocket serem fechadas e o txpool esvaziar
+    wait_network_ready("apos o teste")
+    return report_path, abort_reason
 
-    # Aguarda para permitir que as conexões WebSocket sejam fechadas
-    print(f"Aguardando 10 segundos antes do proximo teste...")
-    time.sleep(10)
+# Executa um round de leitura com o rpc_loadgen.py; o CSV gerado fica no lugar do relatorio HTML
+def run_rpc_test(tps, function_name, benchmark_file):
+    run_dir = render_run_config(benchmark_file, function_name, {**RUN_PARAMS, "tps": tps})
+    round_cfg = load_round(os.path.join(run_dir, 'config.yaml'), function_name)
+    try:
+        report_path, row = run_round(function_name, tps, round_cfg["tx_number"], os.path.join(REPORTS_ROOT, function_name),
+                                     NETWORKCONFIG_PATH, round_cfg["arguments"], **RPC_LOAD)
+    except (OSError, ConnectionError) as e:
+        print(f"ERRO no gerador de carga para {function_name} @ {tps} TPS: {e} (config em {run_dir}).")
+        report_path = None
+    else:
+        record_with_report(run_dir, report_path)
+        report_path = str(report_path)
+        print(f"✅ Resultado salvo em {report_path} (Throughput: {row['Throughput (TPS)']} TPS, "
+              f"latencia media: {row['Avg Latency (s)']}s)")
+
+    wait_network_ready("apos o teste")
+    return report_path, None
+
+# Cenario de um ponto da bateria: diretorio do benchmark + parametros fixos da execucao
+def scenario_name(benchmark_file):
+    scenario = os.path.basename(os.path.dirname(benchmark_file))
+    if RUN_PARAMS:
+        scenario += "[" + ",".join(f"{k}={v}" for k, v in sorted(RUN_PARAMS.items())) + "]"
+    return scenario
+
+# Executa um ponto da bateria, ou reaproveita o resultado do diario se ja concluido
+def run_point(tps, function_name, benchmark_file, repetition):
+    scenario = scenario_name(benchmark_file)
+    if JOURNAL is not None:
+        point = JOURNAL.get(scenario, function_name, tps, repetition)
+        if point is not None:
+            print(f"Ponto ja concluido, pulando: {function_name} @ {tps} TPS (repeticao {repetition + 1}) "
+                  f"-> {point['report'] or point['status']}")
+            return point["report"], point["reason"]
+
+    first_block = None
+    started = time.time()
+    if BLOCK_ANALYTICS:
+        try:
+            first_block = get_readiness().rpc.block_number() + 1
+        except RpcError as e:
+            print(f"AVISO: bloco inicial nao lido, metricas por bloco desativadas neste ponto: {e}")
+
+    report_path, abort_reason = run_test(tps, function_name, benchmark_file)
+    if report_path and first_block is not None:
+        record_blocks(report_path, first_block, started)
+    if JOURNAL is not None:
+        JOURNAL.record(scenario, function_name, tps, repetition, report_path, abort_reason)
+    return report_path, abort_reason
+
+# Janela do round para as metricas por bloco: "Started round" a "Finished round" no log do
+# Caliper; no rpc_loadgen (sem log), do inicio do ponto ate o CSV, gravado assim que a carga termina
+def point_window(report_path, started):
+    log_path = os.path.splitext(report_path)[0] + ".log"
+    window = round_window(log_path) if os.path.exists(log_path) else None
+    return window or (started, os.path.getmtime(report_path))
+
+# Grava as metricas por bloco do ponto junto do relatorio: blocos lidos desde antes do run_test
+# ate a rede esvaziar o txpool, limitados a janela do round (sem startup, bind e espera ociosa)
+def record_blocks(report_path, first_block, started):
+    rpc = get_readiness().rpc
+    try:
+        summary = record_round_blocks(rpc, report_path, first_block, rpc.block_number(),
+                                      window=point_window(report_path, started))
+    except RpcError as e:
+        print(f"AVISO: metricas por bloco nao coletadas: {e}")
+        return None
+    print("Blocos do round:")
+    describe_summary(summary)
+    return summary
+
+# Le throughput e latencia media do round de um relatorio
+def read_report_result(report_path):
+    from extract_csv import parse_report
+
+    perf_rows, _, _, error = parse_report(report_path)
+    if error or not perf_rows:
+        print(f"ERRO ao ler {report_path}: {error or 'tabela de performance vazia'}")
+        return None
+    row = perf_rows[0]
+    try:
+        return {
+            "throughput": float(row["Throughput (TPS)"]),
+            "avg_latency": float(row["Avg Latency (s)"]),
+            "succ": int(float(row.get("Succ", 0))),
+            "fail": int(float(row.get("Fail", 0))),
+        }
+    except (KeyError, ValueError) as e:
+        print(f"ERRO ao ler metricas de {report_path}: {e}")
+        return None
+
+# Busca adaptativa do ponto de saturacao de uma funcao
+def search_capacity(function_name, benchmark_file, start_tps, repetitions, tolerance=SEARCH_TOLERANCE,
+                    max_tps=SEARCH_MAX_TPS, growth=SEARCH_GROWTH, tracking=None, latency_factor=None):
+    """
+    1. Rampa: multiplica o tps por growth ate o primeiro ponto saturado
+       (se o primeiro ja saturar, divide ate achar um ponto estavel)
+    2. Bissecao do tps entre o ultimo ponto estavel e o primeiro saturado,
+       ate o intervalo ficar menor ou igual a tolerance
+    3. Repeticoes apenas nas duas pontas do intervalo final
+
+    O criterio de saturacao e o mesmo do analyze-all-experiments.py
+    (caliper_stats.is_saturated), com a latencia base do menor ponto estavel.
+    """
+    import caliper_stats
+
+    tracking = caliper_stats.DEFAULT_TRACKING if tracking is None else tracking
+    latency_factor = caliper_stats.DEFAULT_LATENCY_FACTOR if latency_factor is None else latency_factor
+    probes = []
+    base = {"tps": None, "latency": None}  # menor ponto estavel ate agora
+
+    def probe(tps):
+        print(f"\n[search] {function_name} @ {tps} TPS")
+        repetition = sum(1 for p in probes if p["tps"] == tps)
+        report_path, abort_reason = run_point(tps, function_name, benchmark_file, repetition)
+        result = read_report_result(report_path) if report_path else None
+        if result is None:
+            # Round abortado ou sem relatorio valido conta como saturado
+            saturated = True
+        else:
+            lower = base["tps"] is None or tps < base["tps"]
+            base_latency = result["avg_latency"] if lower else base["latency"]
+            saturated = bool(caliper_stats.is_saturated(tps, result["throughput"], result["avg_latency"],
+                                                       base_latency, tracking, latency_factor))
+            if lower and not saturated:
+                base.update(tps=tps, latency=base_latency)
+        probes.append({"tps": tps, "report": report_path, "saturated": saturated,
+                       "aborted": abort_reason, **(result or {})})
+        status = "SATURADO" if saturated else "estavel"
+        if abort_reason:
+            print(f"[search] {tps} TPS -> abortado ({abort_reason}): {status}")
+        elif result:
+            print(f"[search] {tps} TPS -> {result['throughput']:.2f} TPS, latencia {result['avg_latency']:.2f}s: {status}")
+        else:
+            print(f"[search] {tps} TPS -> sem resultado: {status}")
+        return saturated
+
+    # 1. Rampa
+    low, high = None, None
+    tps = start_tps
+    if probe(tps):
+        high = tps
+        while tps > 1:
+            tps = max(1, tps // growth)
+            if not probe(tps):
+                low = tps
+                break
+            high = tps
+    else:
+        low = tps
+        while tps < max_tps:
+            tps = min(max_tps, tps * growth)
+            if probe(tps):
+                high = tps
+                break
+            low = tps
+
+    if low is None or high is None:
+        limit = "estavel ate o teto" if high is None else "saturado ja em 1 TPS"
+        print(f"[search] {function_name}: {limit}, sem intervalo para bissecao")
+    else:
+        # 2. Bissecao
+        while high - low > max(1, tolerance):
+            mid = (low + high) // 2
+            if mid == low:
+                break
+            if probe(mid):
+                high = mid
+            else:
+                low = mid
+        print(f"[search] {function_name}: saturacao entre {low} e {high} TPS")
+
+    # 3. Repeticoes nas pontas do intervalo (cada sonda ja conta como uma execucao)
+    for tps in (low, high):
+        if tps is None:
+            continue
+        done = sum(1 for p in probes if p["tps"] == tps)
+        for _ in range(repetitions - done):
+            probe(tps)
+
+    summary = {
+        "function": function_name,
+        "workers": RUN_PARAMS.get("workers"),
+        "start_tps": start_tps,
+        "tolerance": tolerance,
+        "tracking": tracking,
+        "latency_factor": latency_factor,
+        "max_stable_tps": low,
+        "min_saturated_tps": high,
+        "probes": probes,
+    }
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    summary_path = os.path.join(REPORTS_ROOT, function_name, f"{function_name}_search_{timestamp}.json")
+    with open(summary_path, 'w') as f:
+        json.dump(summary, f, indent=4)
+    print(f"[search] {len(probes)} execucoes; resumo salvo em {summary_path}")
+    return summary
+
+def tps_list_for(function_name):
+    match(function_name):
+        case "open":
+            return TPS_LIST_OPEN
+        case "query":
+            return TPS_LIST_QUERY
+        case "transfer":
+            return TPS_LIST_TRANSFER
+    return TPS_LIST
 
 # Executa todos os testes
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Executa as baterias de testes do contrato Simple")
+    parser.add_argument("--search", action="store_true",
+                        help="Busca adaptativa do ponto de saturacao em vez das listas de TPS")
+    parser.add_argument("--tolerance", type=int, default=SEARCH_TOLERANCE,
+                        help=f"--search: largura final do intervalo em TPS (padrao: {SEARCH_TOLERANCE})")
+    parser.add_argument("--max-tps", type=int, default=SEARCH_MAX_TPS,
+                        help=f"--search: teto da rampa (padrao: {SEARCH_MAX_TPS})")
+    parser.add_argument("--tracking", type=float, default=None,
+                        help="--search: fracao minima do alvo atingida pelo throughput (padrao: 0.9)")
+    parser.add_argument("--latency-factor", type=float, default=None,
+                        help="--search: latencia maxima em relacao a do menor ponto estavel (padrao: 3)")
+    parser.add_argument("--ready-timeout", type=float, default=READY_TIMEOUT,
+                        help=f"Prazo das esperas de prontidao da rede em segundos (padrao: {READY_TIMEOUT})")
+    parser.add_argument("--workers", type=int, nargs="+", default=None,
+                        help="Numero(s) de workers do Caliper; com varios valores a bateria e repetida "
+                             "para cada um (padrao: o do template)")
+    parser.add_argument("--tx-number", type=int, default=None,
+                        help="txNumber de cada round (padrao: o do template)")
+    parser.add_argument("--nodes", type=int, default=None,
+                        help="Monitora apenas os containers /node-besu1..N (padrao: os do template)")
+    parser.add_argument("--container-prefix", default=None,
+                        help="Prefixo dos containers monitorados com --nodes (padrao: /node-besu)")
+    parser.add_argument("--rpc-url", default=RPC_ENDPOINT,
+                        help=f"Endpoint JSON-RPC HTTP da rede (padrao: {RPC_ENDPOINT}); repassado ao deploy em BESU_RPC_URL")
+    parser.add_argument("--networkconfig", default=NETWORKCONFIG_PATH,
+                        help="networkconfig.json do Caliper (padrao: networks/besu/networkconfig.json)")
+    parser.add_argument("--reports-dir", default=REPORTS_ROOT,
+                        help=f"Diretorio dos relatorios HTML (padrao: {REPORTS_ROOT})")
+    parser.add_argument("--max-fail-rate", type=float, default=DEFAULT_MAX_FAIL_RATE,
+                        help=f"Aborta o round acima desta taxa de falha; 0 desativa (padrao: {DEFAULT_MAX_FAIL_RATE})")
+    parser.add_argument("--max-latency", type=float, default=DEFAULT_MAX_LATENCY,
+                        help="Aborta o round quando a transacao pendente mais antiga passa deste tempo (s); "
+                             f"0 desativa (padrao: {DEFAULT_MAX_LATENCY:g})")
+    parser.add_argument("--driver", choices=("caliper", "rpc"), default=DRIVER,
+                        help="Driver das funcoes de leitura (query, getLatestStatus, statusReports): "
+                             "Caliper ou o gerador de carga rpc_loadgen.py (padrao: caliper)")
+    parser.add_argument("--rpc-connections", type=int, default=DEFAULT_CONNECTIONS,
+                        help=f"--driver rpc: conexoes WebSocket no pool (padrao: {DEFAULT_CONNECTIONS})")
+    parser.add_argument("--rpc-batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"--driver rpc: maximo de chamadas por lote JSON-RPC (padrao: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--sample-interval", type=float, default=0,
+                        help="Amostra CPU, memoria, rede e disco dos containers pelo socket do Docker a cada "
+                             "N segundos durante cada round do Caliper; 0 desativa (padrao: 0)")
+    parser.add_argument("--docker-socket", default=DOCKER_SOCKET,
+                        help=f"Socket do Docker Engine para --sample-interval (padrao: {DOCKER_SOCKET})")
+    parser.add_argument("--no-blocks", action="store_true",
+                        help="Nao coleta as metricas por bloco (transacoes, gas, intervalo) de cada ponto")
+    parser.add_argument("--resume", nargs="?", const="latest", default=None, metavar="DIARIO",
+                        help="Continua uma bateria interrompida, pulando os pontos ja concluidos "
+                             "(padrao: o diario mais recente em --journal-dir)")
+    parser.add_argument("--journal-dir", default=None,
+                        help="Diretorio dos diarios da bateria (padrao: {reports-dir}/sweeps)")
+    parser.add_argument("--redeploy", action="store_true",
+                        help="Implanta o contrato mesmo se o deploy em cache ainda for valido")
+    parser.add_argument("--skip-bind", action="store_true",
+                        help="Nao executa o caliper bind (ja feito antes, ex.: pelo experiment_scheduler.py)")
+    parser.add_argument("--no-extract", action="store_true",
+                        help="Nao executa o extract_csv.py ao final")
+    args = parser.parse_args()
+    if args.tolerance < 1:
+        parser.error("--tolerance deve ser >= 1 TPS")
+    READY_TIMEOUT = args.ready_timeout
+    worker_counts = args.workers or [None]
+    RUN_PARAMS = {k: v for k, v in (("tx_number", args.tx_number),
+                                    ("nodes", args.nodes), ("container_prefix", args.container_prefix))
+                  if v is not None}
+    RPC_ENDPOINT = args.rpc_url
+    NETWORKCONFIG_PATH = os.path.abspath(args.networkconfig)
+    REPORTS_ROOT = args.reports_dir
+    ABORT_LIMITS = {"max_fail_rate": args.max_fail_rate, "max_latency": args.max_latency}
+    DRIVER = args.driver
+    USE_DEPLOY_CACHE = not args.redeploy
+    RPC_LOAD = {"connections": args.rpc_connections, "batch_size": args.rpc_batch_size}
+    SAMPLER = {"interval": args.sample_interval, "socket": args.docker_socket}
+    BLOCK_ANALYTICS = not args.no_blocks
+
+    settings = {"search": args.search, "num_testes": num_testes, "run_params": dict(RUN_PARAMS),
+                "functions": list(BENCHMARK_FILES)}
+    if args.workers:
+        settings["workers"] = args.workers
+    if DRIVER != "caliper":
+        settings["driver"] = DRIVER
+    journal_dir = args.journal_dir or os.path.join(REPORTS_ROOT, JOURNAL_DIR_NAME)
+    if args.resume:
+        journal_path = SweepJournal.latest(journal_dir) if args.resume == "latest" else args.resume
+        if journal_path is None:
+            print(f"ERRO: nenhum diario encontrado em {journal_dir}")
+            sys.exit(1)
+        JOURNAL = SweepJournal.load(journal_path)
+        if JOURNAL.data.get("settings") != settings:
+            print(f"AVISO: parametros diferentes da bateria original: {JOURNAL.data.get('settings')}")
+        done, by_status = JOURNAL.summary()
+        print(f"Retomando bateria de {journal_path}: {done} pontos ja concluidos {by_status}")
+    else:
+        JOURNAL = SweepJournal.create(journal_dir, settings)
+        print(f"Diario da bateria: {JOURNAL.path}")
+
     print("\n" + "="*70)
     print("INICIANDO BATERIAS DE TESTES DO CONTRATO SIMPLE")
     print("="*70)
     print(f"Numero de testes por configuracao: {num_testes}")
     print(f"Funcoes a serem testadas: {list(BENCHMARK_FILES.keys())}")
+    if args.workers:
+        print(f"Workers do Caliper: {args.workers}")
+    if DRIVER == "rpc":
+        print(f"Funcoes de leitura com o rpc_loadgen.py ({args.rpc_connections} conexoes, lotes de {args.rpc_batch_size})")
+    if args.sample_interval > 0:
+        print(f"Amostragem dos containers a cada {args.sample_interval:g}s ({args.docker_socket})")
+    if args.search:
+        print(f"Modo: busca do ponto de saturacao (tolerancia {args.tolerance} TPS)")
     print("="*70 + "\n")
 
     # Verificar se a rede esta acessivel antes de iniciar
@@ -184,6 +617,10 @@ if __name__ == "__main__":
         print("Por favor, inicie a rede Besu antes de executar os testes.")
         sys.exit(1)
 
+    if not args.skip_bind and not bind_caliper():
+        print("\nERRO CRITICO: Falha ao vincular o Caliper ao SUT!")
+        sys.exit(1)
+
     # Implantar contrato Simple uma vez antes dos testes
     print("\nImplantando contrato Simple antes de iniciar os testes...")
     if not deploy_simple_contract():
@@ -191,27 +628,35 @@ if __name__ == "__main__":
         print("Os testes nao podem continuar sem o contrato implantado.")
         sys.exit(1)
 
-    # Aguardar tempo adicional para estabilizacao
-    print("\nAguardando 15 segundos adicionais para estabilizacao da rede...")
-    time.sleep(15)
-
-    for i in range(num_testes):
-        for function_name, benchmark_file in BENCHMARK_FILES.items():
-            match(function_name):
-                case "open":
-                    TPS_LIST=TPS_LIST_OPEN
-                case "query":
-                    TPS_LIST=TPS_LIST_QUERY
-                case "transfer":
-                    TPS_LIST=TPS_LIST_TRANSFER
-
-            print(f"\nIniciando testes para funcao: {function_name}")
-            for tps in TPS_LIST:
-                run_test(tps, function_name, benchmark_file)
-
-    print("\nConvertendo relatorios HTML para CSV...")
-    subprocess.run(["python3", "extract_csv.py"])
-    print("Conversao concluida! CSVs gerados em ./reports_csv/")
+    # Aguardar o deploy ser confirmado e a rede estabilizar
+    if not wait_network_ready("apos o deploy", progress=True):
+        print("\nERRO CRITICO: Rede Besu nao estabilizou apos o deploy!")
+        sys.exit(1)
+
+    # Matriz de workers do Caliper: a bateria inteira e repetida para cada numero de workers
+    for workers in worker_counts:
+        if workers is not None:
+            RUN_PARAMS["workers"] = workers
+            print(f"\n{'='*70}\nBATERIA COM {workers} WORKER(S) DO CALIPER\n{'='*70}")
+
+        if args.search:
+            # Comeca do menor TPS da lista de cada funcao e concentra as repeticoes na saturacao
+            for function_name, benchmark_file in BENCHMARK_FILES.items():
+                print(f"\nIniciando busca para funcao: {function_name}")
+                search_capacity(function_name, benchmark_file, tps_list_for(function_name)[0], num_testes,
+                                tolerance=args.tolerance, max_tps=args.max_tps,
+                                tracking=args.tracking, latency_factor=args.latency_factor)
+        else:
+            for i in range(num_testes):
+                for function_name, benchmark_file in BENCHMARK_FILES.items():
+                    print(f"\nIniciando testes para funcao: {function_name}")
+                    for tps in tps_list_for(function_name):
+                        run_point(tps, function_name, benchmark_file, i)
+
+    if not args.no_extract:
+        print("\nConvertendo relatorios HTML para CSV...")
+        subprocess.run(["python3", "extract_csv.py"])
+        print("Conversao concluida! CSVs gerados em ./reports_csv/")
 
     print("\n" + "="*70)
     print("TESTES CONCLUIDOS COM SUCESSO!")
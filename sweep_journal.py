@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Diario (journal) das baterias de testes do run_testes_simple.py
+Cada ponto concluido (cenario, funcao, tps, repeticao) e gravado logo apos a
+execucao, de forma atomica (arquivo temporario + rename), com o relatorio
+gerado. Com --resume a bateria interrompida continua de onde parou: pontos
+ja concluidos sao pulados (ou, no modo --search, reaproveitados).
+
+Estrutura: {reports_dir}/sweeps/sweep_{timestamp}.json, ou outro diretorio
+estavel (--journal-dir): o experiment_scheduler.py guarda os diarios de cada
+experimento em runs/scheduler/journals/{experimento}/, fora dos relatorios
+que ele move ao final, e atualiza neles o caminho dos relatorios movidos.
+
+Uso:
+    python3 sweep_journal.py                # resumo do diario mais recente
+    python3 sweep_journal.py caminho.json
+"""
+
+import os
+import json
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+JOURNAL_DIR_NAME = "sweeps"
+JOURNAL_VERSION = 1
+
+# Status de um ponto concluido; execucoes sem relatorio nem aborto nao sao gravadas
+STATUS_OK = "ok"
+STATUS_SATURATED = "saturated"
+
+def point_key(scenario, function_name, tps, repetition):
+    return f"{scenario}|{function_name}|{tps}|{repetition}"
+
+class SweepJournal:
+    """Pontos concluidos de uma bateria, persistidos a cada execucao"""
+
+    def __init__(self, path, data=None):
+        self.path = Path(path)
+        self.data = data or {
+            "version": JOURNAL_VERSION,
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "points": {},
+        }
+
+    @classmethod
+    def create(cls, journal_dir, settings=None):
+        journal_dir = Path(journal_dir)
+        journal_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        journal = cls(journal_dir / f"sweep_{timestamp}.json")
+        journal.data["settings"] = settings or {}
+        journal.save()
+        return journal
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if data.get("version") != JOURNAL_VERSION:
+            raise ValueError(f"versao de diario nao suportada: {data.get('version')}")
+        return cls(path, data)
+
+    @staticmethod
+    def latest(journal_dir):
+        """Diario mais recente em journal_dir, ou None"""
+        journals = sorted(Path(journal_dir).glob("sweep_*.json"))
+        return journals[-1] if journals else None
+
+    def save(self):
+        """Grava o diario de forma atomica"""
+        self.data["updated"] = datetime.now().isoformat(timespec="seconds")
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def get(self, scenario, function_name, tps, repetition):
+        """
+        Ponto ja concluido, ou None. Um ponto com relatorio que nao existe mais
+        e considerado pendente.
+        """
+        point = self.data["points"].get(point_key(scenario, function_name, tps, repetition))
+        if point is None:
+            return None
+        if point["status"] == STATUS_OK and not (point.get("report") and os.path.exists(point["report"])):
+            return None
+        return point
+
+    def record(self, scenario, function_name, tps, repetition, report_path, abort_reason=None):
+        """Grava um ponto concluido (com relatorio ou abortado como saturado)"""
+        if report_path is None and abort_reason is None:
+            return None
+        point = {
+            "scenario": scenario,
+            "function": function_name,
+            "tps": tps,
+            "repetition": repetition,
+            "status": STATUS_SATURATED if abort_reason else STATUS_OK,
+            "report": report_path,
+            "reason": abort_reason,
+            "finished": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.data["points"][point_key(scenario, function_name, tps, repetition)] = point
+        self.save()
+        return point
+
+    def relocate(self, moved):
+        """
+        Troca o caminho dos relatorios movidos ({caminho antigo: novo}), para
+        o --resume ainda encontrar os pontos ja concluidos
+        """
+        moved = {str(Path(old).resolve()): str(new) for old, new in moved.items()}
+        changed = False
+        for point in self.data["points"].values():
+            new_path = point.get("report") and moved.get(str(Path(point["report"]).resolve()))
+            if new_path:
+                point["report"] = new_path
+                changed = True
+        if changed:
+            self.save()
+        return changed
+
+    def summary(self):
+        points = list(self.data["points"].values())
+        by_status = {}
+        for p in points:
+            by_status[p["status"]] = by_status.get(p["status"], 0) + 1
+        return len(points), by_status
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumo de um diario de bateria de testes")
+    parser.add_argument("journal", nargs="?", help="Diario (padrao: o mais recente em reports_htmls/sweeps)")
+    args = parser.parse_args()
+
+    path = args.journal or SweepJournal.latest(Path("reports_htmls") / JOURNAL_DIR_NAME)
+    if path is None:
+        print("Nenhum diario encontrado")
+        return
+    journal = SweepJournal.load(path)
+    total, by_status = journal.summary()
+    print(f"{path}: {total} pontos concluidos {by_status}")
+    print(f"Inicio: {journal.data['started']} | Ultima atualizacao: {journal.data.get('updated')}")
+    for p in sorted(journal.data["points"].values(), key=lambda p: p["finished"]):
+        print(f"  {p['finished']} {p['scenario']} {p['function']} {p['tps']} TPS repeticao {p['repetition'] + 1}: "
+              f"{p['status']} {p['report'] or p['reason']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Fixtures dos testes: no Besu simulado (mock_besu.py) em portas efemeras,
+servido por um event loop proprio em uma thread, e transacoes assinadas
+minimas para o txpool do no simulado.
+"""
+
+import sys
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mock_besu import MockChain, MockNode
+
+class RunningNode:
+    """MockNode com portas RPC e WebSocket proprias (efemeras), como o serve() do mock_besu.py"""
+
+    def __init__(self, chain, produce=False, latency=0.0):
+        self.chain = chain
+        self.node = MockNode(chain, latency)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.servers, self.producer = self.run(self._start(produce))
+        self.rpc_port, self.ws_port = (s.sockets[0].getsockname()[1] for s in self.servers)
+        self.rpc_url = f"http://127.0.0.1:{self.rpc_port}"
+        self.ws_url = f"ws://127.0.0.1:{self.ws_port}"
+
+    async def _start(self, produce):
+        servers = [await asyncio.start_server(self.node.handle_connection, "127.0.0.1", 0) for _ in range(2)]
+        producer = asyncio.ensure_future(self.chain.run()) if produce else None
+        return servers, producer
+
+    def run(self, coro):
+        """Executa uma corrotina no loop do no e espera o resultado"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout=30)
+
+    def call(self, fn, *args):
+        """Executa fn(*args) na thread do loop (a cadeia nao e thread-safe)"""
+        async def wrapper():
+            return fn(*args)
+        return self.run(wrapper())
+
+    def produce_block(self, now=None):
+        return self.call(self.chain.produce_block, now)
+
+    async def _shutdown(self):
+        for server in self.servers:
+            server.close()
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self):
+        self.run(self._shutdown())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        self.loop.close()
+
+@pytest.fixture
+def start_node():
+    """Fabrica de nos simulados: start_node(produce=False, **opcoes da MockChain)"""
+    nodes = []
+
+    def start(produce=False, latency=0.0, **chain_options):
+        chain_options.setdefault("block_time", 3600.0)
+        node = RunningNode(MockChain(**chain_options), produce=produce, latency=latency)
+        nodes.append(node)
+        return node
+
+    yield start
+    for node in nodes:
+        node.close()
+
+def rlp_encode(item):
+    """Codificacao RLP de bytes ou listas aninhadas"""
+    if isinstance(item, list):
+        payload = b"".join(rlp_encode(i) for i in item)
+        return _rlp_length(len(payload), 0xc0) + payload
+    if len(item) == 1 and item[0] < 0x80:
+        return item
+    return _rlp_length(len(item), 0x80) + item
+
+def _rlp_length(length, offset):
+    if length < 56:
+        return bytes([offset + length])
+    size = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes([offset + 55 + len(size)]) + size
+
+def _int_bytes(value):
+    return value.to_bytes((value.bit_length() + 7) // 8, "big") if value else b""
+
+@pytest.fixture
+def raw_transaction():
+    """Fabrica de transacoes legacy: raw_transaction(nonce, to=bytes de 20) -> hex com 0x"""
+    def build(nonce, to=b"\x11" * 20, data=b""):
+        fields = [_int_bytes(nonce), b"", _int_bytes(21000), to, b"", data, _int_bytes(27), b"\x01", b"\x01"]
+        return "0x" + rlp_encode(fields).hex()
+    return build
@@ -0,0 +1,60 @@
+import socket
+
+from besu_readiness import Readiness, RpcClient
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def test_waits_for_rpc_and_new_blocks(start_node):
+    node = start_node(produce=True, block_time=0.05)
+    readiness = Readiness(node.rpc_url, node.ws_url, poll_interval=0.02)
+    try:
+        assert readiness.wait_for_rpc(timeout=5)
+        start = readiness.rpc.block_number()
+        assert readiness.wait_for_blocks(count=2, timeout=5)
+        assert readiness.rpc.block_number() >= start + 2
+    finally:
+        readiness.close()
+
+def test_txpool_wait_ends_when_block_includes_pending(start_node, raw_transaction):
+    node = start_node()
+    client = RpcClient(node.rpc_url)
+    readiness = Readiness(node.rpc_url, poll_interval=0.02)
+    try:
+        client.call("eth_sendRawTransaction", [raw_transaction(0)])
+        assert readiness.rpc.pending_transactions() == 1
+        assert not readiness.wait_for_txpool(timeout=0.1)
+
+        node.produce_block()
+        assert readiness.wait_for_txpool(timeout=1)
+    finally:
+        client.close()
+        readiness.close()
+
+def test_quiescent_with_idle_websocket_port(start_node):
+    node = start_node(produce=True, block_time=0.05)
+    readiness = Readiness(node.rpc_url, node.ws_url, poll_interval=0.02)
+    try:
+        assert readiness.wait_until_quiescent(timeout=5, progress=True) == (True, None)
+    finally:
+        readiness.close()
+
+def test_quiescent_reports_the_step_that_timed_out(start_node, raw_transaction):
+    node = start_node()
+    readiness = Readiness(node.rpc_url, node.ws_url, poll_interval=0.02)
+    try:
+        # Sem producao de blocos: a espera por blocos novos estoura o prazo
+        assert readiness.wait_until_quiescent(timeout=0.2, progress=True) == (False, "blocos")
+        readiness.rpc.call("eth_sendRawTransaction", [raw_transaction(0)])
+        assert readiness.wait_until_quiescent(timeout=0.2) == (False, "txpool")
+    finally:
+        readiness.close()
+
+def test_unreachable_node_fails_at_rpc_step():
+    readiness = Readiness(f"http://127.0.0.1:{free_port()}", poll_interval=0.02)
+    try:
+        assert readiness.wait_until_quiescent(timeout=0.2) == (False, "rpc")
+    finally:
+        readiness.close()
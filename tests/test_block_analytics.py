@@ -0,0 +1,54 @@
+import math
+import time
+
+import pandas as pd
+
+from besu_readiness import RpcClient
+from block_analytics import BLOCK_COLUMNS, collect, trim_to_window
+
+def produce_blocks(node, raw_transaction, offsets, txs_per_block=2):
+    """Blocos com timestamps futuros (so entram transacoes que chegaram antes do bloco)"""
+    base = int(time.time()) + 10
+    nonce = 0
+    for offset in offsets:
+        for _ in range(txs_per_block):
+            node.call(node.chain.send_raw_transaction, raw_transaction(nonce))
+            nonce += 1
+        node.produce_block(base + offset)
+
+def test_collect_skips_genesis_as_predecessor(start_node, raw_transaction):
+    node = start_node()
+    produce_blocks(node, raw_transaction, [0, 2, 5])
+    client = RpcClient(node.rpc_url)
+    try:
+        df = collect(client, 1, 3)
+    finally:
+        client.close()
+
+    assert list(df.columns) == BLOCK_COLUMNS
+    assert df["number"].tolist() == [1, 2, 3]
+    # Genesis tem timestamp 0: o primeiro intervalo fica indefinido
+    assert math.isnan(df["interval_s"].iloc[0])
+    assert df["interval_s"].iloc[1:].tolist() == [2, 3]
+    assert df["tx_count"].tolist() == [2, 2, 2]
+    assert df["failed_txs"].tolist() == [0, 0, 0]
+
+def test_collect_uses_previous_block_and_counts_reverted(start_node, raw_transaction):
+    node = start_node(fail_rate=1.0)
+    produce_blocks(node, raw_transaction, [0, 2, 5])
+    client = RpcClient(node.rpc_url)
+    try:
+        df = collect(client, 2, 3, batch_size=1)
+        empty = collect(client, 3, 2)
+    finally:
+        client.close()
+
+    assert df["interval_s"].tolist() == [2, 3]
+    assert df["failed_txs"].tolist() == [2, 2]
+    assert df["block_tps"].tolist() == [1.0, 2 / 3]
+    assert empty.empty and list(empty.columns) == BLOCK_COLUMNS
+
+def test_trim_to_window_keeps_whole_seconds():
+    df = pd.DataFrame({"number": [1, 2, 3, 4], "timestamp": [99, 100, 102, 103]})
+    trimmed = trim_to_window(df, 100.4, 101.2)
+    assert trimmed["number"].tolist() == [2, 3]
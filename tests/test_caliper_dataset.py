@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+import caliper_dataset
+
+pytestmark = pytest.mark.skipif(not caliper_dataset.dataset_available(), reason="pyarrow nao instalado")
+
+EXP = caliper_dataset.parse_experiment_name("4n-5s-qbft-v25.10.0_20260101_120000")
+
+@pytest.fixture(autouse=True)
+def dataset_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(caliper_dataset, "DATASET_DIR", tmp_path / "reports_dataset")
+    return tmp_path / "reports_dataset"
+
+def perf_row(report, tps):
+    return {"Name": "open", "Succ": "100", "Throughput (TPS)": str(tps), "TPS": str(tps), "Driver": "caliper",
+            "Test Type": report}
+
+def test_reports_of_a_workload_share_one_partition(dataset_dir):
+    reports = ["open_report_60_20260101-120000", "open_report_80_20260101-120500", "query_rpc_report_100_x"]
+    for i, report in enumerate(reports):
+        caliper_dataset.write_report_partition("performance", EXP, report, [perf_row(report, 60 + 20 * i)])
+
+    partitions = sorted(p.name for p in (dataset_dir / "performance").rglob("test_type=*"))
+    assert partitions == ["test_type=open", "test_type=query"]
+
+    df = caliper_dataset.load_dataset("performance")
+    assert sorted(df["Test Type"]) == sorted(reports)
+    assert df.loc[df["Test Type"] == reports[1], "test_type"].item() == "open"
+    assert df["Throughput (TPS)"].dtype == "float64"
+
+    caliper_dataset.remove_report_partitions(EXP, reports[0])
+    assert not caliper_dataset.report_partitions_exist(EXP, reports[0], ["performance"])
+    assert caliper_dataset.report_partitions_exist(EXP, reports[1], ["performance"])
+
+def test_legacy_layout_files_are_removed(dataset_dir):
+    legacy = (caliper_dataset.experiment_dir("performance", EXP) / "test_type=open_report_60_x"
+              / f"{EXP['experiment']}.parquet")
+    legacy.parent.mkdir(parents=True)
+    pd.DataFrame({"TPS": [60.0]}).to_parquet(legacy)
+    caliper_dataset.write_report_partition("performance", EXP, "open_report_60_x", [perf_row("open_report_60_x", 60)])
+
+    caliper_dataset.remove_legacy_partitions(EXP)
+    assert not legacy.parent.exists()
+    assert len(caliper_dataset.load_dataset("performance")) == 1
@@ -0,0 +1,49 @@
+from caliper_monitor import RoundProgress
+
+def line(ts, source, message):
+    return f"2025.11.13-16:10:{ts:06.3f} info  [caliper] [{source}] \t{message}"
+
+def tx_info(ts, submitted, succ, fail):
+    unfinished = submitted - succ - fail
+    return line(ts, "default-observer", f"[open Round 0 Transaction Info] - Submitted: {submitted} "
+                                        f"Succ: {succ} Fail:{fail} Unfinished:{unfinished}")
+
+def test_abort_detection_stays_on_until_every_worker_finishes():
+    progress = RoundProgress(max_fail_rate=0.5, max_latency=0, min_completed=10)
+    for text in (line(0, "round-orchestrator", "Started round 1 (open)"),
+                 line(2, "worker-message-handler", "Worker#0 is starting Round#0"),
+                 line(2.1, "worker-message-handler", "Worker#1 is starting Round#0"),
+                 tx_info(5, 40, 10, 0),
+                 line(6, "worker-message-handler", "Worker#0 finished Round#0")):
+        progress.feed(text)
+    assert progress.active
+
+    # Worker#1 continua enviando e as falhas passam do limite
+    progress.feed(tx_info(8, 80, 10, 30))
+    assert progress.abort_reason() is not None
+
+    progress.feed(line(12, "worker-message-handler", "Worker#1 finished Round#0"))
+    assert not progress.active
+    assert progress.abort_reason() is None
+
+def test_single_worker_finish_deactivates():
+    progress = RoundProgress(max_fail_rate=0.5, max_latency=0, min_completed=10)
+    for text in (line(0, "round-orchestrator", "Started round 1 (open)"),
+                 line(2, "worker-message-handler", "Worker#0 is starting Round#0"),
+                 tx_info(5, 40, 10, 0),
+                 line(6, "worker-message-handler", "Worker#0 finished Round#0"),
+                 tx_info(8, 40, 10, 30)):
+        progress.feed(text)
+    assert progress.abort_reason() is None
+
+def test_round_end_deactivates_and_next_round_resets_workers():
+    progress = RoundProgress()
+    for text in (line(0, "round-orchestrator", "Started round 1 (open)"),
+                 line(2, "worker-message-handler", "Worker#0 is starting Round#0"),
+                 line(2.1, "worker-message-handler", "Worker#1 is starting Round#0"),
+                 line(9, "round-orchestrator", "Finished round 1 (open) in 7.0 seconds")):
+        progress.feed(text)
+    assert not progress.active
+
+    progress.feed(line(10, "round-orchestrator", "Started round 2 (open)"))
+    assert progress.active and not progress.workers_started and not progress.workers_finished
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+import caliper_stats
+
+def curve(latencies, throughputs=None, aborted=None, tps=(100, 200, 300, 400)):
+    df = pd.DataFrame({"experiment": "exp", "tps": list(tps), "avg_latency": latencies,
+                       "throughput": throughputs if throughputs is not None else list(tps)})
+    if aborted is not None:
+        df["aborted"] = aborted
+    return df
+
+def test_base_latency_skips_a_first_point_without_latency():
+    # 100 TPS acompanhou o alvo mas nao tem latencia: a base vem de 200 TPS e 400 TPS passa de 3x a base
+    df = curve([np.nan, 1.0, 1.5, 4.0])
+    points, summary = caliper_stats.saturation_points(df, ["experiment"])
+    assert points["saturated"].tolist() == [False, False, False, True]
+    row = summary.iloc[0]
+    assert (row["status"], row["knee_tps"], row["first_saturated_tps"]) == ("saturado", 300, 400)
+
+def test_curve_without_any_latency_is_indeterminate():
+    df = curve([np.nan] * 4, aborted=[1, 1, 1, 1])
+    _, summary = caliper_stats.saturation_points(df, ["experiment"])
+    assert summary.iloc[0]["status"] == caliper_stats.UNKNOWN_BASE_STATUS
+
+def test_stable_curve():
+    _, summary = caliper_stats.saturation_points(curve([1.0, 1.1, 1.2, 1.3]), ["experiment"])
+    row = summary.iloc[0]
+    assert (row["status"], row["knee_tps"]) == ("nao saturou", 400)
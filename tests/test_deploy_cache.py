@@ -0,0 +1,63 @@
+import json
+
+from besu_readiness import RpcClient
+from deploy_cache import DeployCache, chain_identity
+
+ADDRESS = "0x0D0072B1A718A335ED90c4A59332f89bCf413c51"
+
+def test_store_and_lookup_round_trip(start_node, tmp_path):
+    node = start_node(contracts=[ADDRESS])
+    client = RpcClient(node.rpc_url)
+    cache = DeployCache(tmp_path / "deploy_cache.json")
+    try:
+        entry = cache.store(client, "simple", "abc", ADDRESS)
+        assert entry["address"] == ADDRESS
+        assert (entry["chain_id"], entry["genesis_hash"]) == chain_identity(client)
+
+        assert cache.lookup(client, "simple", "abc") == ADDRESS
+        assert cache.lookup(client, "simple", "outro-hash") is None
+        assert cache.lookup(client, "simple", None) is None
+        # Uma nova instancia le o arquivo gravado
+        assert DeployCache(cache.path).lookup(client, "simple", "abc") == ADDRESS
+    finally:
+        client.close()
+
+def test_lookup_drops_entry_whose_code_is_gone(start_node, tmp_path):
+    node = start_node(contracts=[ADDRESS])
+    client = RpcClient(node.rpc_url)
+    cache = DeployCache(tmp_path / "deploy_cache.json")
+    try:
+        cache.store(client, "simple", "abc", ADDRESS)
+        node.call(node.chain.code.pop, ADDRESS.lower())
+
+        assert cache.lookup(client, "simple", "abc") is None
+        saved = json.loads(cache.path.read_text())
+        assert saved["entries"]["simple"] == {}
+    finally:
+        client.close()
+
+def test_store_without_code_is_not_cached(start_node, tmp_path):
+    node = start_node()
+    client = RpcClient(node.rpc_url)
+    cache = DeployCache(tmp_path / "deploy_cache.json")
+    try:
+        assert cache.store(client, "simple", "abc", ADDRESS) is None
+        assert not cache.path.exists()
+    finally:
+        client.close()
+
+def test_concurrent_instances_keep_each_others_entries(start_node, tmp_path):
+    other = "0x" + "22" * 20
+    node = start_node(contracts=[ADDRESS, other])
+    client = RpcClient(node.rpc_url)
+    path = tmp_path / "deploy_cache.json"
+    first, second = DeployCache(path), DeployCache(path)
+    try:
+        first.store(client, "simple", "abc", ADDRESS)
+        second.store(client, "MyNFT", "def", other)
+
+        merged = DeployCache(path)
+        assert merged.lookup(client, "simple", "abc") == ADDRESS
+        assert merged.lookup(client, "MyNFT", "def") == other
+    finally:
+        client.close()
@@ -0,0 +1,127 @@
+import time
+import asyncio
+import threading
+
+import numpy as np
+import pandas as pd
+
+from benchmark_matrix import containers_pattern
+from docker_sampler import (COUNTERS, ROUND_COLUMNS, RingBuffer, join_rounds, load_samples, record, sample_rates,
+                           start_recorder, stop_recorder)
+from mock_docker import MockContainer, MockDocker
+
+def containers(names):
+    return [MockContainer(name, i, block_time=0.2, cpus=2, base_cpu=0.05, spike_cpu=0.6, spike_s=0.05,
+                          memory_gb=1.5, block_write_mb=0.25) for i, name in enumerate(names)]
+
+def test_record_samples_every_besu_node(tmp_path):
+    docker = MockDocker(containers(["node-besu2", "node-besu1", "node-besu10", "caliper"]))
+    socket_path = str(tmp_path / "docker.sock")
+    output = tmp_path / "round.samples.ring"
+
+    async def scenario():
+        server = await asyncio.start_unix_server(docker.handle_connection, socket_path)
+        try:
+            return await record(output, socket_path, interval=0.05, duration=0.5)
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    samples, errors, skipped = asyncio.run(scenario())
+    assert errors == 0
+    assert samples > 0 and samples % 3 == 0
+
+    df = load_samples(output)
+    assert len(df) == samples
+    assert sorted(df["node"].unique()) == ["node-besu1", "node-besu10", "node-besu2"]
+    assert df.groupby("node").size().nunique() == 1
+    assert (df["memory_bytes"] == int(1.5 * 1024 ** 3)).all()
+
+    rates = sample_rates(df).dropna(subset=["cpu"])
+    assert not rates.empty
+    # Formula do docker stats: fracao da maquina x CPUs x 100
+    assert rates["cpu"].between(0.05 * 2 * 100 - 0.1, 0.6 * 2 * 100 + 0.1).all()
+    assert (rates["memory_gb"] == 1.5).all()
+
+def test_ring_buffer_wraps_in_write_order(tmp_path):
+    path = tmp_path / "wrap.samples.ring"
+    ring = RingBuffer.create(path, ["node-besu1", "node-besu2"], capacity=4, interval=0.1)
+    for i in range(10):
+        ring.append(float(i), i % 2, 4, [i] * len(COUNTERS))
+    assert ring.records()["t"].tolist() == [6.0, 7.0, 8.0, 9.0]
+    ring.close()
+
+    reader = RingBuffer.open(path)
+    try:
+        assert (reader.count, reader.capacity, reader.names) == (10, 4, ["node-besu1", "node-besu2"])
+        data = reader.records()
+        assert data["t"].tolist() == [6.0, 7.0, 8.0, 9.0]
+        assert data["container"].tolist() == [0, 1, 0, 1]
+        assert data["cpu_total_ns"].tolist() == [6, 7, 8, 9]
+    finally:
+        reader.close()
+
+def test_ring_buffer_before_wrap_keeps_only_written_records(tmp_path):
+    ring = RingBuffer.create(tmp_path / "short.samples.ring", ["node-besu1"], capacity=8)
+    for i in range(3):
+        ring.append(float(i), 0, 1, [0] * len(COUNTERS))
+    try:
+        assert ring.records()["t"].tolist() == [0.0, 1.0, 2.0]
+    finally:
+        ring.close()
+
+def test_join_rounds_assigns_samples_to_their_window():
+    t = np.arange(0.0, 30.0, 1.0)
+    rates = pd.concat([pd.DataFrame({"node": node, "t": t, "cpu": cpu, "memory_gb": 1.0, "disc_write_mb": 0.5,
+                                     "disc_write_mb_s": 0.5, "net_rx_mb": 0.1, "net_tx_mb": 0.2})
+                       for node, cpu in (("node-besu10", 80.0), ("node-besu2", 20.0))], ignore_index=True)
+    windows = pd.DataFrame({"run": [0, 0], "round": [1, 0], "label": ["query", "open"],
+                            "start": [20.0, 5.0], "end": [24.0, 9.0]})
+
+    df = join_rounds(rates, windows)
+    assert list(df.columns) == [c for c in ROUND_COLUMNS if c != "log"]
+    # Janelas em ordem de inicio, nos em ordem numerica
+    assert df[["label", "node"]].values.tolist() == [["open", "node-besu2"], ["open", "node-besu10"],
+                                                     ["query", "node-besu2"], ["query", "node-besu10"]]
+    assert df["samples"].tolist() == [5, 5, 5, 5]
+    assert df["cpu_avg"].tolist() == [20.0, 80.0, 20.0, 80.0]
+    assert df["disc_write_mb"].tolist() == [2.5] * 4
+    assert df["duration_s"].tolist() == [4.0] * 4
+
+def test_join_rounds_without_windows_is_empty():
+    rates = pd.DataFrame({"node": ["node-besu1"], "t": [1.0], "cpu": [10.0]})
+    df = join_rounds(rates, pd.DataFrame(columns=["run", "round", "label", "start", "end"]))
+    assert df.empty and list(df.columns) == [c for c in ROUND_COLUMNS if c != "log"]
+
+def test_recorder_samples_only_its_own_fleet(tmp_path):
+    fleets = [f"exp{slot}-node-besu{i}" for slot in (0, 1) for i in (1, 2)]
+    docker = MockDocker(containers(fleets + ["node-besu1"]))
+    socket_path = str(tmp_path / "docker.sock")
+    output = tmp_path / "slot1.samples.ring"
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = asyncio.run_coroutine_threadsafe(
+        asyncio.start_unix_server(docker.handle_connection, socket_path), loop).result(timeout=10)
+    try:
+        proc = start_recorder(output, interval=0.05, socket_path=socket_path,
+                              pattern=containers_pattern(2, "/exp1-node-besu"))
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline and proc.poll() is None:
+            if output.exists():
+                ring = RingBuffer.open(output)
+                count = ring.count
+                ring.close()
+                if count >= 4:
+                    break
+            time.sleep(0.1)
+        assert stop_recorder(proc) == 0
+    finally:
+        loop.call_soon_threadsafe(server.close)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+    df = load_samples(output)
+    assert not df.empty
+    assert sorted(df["node"].unique()) == ["exp1-node-besu1", "exp1-node-besu2"]
@@ -0,0 +1,173 @@
+import sys
+import json
+import socket
+import asyncio
+import threading
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import experiment_scheduler
+from experiment_scheduler import ExperimentRun, expand_experiments
+from docker_sampler import RING_SUFFIX, load_samples
+from mock_docker import MockContainer, MockDocker
+from sweep_journal import STATUS_OK, SweepJournal
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2026, 1, 2, 3, 4, 5)
+
+@pytest.fixture
+def scheduler_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(experiment_scheduler, "WORK_DIR", tmp_path / "scheduler")
+    monkeypatch.setattr(experiment_scheduler, "JOURNALS_DIR", tmp_path / "scheduler" / "journals")
+    monkeypatch.setattr(experiment_scheduler, "datetime", FrozenDatetime)
+    return tmp_path
+
+def finished_run(tmp_path, slot, report_name="query_report_100.html"):
+    """ExperimentRun com um relatorio e o diario da bateria prontos para o collect()"""
+    exp = expand_experiments(["4n-2s-qbft-v25.10.0"], [], [], [], [])[0]
+    run = ExperimentRun(exp, slot, SimpleNamespace(experiments_dir=tmp_path / "experiments"))
+    report = run.workdir / "reports" / "query" / report_name
+    report.parent.mkdir(parents=True)
+    report.write_text("<html></html>")
+    journal = SweepJournal.create(run.journal_dir)
+    journal.record("default", "query", 100, 1, str(report))
+    run.log_file = open(run.workdir / "experiment.log", 'w')
+    return run, report
+
+def test_collect_moves_reports_and_log(scheduler_dirs):
+    run, report = finished_run(scheduler_dirs, slot=0)
+    exp_dir, count = run.collect()
+
+    assert exp_dir.name == "4n-2s-qbft-v25.10.0_20260102_030405"
+    assert count == 1
+    assert (exp_dir / report.name).exists() and not report.exists()
+    assert (exp_dir / "experiment.log").exists()
+
+def test_collect_same_second_uses_next_free_timestamp(scheduler_dirs):
+    first, _ = finished_run(scheduler_dirs, slot=0)
+    second, _ = finished_run(scheduler_dirs, slot=1, report_name="query_report_200.html")
+
+    first_dir, _ = first.collect()
+    second_dir, _ = second.collect()
+
+    assert first_dir.name.endswith("_20260102_030405")
+    assert second_dir.name.endswith("_20260102_030406")
+    assert (first_dir / "query_report_100.html").exists()
+    assert (second_dir / "query_report_200.html").exists()
+
+def test_collect_relocates_journal_reports(scheduler_dirs):
+    run, report = finished_run(scheduler_dirs, slot=0)
+    exp_dir, _ = run.collect()
+
+    journal = SweepJournal.load(SweepJournal.latest(run.journal_dir))
+    point = journal.get("default", "query", 100, 1)
+    assert point is not None and point["status"] == STATUS_OK
+    assert point["report"] == str(exp_dir / report.name)
+    # O diario fica fora do workdir do slot, apagado ao fim do experimento
+    assert not run.journal_dir.is_relative_to(run.workdir)
+
+# Bateria substituta: o run_testes_simple.py precisa do Hardhat e do Caliper; esta usa os mesmos
+# argumentos do scheduler para gerar carga no mock_besu do slot e amostrar os containers no mock_docker
+STAND_IN_RUNNER = '''
+import sys
+import json
+import asyncio
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, {repo!r})
+from besu_readiness import RpcClient
+from benchmark_matrix import containers_pattern
+from docker_sampler import RING_SUFFIX, record
+from rpc_loadgen import run_round
+
+parser = argparse.ArgumentParser()
+for option in ("--rpc-url", "--networkconfig", "--reports-dir", "--container-prefix", "--journal-dir",
+               "--docker-socket"):
+    parser.add_argument(option)
+parser.add_argument("--nodes", type=int)
+args, _ = parser.parse_known_args()
+
+output_dir = Path(args.reports_dir) / "query"
+report_path, row = run_round("query", 100, 20, output_dir, args.networkconfig, connections=1, batch_size=5)
+asyncio.run(record(report_path.with_suffix(RING_SUFFIX), args.docker_socket, interval=0.05, duration=0.3,
+                   pattern=containers_pattern(args.nodes, args.container_prefix)))
+client = RpcClient(args.rpc_url)
+with open(output_dir / "runner.json", "w") as f:
+    json.dump({{"argv": sys.argv[1:], "succ": row["Succ"], "block": client.block_number(),
+               "networkconfig": json.load(open(args.networkconfig))["ethereum"]["url"]}}, f)
+client.close()
+'''
+
+def free_base(offset):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return 20000 + (sock.getsockname()[1] + offset) % 10000
+
+def test_two_slots_run_isolated_against_the_mocks(scheduler_dirs, monkeypatch):
+    tmp_path = scheduler_dirs
+    monkeypatch.setattr(experiment_scheduler, "datetime", datetime)
+    base = free_base(0)
+    monkeypatch.setattr(experiment_scheduler, "RPC_PORT_BASE", base)
+    monkeypatch.setattr(experiment_scheduler, "WS_PORT_BASE", base + 100)
+    monkeypatch.setattr(experiment_scheduler, "P2P_PORT_BASE", base + 200)
+    monkeypatch.setattr(experiment_scheduler, "PORT_STRIDE", 1000)
+
+    runner = tmp_path / "stand_in_runner.py"
+    runner.write_text(STAND_IN_RUNNER.format(repo=str(Path(experiment_scheduler.__file__).parent)))
+
+    # Um Docker simulado para todos os slots, com uma frota de 3 nos por prefixo
+    docker = MockDocker([MockContainer(f"exp{slot}-node-besu{i}", i, 0.2, 2, 0.05, 0.5, 0.05, 1.0, 0.25)
+                         for slot in range(6) for i in (1, 2, 3)])
+    socket_path = str(tmp_path / "docker.sock")
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = asyncio.run_coroutine_threadsafe(
+        asyncio.start_unix_server(docker.handle_connection, socket_path), loop).result(timeout=10)
+
+    args = SimpleNamespace(
+        cores=100, memory_gb=100, max_parallel=2, node_cpu=0.5, node_memory_gb=1.0,
+        network_up=f"{sys.executable} mock_besu.py --rpc-port {{rpc_port}} --ws-port {{ws_port}} --block-time 0.2",
+        network_down=None, network_timeout=60, networkconfig=experiment_scheduler.NETWORKCONFIG_TEMPLATE,
+        runner=[sys.executable, str(runner)], runner_args=["--docker-socket", socket_path], resume=False,
+        experiments_dir=tmp_path / "experiments")
+    experiments = expand_experiments(["2n-1s-qbft-v25.10.0", "3n-1s-qbft-v25.10.0"], [], [], [], [])
+    try:
+        results = experiment_scheduler.schedule(experiments, args)
+    finally:
+        loop.call_soon_threadsafe(server.close)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+    assert [r["ok"] for r in results] == [True, True]
+    slots = set()
+    for result in results:
+        exp_dir = args.experiments_dir / result["experiment"]
+        nodes = int(result["experiment"].split("n-")[0])
+        info = json.loads((exp_dir / "runner.json").read_text())
+        argv = dict(zip(info["argv"][::2], info["argv"][1::2]))
+
+        rpc_port = int(argv["--rpc-url"].rsplit(":", 1)[1])
+        slot, rest = divmod(rpc_port - base, 1000)
+        assert rest == 0
+        slots.add(slot)
+        ports = experiment_scheduler.slot_ports(slot)
+        assert info["networkconfig"] == f"ws://127.0.0.1:{ports['ws_port']}"
+        assert argv["--container-prefix"] == f"/exp{slot}-node-besu"
+        assert argv["--nodes"] == str(nodes)
+        assert argv["--journal-dir"] == str(experiment_scheduler.JOURNALS_DIR / result["experiment"].rsplit("_", 2)[0])
+        assert info["succ"] == 20 and info["block"] > 0
+
+        # Relatorio, amostras e log do slot no diretorio do proprio experimento
+        reports = list(exp_dir.glob("query_rpc_report_100_*.csv"))
+        assert len(reports) == 1
+        samples = load_samples(reports[0].with_suffix(RING_SUFFIX))
+        assert sorted(samples["node"].unique()) == [f"exp{slot}-node-besu{i}" for i in range(1, nodes + 1)]
+        assert (exp_dir / "experiment.log").exists()
+    assert len(slots) == 2
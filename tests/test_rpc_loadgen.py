@@ -0,0 +1,18 @@
+import csv
+
+from rpc_loadgen import NETWORKCONFIG_PATH, PERF_FIELDS, run_round
+
+def test_query_round_against_mock_node(start_node, tmp_path):
+    node = start_node()
+    report_path, row = run_round("query", tps=200, tx_number=40, output_dir=tmp_path,
+                                 networkconfig=NETWORKCONFIG_PATH, connections=2, batch_size=5,
+                                 url=node.ws_url, seed=1)
+
+    assert (row["Succ"], row["Fail"], row["TPS"], row["Driver"]) == (40, 0, 200, "rpc")
+    assert row["Test Type"] == report_path.stem
+    assert node.node.requests > 0
+    with open(report_path, newline='') as f:
+        reader = csv.DictReader(f)
+        assert reader.fieldnames == PERF_FIELDS
+        rows = list(reader)
+    assert len(rows) == 1 and rows[0]["Succ"] == "40" and rows[0]["Driver"] == "rpc"
@@ -0,0 +1,38 @@
+import pytest
+
+import run_testes_simple
+
+CAPACITY = 137
+
+@pytest.fixture
+def fake_network(tmp_path, monkeypatch):
+    """Rede que acompanha o alvo ate CAPACITY TPS e satura acima"""
+    probed = []
+
+    def run_point(tps, function_name, benchmark_file, repetition):
+        probed.append(tps)
+        return f"report_{tps}", None
+
+    def read_report_result(report_path):
+        tps = int(report_path.split("_")[1])
+        return {"throughput": float(min(tps, CAPACITY)), "avg_latency": 1.0, "succ": tps}
+
+    monkeypatch.setattr(run_testes_simple, "run_point", run_point)
+    monkeypatch.setattr(run_testes_simple, "read_report_result", read_report_result)
+    monkeypatch.setattr(run_testes_simple, "REPORTS_ROOT", str(tmp_path))
+    (tmp_path / "open").mkdir()
+    return probed
+
+@pytest.mark.parametrize("tolerance", [0, -5, 1])
+def test_bisection_ends_on_adjacent_points(fake_network, tolerance):
+    summary = run_testes_simple.search_capacity("open", "config-open.yaml", start_tps=60, repetitions=1,
+                                                tolerance=tolerance, max_tps=1000, growth=2)
+    assert summary["max_stable_tps"] < summary["min_saturated_tps"]
+    assert summary["min_saturated_tps"] - summary["max_stable_tps"] == 1
+    assert len(fake_network) < 20
+
+def test_bisection_stops_at_tolerance(fake_network):
+    summary = run_testes_simple.search_capacity("open", "config-open.yaml", start_tps=60, repetitions=1,
+                                                tolerance=10, max_tps=1000, growth=2)
+    assert summary["max_stable_tps"] < CAPACITY / 0.9 <= summary["min_saturated_tps"]
+    assert summary["min_saturated_tps"] - summary["max_stable_tps"] <= 10